@@ -617,6 +617,32 @@ class Transform:
         itransform = ITransform.MakeMirror(origin.ipoint, normal.ivector)
         return cls(itransform)
 
+    @classmethod
+    def translation(cls, v: Vector) -> Transform:
+        """
+        Create a translation.
+
+        :param Vector v: Translation vector.
+        :return: New transformation.
+        :rtype: Transform
+        """
+        itransform = ITransform.MakeTranslation(v.ivector)
+        return cls(itransform)
+
+    @classmethod
+    def rotation(cls, origin: Point, axis: Vector, angle: float) -> Transform:
+        """
+        Create a rotation about an axis.
+
+        :param Point origin: Point on the rotation axis.
+        :param Vector axis: Direction of the rotation axis.
+        :param float angle: Rotation angle in radians.
+        :return: New transformation.
+        :rtype: Transform
+        """
+        itransform = ITransform.MakeRotation(origin.ipoint, axis.ivector, angle)
+        return cls(itransform)
+
     def __init__(self, t: ITransform):
         """
         Initialize from an ITransform.
@@ -636,6 +662,16 @@ class Transform:
         """
         return self._itransform
 
+    def multiplied(self, other: Transform) -> Transform:
+        """
+        Compose with another transformation.
+
+        :param Transform other: Transformation applied first.
+        :return: Transformation applying the other transformation and then this one.
+        :rtype: Transform
+        """
+        return Transform(self._itransform.Multiplied(other.itransform))
+
 
 class Curve:
     """
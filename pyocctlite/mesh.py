@@ -1,188 +1,2537 @@
 from __future__ import annotations
 
-from typing import Iterable, Optional
+import asyncio
+import functools
+import hashlib
+import os
+import tempfile
+import weakref
+import zlib
+from concurrent.futures import Executor
+from enum import Enum
+from typing import Callable, Iterable, Optional, Sequence
 
-from pyocctlite._occtlite import IMesh, IMeshControl
+import numpy as np
 
-from pyocctlite.topology import Shape
+from pyocctlite._occtlite import (EstimateIMesh, IFrozenMesh, IMesh, IMeshCancelToken,
+                                  IMeshControl, IMeshElementKind, IMeshFineness, IMeshGenerator,
+                                  IMeshQualityMetric, IMeshReport, PartitionIMesh)
 
+from pyocctlite.geometry import Transform
+from pyocctlite.topology import MapShape, Shape, ShapeKind
 
 
+class ElementKind(Enum):
+    """
+    Kinds of mesh elements.
+    """
+    TRIANGLE = IMeshElementKind.Triangle
+    QUADRANGLE = IMeshElementKind.Quadrangle
+    TETRA = IMeshElementKind.Tetra
+
+
+class Fineness(Enum):
+    """
+    NETGEN fineness levels.
+
+    Each level sets the growth rate of element sizes away from small features and the number of
+    segments per edge and per radius of curvature, from ``VERY_COARSE`` to ``VERY_FINE``.
+    """
+    VERY_COARSE = IMeshFineness.VeryCoarse
+    COARSE = IMeshFineness.Coarse
+    MODERATE = IMeshFineness.Moderate
+    FINE = IMeshFineness.Fine
+    VERY_FINE = IMeshFineness.VeryFine
+
+
+class QualityMetric(Enum):
+    """
+    Element quality metrics of tetrahedra.
+
+    * ``ASPECT_RATIO``: Circumradius over three times the inradius (1 for a regular tetrahedron,
+      infinite for a flat one).
+    * ``MIN_DIHEDRAL_ANGLE``: Smallest angle between two faces (radians, 0 if a face has
+      collapsed).
+    * ``SCALED_JACOBIAN``: Jacobian over the largest product of edge lengths at a corner, in
+      [-1, 1] (1 for a regular tetrahedron).
+    * ``VOLUME``: Signed volume.
+    """
+    ASPECT_RATIO = IMeshQualityMetric.AspectRatio
+    MIN_DIHEDRAL_ANGLE = IMeshQualityMetric.MinDihedralAngle
+    SCALED_JACOBIAN = IMeshQualityMetric.ScaledJacobian
+    VOLUME = IMeshQualityMetric.Volume
+
+
+class QualitySummary:
+    """
+    Summary statistics and histogram of element quality values.
+
+    Infinite values, such as the aspect ratio of flat elements, are left out of the histogram
+    but included in the statistics and counts.
+
+    :ivar numpy.ndarray values: Quality value of each element.
+    :ivar float min: Minimum value.
+    :ivar float max: Maximum value.
+    :ivar float mean: Mean value.
+    :ivar numpy.ndarray counts: Number of elements in each histogram bin.
+    :ivar numpy.ndarray edges: Edges of the histogram bins.
+    """
+
+    def __init__(self, values: np.ndarray, bins: int = 10):
+        """
+        Initialize from quality values.
+
+        :param numpy.ndarray values: Quality value of each element.
+        :param int bins: Number of histogram bins.
+        """
+        self._values = values
+        self._counts, self._edges = np.histogram(values[np.isfinite(values)], bins=bins)
+
+    @property
+    def values(self) -> np.ndarray:
+        """
+        Quality value of each element.
+
+        :return: Values.
+        :rtype: numpy.ndarray
+        """
+        return self._values
+
+    @property
+    def min(self) -> float:
+        """
+        Minimum value.
+
+        :return: Minimum, or NaN if there are no elements.
+        :rtype: float
+        """
+        return float(self._values.min()) if self._values.size else float('nan')
+
+    @property
+    def max(self) -> float:
+        """
+        Maximum value.
+
+        :return: Maximum, or NaN if there are no elements.
+        :rtype: float
+        """
+        return float(self._values.max()) if self._values.size else float('nan')
+
+    @property
+    def mean(self) -> float:
+        """
+        Mean value.
+
+        :return: Mean, or NaN if there are no elements.
+        :rtype: float
+        """
+        return float(self._values.mean()) if self._values.size else float('nan')
+
+    @property
+    def counts(self) -> np.ndarray:
+        """
+        Number of elements in each histogram bin.
+
+        :return: Bin counts.
+        :rtype: numpy.ndarray
+        """
+        return self._counts
+
+    @property
+    def edges(self) -> np.ndarray:
+        """
+        Edges of the histogram bins.
+
+        :return: Bin edges (one more than the number of bins).
+        :rtype: numpy.ndarray
+        """
+        return self._edges
+
+    def count_below(self, threshold: float) -> int:
+        """
+        Number of elements with a value below a threshold.
+
+        :param float threshold: Threshold value.
+        :return: Element count.
+        :rtype: int
+        """
+        return int(np.count_nonzero(self._values < threshold))
+
+    def count_above(self, threshold: float) -> int:
+        """
+        Number of elements with a value above a threshold.
+
+        :param float threshold: Threshold value.
+        :return: Element count.
+        :rtype: int
+        """
+        return int(np.count_nonzero(self._values > threshold))
+
+
+class SubMeshReport:
+    """
+    Computation report of one sub-mesh.
+
+    :ivar Shape shape: Sub-shape of the sub-mesh.
+    :ivar int shape_id: ID of the sub-shape as used by shape IDs.
+    :ivar str algorithm: Name of the assigned algorithm (empty if none).
+    :ivar float time: Wall time in seconds attributed to the sub-mesh.
+    :ivar int num_nodes: Number of nodes.
+    :ivar int num_elements: Number of elements.
+    :ivar bool computed: Whether the sub-mesh is computed.
+    :ivar str error: Compute error (empty if none).
+    """
+
+    def __init__(self, ireport: IMeshReport, i: int):
+        """
+        Initialize from a sub-mesh of an IMeshReport.
+
+        :param IMeshReport ireport: Underlying report.
+        :param int i: Sub-mesh index.
+        """
+        self._shape = Shape.by_ishape(ireport.SubShape(i))
+        self._shape_id = ireport.ShapeId(i)
+        self._algorithm = ireport.Algorithm(i)
+        self._time = ireport.Time(i)
+        self._num_nodes = ireport.NumNodes(i)
+        self._num_elements = ireport.NumElements(i)
+        self._computed = ireport.IsComputed(i)
+        self._error = ireport.Error(i)
+
+    def __repr__(self) -> str:
+        status = self._error or ('computed' if self._computed else 'not computed')
+        return (f"SubMeshReport(shape_id={self._shape_id}, algorithm={self._algorithm!r}, "
+                f"time={self._time:.3f}, num_elements={self._num_elements}, {status})")
+
+    @property
+    def shape(self) -> Shape:
+        """
+        Sub-shape of the sub-mesh.
+
+        :return: Sub-shape.
+        :rtype: Shape
+        """
+        return self._shape
+
+    @property
+    def shape_id(self) -> int:
+        """
+        ID of the sub-shape as used by the shape IDs of a frozen mesh.
+
+        :return: Sub-shape ID.
+        :rtype: int
+        """
+        return self._shape_id
+
+    @property
+    def algorithm(self) -> str:
+        """
+        Name of the algorithm assigned to the sub-mesh.
+
+        :return: Algorithm name, or an empty string if none.
+        :rtype: str
+        """
+        return self._algorithm
+
+    @property
+    def time(self) -> float:
+        """
+        Wall time in seconds from the end of the previous sub-mesh computation to the end of
+        this one.
+
+        Sub-meshes computed by an algorithm of a higher dimension, e.g., the faces of a solid
+        meshed by NETGEN 2D/3D, take no time of their own.
+
+        :return: Time in seconds.
+        :rtype: float
+        """
+        return self._time
+
+    @property
+    def num_nodes(self) -> int:
+        """
+        Number of nodes of the sub-mesh.
+
+        :return: Node count.
+        :rtype: int
+        """
+        return self._num_nodes
+
+    @property
+    def num_elements(self) -> int:
+        """
+        Number of elements of the sub-mesh.
+
+        :return: Element count.
+        :rtype: int
+        """
+        return self._num_elements
+
+    @property
+    def computed(self) -> bool:
+        """
+        Check if the sub-mesh is computed.
+
+        :return: *True* if computed, *False* if not.
+        :rtype: bool
+        """
+        return self._computed
+
+    @property
+    def error(self) -> str:
+        """
+        Compute error of the sub-mesh.
+
+        :return: Error name and comment, or an empty string if none.
+        :rtype: str
+        """
+        return self._error
+
+
+class MeshReport:
+    """
+    Report of a mesh computation with the wall time, size, and error of each sub-mesh.
+
+    :ivar IMeshReport ireport: Underlying report.
+    """
+
+    def __init__(self, ireport: IMeshReport):
+        """
+        Initialize from an IMeshReport.
+
+        :param IMeshReport ireport: Underlying report.
+        """
+        assert isinstance(ireport, IMeshReport)
+        self._ireport = ireport
+        self._sub_meshes = [SubMeshReport(ireport, i) for i in range(ireport.NumSubMeshes())]
+
+    @property
+    def ireport(self) -> IMeshReport:
+        """
+        Underlying report.
+
+        :return: IMeshReport object.
+        :rtype: IMeshReport
+        """
+        return self._ireport
+
+    @property
+    def total_time(self) -> float:
+        """
+        Wall time in seconds of the whole computation.
+
+        :return: Time in seconds.
+        :rtype: float
+        """
+        return self._ireport.TotalTime()
+
+    @property
+    def sub_meshes(self) -> list[SubMeshReport]:
+        """
+        Report of each sub-mesh, with sub-shapes before the shapes containing them.
+
+        :return: Sub-mesh reports.
+        :rtype: list(SubMeshReport)
+        """
+        return list(self._sub_meshes)
+
+    @property
+    def failures(self) -> list[SubMeshReport]:
+        """
+        Reports of the sub-meshes with a compute error.
+
+        :return: Sub-mesh reports.
+        :rtype: list(SubMeshReport)
+        """
+        return [r for r in self._sub_meshes if r.error]
+
+    def slowest(self, n: int = 10) -> list[SubMeshReport]:
+        """
+        Reports of the sub-meshes that took the most time.
+
+        :param int n: Maximum number of reports.
+        :return: Sub-mesh reports by decreasing time.
+        :rtype: list(SubMeshReport)
+        """
+        return sorted(self._sub_meshes, key=lambda r: r.time, reverse=True)[:n]
+
+    def time_by_algorithm(self) -> dict[str, float]:
+        """
+        Total wall time of the sub-meshes of each algorithm.
+
+        :return: Time in seconds by algorithm name (empty name for sub-meshes without one).
+        :rtype: dict(str, float)
+        """
+        times = {}
+        for r in self._sub_meshes:
+            times[r.algorithm] = times.get(r.algorithm, 0.) + r.time
+        return times
+
+
+class MeshEstimate:
+    """
+    Estimate of the size, time, and memory of a mesh computation made without meshing.
+
+    Element counts follow from the lengths, areas, and volumes of the sub-shapes and the
+    element size of the control governing each of them, reduced where curved if the control
+    has a deflection, and by the segments per edge and per radius of its fineness if NETGEN
+    applies it with the full hypothesis. Elements are graded at the growth rate of the control
+    from finer edges into faces, from finer faces into solids, and from the points of a size
+    field. Time and memory use fixed throughputs and per-element costs, so they are only meant
+    to reject or queue oversized jobs and to size worker pools.
+
+    :ivar EstimateIMesh itool: Underlying tool.
+    """
+
+    def __init__(self, itool: EstimateIMesh):
+        """
+        Initialize from an EstimateIMesh.
+
+        :param EstimateIMesh itool: Underlying tool.
+        """
+        assert isinstance(itool, EstimateIMesh)
+        self._itool = itool
+
+    @property
+    def itool(self) -> EstimateIMesh:
+        """
+        Underlying tool.
+
+        :return: EstimateIMesh object.
+        :rtype: EstimateIMesh
+        """
+        return self._itool
+
+    @property
+    def num_nodes(self) -> int:
+        """
+        Estimated number of nodes.
+
+        :return: Node count.
+        :rtype: int
+        """
+        return self._itool.NumNodes()
+
+    @property
+    def num_edges(self) -> int:
+        """
+        Estimated number of segments.
+
+        :return: Segment count.
+        :rtype: int
+        """
+        return self._itool.NumEdges()
+
+    @property
+    def num_faces(self) -> int:
+        """
+        Estimated number of triangles or quadrangles.
+
+        :return: Surface element count.
+        :rtype: int
+        """
+        return self._itool.NumFaces()
+
+    @property
+    def num_volumes(self) -> int:
+        """
+        Estimated number of tetrahedra.
+
+        :return: Volume element count.
+        :rtype: int
+        """
+        return self._itool.NumVolumes()
+
+    @property
+    def num_elements(self) -> int:
+        """
+        Estimated number of elements of all dimensions.
+
+        :return: Element count.
+        :rtype: int
+        """
+        return self.num_edges + self.num_faces + self.num_volumes
+
+    @property
+    def time(self) -> float:
+        """
+        Estimated wall time of a serial computation.
+
+        :return: Time in seconds.
+        :rtype: float
+        """
+        return self._itool.Time()
+
+    @property
+    def memory(self) -> float:
+        """
+        Estimated peak memory of the computation.
+
+        :return: Memory in bytes.
+        :rtype: float
+        """
+        return self._itool.Memory()
+
+    @property
+    def min_size(self) -> float:
+        """
+        Smallest element size used by the estimate.
+
+        :return: Element size.
+        :rtype: float
+        """
+        return self._itool.MinSize()
+
+
+class NodeRenumbering:
+    """
+    Node order reducing the bandwidth of a mesh.
+
+    :ivar numpy.ndarray order: Previous index of each node in the new numbering.
+    :ivar int bandwidth_before: Bandwidth of the previous numbering.
+    :ivar int bandwidth_after: Bandwidth of the new numbering.
+    """
+
+    def __init__(self, order: np.ndarray, bandwidth_before: int, bandwidth_after: int):
+        """
+        Initialize from a node order and its bandwidths.
+
+        :param numpy.ndarray order: Previous index of each node in the new numbering.
+        :param int bandwidth_before: Bandwidth of the previous numbering.
+        :param int bandwidth_after: Bandwidth of the new numbering.
+        """
+        self._order = order
+        self._bandwidth_before = bandwidth_before
+        self._bandwidth_after = bandwidth_after
+
+    @property
+    def order(self) -> np.ndarray:
+        """
+        Previous index of each node in the new numbering.
+
+        Arrays of node data in the previous numbering are renumbered by ``data[order]``.
+
+        :return: Node order.
+        :rtype: numpy.ndarray
+        """
+        return self._order
+
+    @property
+    def inverse(self) -> np.ndarray:
+        """
+        New index of each node in the previous numbering.
+
+        Connectivity arrays in the previous numbering are renumbered by ``inverse[elements]``.
+
+        :return: Inverse node order.
+        :rtype: numpy.ndarray
+        """
+        inverse = np.empty_like(self._order)
+        inverse[self._order] = np.arange(self._order.size, dtype=self._order.dtype)
+        return inverse
+
+    @property
+    def bandwidth_before(self) -> int:
+        """
+        Largest index difference between adjacent nodes in the previous numbering.
+
+        :return: Bandwidth.
+        :rtype: int
+        """
+        return self._bandwidth_before
+
+    @property
+    def bandwidth_after(self) -> int:
+        """
+        Largest index difference between adjacent nodes in the new numbering.
+
+        :return: Bandwidth.
+        :rtype: int
+        """
+        return self._bandwidth_after
+
+
+class SizeField:
+    """
+    Background element size field read by NETGEN during meshing.
+
+    The field is a cloud of points, each with a target element size. NETGEN restricts the local
+    element size near each point and grades it smoothly in between, so a size field can only
+    refine a mesh below the maximum edge size of its control. The field is written to a NETGEN
+    mesh size file (.msz) on first use, which is removed when the field is deleted.
+    """
+
+    @classmethod
+    def by_points(cls, points: np.ndarray, sizes: np.ndarray) -> SizeField:
+        """
+        Create a size field from points and sizes.
+
+        :param numpy.ndarray points: Array of shape (N, 3) with point coordinates.
+        :param numpy.ndarray sizes: Array of shape (N,) with the element size at each point.
+        :return: New size field.
+        :rtype: SizeField
+        """
+        return cls(points, sizes)
+
+    @classmethod
+    def by_grid(cls, origin: Sequence[float], spacing: Sequence[float],
+                sizes: np.ndarray) -> SizeField:
+        """
+        Create a size field from sizes on a structured grid.
+
+        :param Sequence[float] origin: Coordinates of the first grid point.
+        :param Sequence[float] spacing: Grid spacing in x, y, and z.
+        :param numpy.ndarray sizes: Array of shape (nx, ny, nz) with the element size at each
+            grid point.
+        :return: New size field.
+        :rtype: SizeField
+        :raises ValueError: If the origin or spacing do not have three components, a spacing is
+            not positive, or the sizes are not an (nx, ny, nz) array.
+        """
+        origin = np.asarray(origin, dtype=float)
+        spacing = np.asarray(spacing, dtype=float)
+        sizes = np.asarray(sizes, dtype=float)
+        if origin.shape != (3,) or spacing.shape != (3,):
+            raise ValueError("Grid origin and spacing must have three components.")
+        if not (spacing > 0.).all():
+            raise ValueError("Grid spacing must be positive.")
+        if sizes.ndim != 3:
+            raise ValueError("Grid sizes must be an (nx, ny, nz) array.")
+        axes = [o + d * np.arange(n) for o, d, n in zip(origin, spacing, sizes.shape)]
+        points = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+        return cls(points, sizes.reshape(-1))
+
+    @classmethod
+    def by_function(cls, fn: Callable[[np.ndarray], np.ndarray], lower: Sequence[float],
+                    upper: Sequence[float], spacing: float) -> SizeField:
+        """
+        Create a size field by sampling a vectorized function on a grid over a box.
+
+        :param fn: Function taking an array of shape (N, 3) with point coordinates and
+            returning an array of shape (N,) with the element size at each point.
+        :type fn: Callable[[numpy.ndarray], numpy.ndarray]
+        :param Sequence[float] lower: Lower corner of the box.
+        :param Sequence[float] upper: Upper corner of the box.
+        :param float spacing: Grid spacing.
+        :return: New size field.
+        :rtype: SizeField
+        :raises ValueError: If the corners do not have three components, the spacing is not
+            positive, or the function does not return one size per point.
+        """
+        if spacing <= 0.:
+            raise ValueError("Grid spacing must be positive.")
+        lower = np.asarray(lower, dtype=float)
+        upper = np.asarray(upper, dtype=float)
+        if lower.shape != (3,) or upper.shape != (3,):
+            raise ValueError("Box corners must have three components.")
+        counts = np.maximum(np.ceil((upper - lower) / spacing).astype(int) + 1, 1)
+        axes = [np.linspace(lo, hi, n) for lo, hi, n in zip(lower, upper, counts)]
+        points = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+        sizes = np.asarray(fn(points), dtype=float)
+        if sizes.shape != (len(points),):
+            raise ValueError("Size function must return an (N,) array for (N, 3) points.")
+        return cls(points, sizes)
+
+    def __init__(self, points: np.ndarray, sizes: np.ndarray):
+        """
+        Initialize from points and sizes.
+
+        :param numpy.ndarray points: Array of shape (N, 3) with point coordinates.
+        :param numpy.ndarray sizes: Array of shape (N,) with the element size at each point.
+        :raises ValueError: If the arrays do not match or a size is not positive.
+        """
+        points = np.asarray(points, dtype=float)
+        sizes = np.asarray(sizes, dtype=float).reshape(-1)
+        if points.ndim != 2 or points.shape[1] != 3:
+            raise ValueError("Points must be an (N, 3) array.")
+        if len(sizes) != len(points):
+            raise ValueError("Number of sizes must match the number of points.")
+        if not (sizes > 0.).all():
+            raise ValueError("Sizes must be positive.")
+        self._points = points
+        self._sizes = sizes
+        self._path = None
+
+    @property
+    def points(self) -> np.ndarray:
+        """
+        Point coordinates.
+
+        :return: Array of shape (N, 3).
+        :rtype: numpy.ndarray
+        """
+        return self._points
+
+    @property
+    def sizes(self) -> np.ndarray:
+        """
+        Element size at each point.
+
+        :return: Array of shape (N,).
+        :rtype: numpy.ndarray
+        """
+        return self._sizes
+
+    @property
+    def path(self) -> str:
+        """
+        Path of the NETGEN mesh size file, written on first use.
+
+        :return: File path.
+        :rtype: str
+        """
+        if self._path is None:
+            fd, path = tempfile.mkstemp(suffix='.msz')
+            os.close(fd)
+            self.write(path)
+            weakref.finalize(self, os.remove, path)
+            self._path = path
+        return self._path
+
+    def write(self, path: str) -> None:
+        """
+        Write the size field to a NETGEN mesh size file (.msz).
+
+        :param str path: File path.
+        :return: None
+        :rtype: None
+        """
+        data = np.column_stack([self._points, self._sizes])
+        with open(path, 'w') as f:
+            f.write(f'{len(data)}\n')
+            np.savetxt(f, data, fmt='%.17g')
+            f.write('0\n')
+
+
+class MeshControl:
+    """
+    Controls mesh generation.
+
+    :ivar IMeshControl imeshcontrol: Underlying mesh control.
+    """
+
+    # Fineness and number of optimization steps of each preset
+    _PRESETS = {
+        'draft': (Fineness.COARSE, 1),
+        'standard': (Fineness.MODERATE, 3),
+        'fine': (Fineness.FINE, 5),
+    }
+
+    @classmethod
+    def by_control_1d(cls, shape: Shape, edge_size: Optional[float] = None,
+                      deflection: Optional[float] = None) -> MeshControl:
+        """
+        Create 1D mesh control.
+
+        If a deflection is given, edges are refined where they are curved so that segments
+        deviate from the edge by at most the deflection, and the edge size becomes the maximum
+        segment length.
+
+        :param Shape shape: Shape to control.
+        :param Optional[float] edge_size: Edge size.
+        :param Optional[float] deflection: Maximum distance between segments and the edge.
+        :return: New mesh control.
+        :rtype: MeshControl
+        """
+        c = IMeshControl.Make1D(shape.ishape, edge_size, deflection)
+        return cls(c)
+
+    @classmethod
+    def by_control_2d(cls, shape: Shape, edge_size: Optional[float] = None,
+                      deflection: Optional[float] = None, allow_quads: bool = False) -> MeshControl:
+        """
+        Create 2D mesh control.
+
+        If a deflection is given, elements are refined where the surface is curved so that they
+        deviate from it by at most the deflection, and the edge size becomes the maximum element
+        size.
+
+        :param Shape shape: Shape to control.
+        :param Optional[float] edge_size: Edge size.
+        :param Optional[float] deflection: Maximum distance between elements and the surface.
+        :param bool allow_quads: Whether to allow quadrilaterals.
+        :return: New mesh control.
+        :rtype: MeshControl
+        """
+        c = IMeshControl.Make2D(shape.ishape, edge_size, deflection, allow_quads)
+        return cls(c)
+
+    @classmethod
+    def by_control_3d(cls, shape: Shape, edge_size: Optional[float] = None,
+                      deflection: Optional[float] = None) -> MeshControl:
+        """
+        Create 3D mesh control.
+
+        If a deflection is given, elements are refined where the boundary is curved so that
+        surface elements deviate from it by at most the deflection, and the edge size becomes
+        the maximum element size.
+
+        :param Shape shape: Shape to control.
+        :param Optional[float] edge_size: Edge size.
+        :param Optional[float] deflection: Maximum distance between elements and the surface.
+        :return: New mesh control.
+        :rtype: MeshControl
+        """
+        c = IMeshControl.Make3D(shape.ishape, edge_size, deflection)
+        return cls(c)
+
+    @classmethod
+    def by_sizes(cls, dimension: int, shapes: MapShape | Iterable[Shape], edge_sizes: np.ndarray,
+                 deflection: Optional[float] = None,
+                 allow_quads: bool = False) -> list[MeshControl]:
+        """
+        Create local mesh controls of many shapes at once from an array of edge sizes.
+
+        The controls are created in one call, in the order of the shapes, and shapes with equal
+        sizes share the same hypotheses once applied.
+
+        :param int dimension: Dimension of the controls (1, 2, or 3).
+        :param shapes: Shapes to control.
+        :type shapes: MapShape or Iterable[Shape]
+        :param numpy.ndarray edge_sizes: Edge size of each shape.
+        :param Optional[float] deflection: Maximum distance between elements and the shapes.
+        :param bool allow_quads: Whether to allow quadrilaterals (2D controls only).
+        :return: New mesh controls.
+        :rtype: list[MeshControl]
+        :raises ValueError: If the number of edge sizes does not match the number of shapes.
+        :raises IMeshControlError: If the dimension is not supported or an edge size is not
+            positive.
+        """
+        if isinstance(shapes, MapShape):
+            targets = shapes.itool
+        else:
+            targets = [s.ishape for s in shapes]
+        edge_sizes = np.ravel(np.asarray(edge_sizes, dtype=float))
+        return [cls(c) for c in IMeshControl.MakeBulk(dimension, targets, edge_sizes, deflection,
+                                                      allow_quads)]
+
+    def __init__(self, c: IMeshControl, size_field: Optional[SizeField] = None):
+        """
+        Initialize from an IMeshControl.
+
+        :param IMeshControl c: Underlying mesh control.
+        :param Optional[SizeField] size_field: Size field whose file is used by the control.
+        """
+        assert isinstance(c, IMeshControl)
+        self._icontrol = c
+        self._size_field = size_field
+
+    @property
+    def imeshcontrol(self) -> IMeshControl:
+        """
+        Underlying mesh control.
+
+        :return: IMeshControl object.
+        :rtype: IMeshControl
+        """
+        return self._icontrol
+
+    @property
+    def dimension(self) -> int:
+        """
+        Dimension of the mesh control.
+
+        :return: Dimension (1, 2, or 3).
+        :rtype: int
+        """
+        return self.imeshcontrol.Dimension()
+
+    @property
+    def shape(self) -> Shape:
+        """
+        Shape the mesh control is applied to.
+
+        :return: Controlled shape.
+        :rtype: Shape
+        """
+        return Shape.by_ishape(self.imeshcontrol.Shape())
+
+    @property
+    def edge_size(self) -> Optional[float]:
+        """
+        Edge size.
+
+        :return: Size value.
+        :rtype: Optional[float]
+        """
+        return self.imeshcontrol.EdgeSize()
+
+    @property
+    def deflection(self) -> Optional[float]:
+        """
+        Deflection.
+
+        :return: Deflection value.
+        :rtype: Optional[float]
+        """
+        return self.imeshcontrol.Deflection()
+
+    @property
+    def allow_quads(self) -> Optional[bool]:
+        """
+        Whether quadrilaterals are allowed.
+
+        :return: True if allowed.
+        :rtype: Optional[bool]
+        """
+        return self.imeshcontrol.AllowQuads()
+
+    @property
+    def size_field(self) -> Optional[SizeField]:
+        """
+        Background size field.
+
+        :return: Size field.
+        :rtype: Optional[SizeField]
+        """
+        return self._size_field
+
+    @property
+    def fineness(self) -> Optional[Fineness]:
+        """
+        NETGEN fineness.
+
+        :return: Fineness level, or None for the NETGEN default.
+        :rtype: Optional[Fineness]
+        """
+        fineness = self.imeshcontrol.Fineness()
+        return None if fineness is None else Fineness(fineness)
+
+    @property
+    def growth_rate(self) -> Optional[float]:
+        """
+        NETGEN growth rate of element sizes.
+
+        :return: Growth rate, or None for the default of the fineness.
+        :rtype: Optional[float]
+        """
+        return self.imeshcontrol.GrowthRate()
+
+    @property
+    def surface_opt_steps(self) -> Optional[int]:
+        """
+        Number of NETGEN surface optimization steps.
+
+        :return: Number of steps, or None for the NETGEN default.
+        :rtype: Optional[int]
+        """
+        return self.imeshcontrol.SurfaceOptSteps()
+
+    @property
+    def volume_opt_steps(self) -> Optional[int]:
+        """
+        Number of NETGEN volume optimization steps.
+
+        :return: Number of steps, or None for the NETGEN default.
+        :rtype: Optional[int]
+        """
+        return self.imeshcontrol.VolumeOptSteps()
+
+    def with_size_field(self, size_field: SizeField) -> MeshControl:
+        """
+        Create a copy of this control that grades element sizes with a background size field.
+
+        Only 2D and 3D controls support size fields.
+
+        :param SizeField size_field: Size field.
+        :return: New mesh control.
+        :rtype: MeshControl
+        :raises IMeshControlError: If this is a 1D control.
+        """
+        c = self.imeshcontrol.WithSizeFile(size_field.path)
+        return MeshControl(c, size_field)
+
+    def with_optimization(self, fineness: Optional[Fineness] = None,
+                          growth_rate: Optional[float] = None,
+                          surface_opt_steps: Optional[int] = None,
+                          volume_opt_steps: Optional[int] = None) -> MeshControl:
+        """
+        Create a copy of this control with NETGEN fineness and optimization parameters.
+
+        Fewer optimization steps and a coarser fineness trade element quality for speed. Only
+        2D and 3D controls support these parameters. An explicit growth rate overrides the one
+        set by the fineness.
+
+        A control with any of these parameters is applied by the full NETGEN hypothesis instead
+        of the simple one, which only sets the element size. Besides the growth rate and the
+        optimization steps, the full hypothesis refines short edges and curved boundaries by the
+        segments per edge and per radius of the fineness. Unset values keep the defaults of the
+        full hypothesis, i.e., moderate fineness and three optimization steps.
+
+        :param Optional[Fineness] fineness: Fineness level.
+        :param Optional[float] growth_rate: Growth rate of element sizes in (0, 1].
+        :param Optional[int] surface_opt_steps: Number of surface optimization steps.
+        :param Optional[int] volume_opt_steps: Number of volume optimization steps.
+        :return: New mesh control.
+        :rtype: MeshControl
+        :raises IMeshControlError: If this is a 1D control or a parameter is out of range.
+        """
+        c = self.imeshcontrol.WithNetgenParameters(
+            None if fineness is None else fineness.value, growth_rate, surface_opt_steps,
+            volume_opt_steps)
+        return MeshControl(c, self._size_field)
+
+    def with_preset(self, preset: str) -> MeshControl:
+        """
+        Create a copy of this control with a named speed versus quality preset.
+
+        * ``'draft'``: Coarse fineness and one optimization step, for fast preliminary meshes.
+        * ``'standard'``: Moderate fineness and three optimization steps, the defaults of the
+          full NETGEN hypothesis.
+        * ``'fine'``: Fine fineness and five optimization steps, for better element quality.
+
+        Every preset switches the control to the full NETGEN hypothesis (see
+        :meth:`with_optimization`), so even ``'standard'`` is not the mesh of this control
+        without a preset: curved faces are refined to at least two elements per radius, and
+        small features are refined as well.
+
+        :param str preset: Name of the preset.
+        :return: New mesh control.
+        :rtype: MeshControl
+        :raises ValueError: If the preset is unknown.
+        :raises IMeshControlError: If this is a 1D control.
+        """
+        if preset not in self._PRESETS:
+            raise ValueError(f'Unknown preset {preset!r}, expected one of {list(self._PRESETS)}.')
+        fineness, steps = self._PRESETS[preset]
+        return self.with_optimization(fineness, None, steps, steps)
+
+
+class CancelToken:
+    """
+    Token to cancel mesh generation from another thread.
+
+    Cancelling a token aborts running computations that use it, and any later computation using
+    it fails immediately. NETGEN aborts through a process-global flag, so only one computation
+    runs at a time and a token is only registered with its computation while it runs. This way,
+    cancelling a token never aborts the computations of other tokens.
+
+    :ivar IMeshCancelToken imeshcanceltoken: Underlying token.
+    """
+
+    def __init__(self):
+        """
+        Initialize a token that is not cancelled.
+        """
+        self._token = IMeshCancelToken()
+
+    @property
+    def imeshcanceltoken(self) -> IMeshCancelToken:
+        """
+        Underlying token.
+
+        :return: IMeshCancelToken object.
+        :rtype: IMeshCancelToken
+        """
+        return self._token
+
+    @property
+    def cancelled(self) -> bool:
+        """
+        Whether cancellation was requested.
+
+        :return: True if cancelled.
+        :rtype: bool
+        """
+        return self._token.IsCancelled()
+
+    def cancel(self) -> None:
+        """
+        Request cancellation of running and later computations using this token.
+
+        :return: None.
+        """
+        self._token.Cancel()
+
+
+class MeshGenerator:
+    """
+    Generator shared by meshes to reuse one SMESH generator and hypotheses.
+
+    Hypotheses and algorithms are created once per set of control parameters and shared by all
+    meshes generated with it. Meshes are generated one at a time by the same generator. When
+    closed, the hypothesis table is released, while hypotheses still used by existing meshes are
+    kept alive until those meshes are deleted. Use as a context manager to close it on exit.
+
+    :ivar IMeshGenerator imeshgenerator: Underlying generator.
+    """
+
+    def __init__(self):
+        """
+        Initialize an open generator.
+        """
+        self._generator = IMeshGenerator()
+
+    def __enter__(self) -> MeshGenerator:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def imeshgenerator(self) -> IMeshGenerator:
+        """
+        Underlying generator.
+
+        :return: IMeshGenerator object.
+        :rtype: IMeshGenerator
+        """
+        return self._generator
+
+    @property
+    def closed(self) -> bool:
+        """
+        Whether the generator is closed.
+
+        :return: True if closed.
+        :rtype: bool
+        """
+        return self._generator.IsClosed()
+
+    @property
+    def num_hypotheses(self) -> int:
+        """
+        Number of hypotheses and algorithms in the table.
+
+        :return: Hypothesis count.
+        :rtype: int
+        """
+        return self._generator.NumHypotheses()
+
+    def generate(self, shape: Shape, global_control: MeshControl,
+                 local_controls: Optional[Iterable[MeshControl]] = None,
+                 cache: Optional[MeshCache] = None,
+                 cancel_token: Optional[CancelToken] = None, assembly: bool = False) -> Mesh:
+        """
+        Generate a mesh for a shape using this generator.
+
+        :param Shape shape: Shape to mesh.
+        :param MeshControl global_control: Global mesh control.
+        :param Optional[Iterable[MeshControl]] local_controls: Local mesh controls.
+        :param Optional[MeshCache] cache: Mesh cache.
+        :param Optional[CancelToken] cancel_token: Token to cancel the computation.
+        :param bool assembly: Option to fuse touching bodies first for a conformal mesh.
+        :return: Generated mesh.
+        :rtype: Mesh
+        :raises RuntimeError: If the generator is closed.
+
+        .. seealso:: :meth:`Mesh.generate`
+        """
+        return Mesh.generate(shape, global_control, local_controls, cache, cancel_token, self,
+                             assembly)
+
+    def close(self) -> None:
+        """
+        Close the generator and release its hypothesis table.
+
+        :return: None.
+        """
+        self._generator.Close()
+
+
+def _vtk_grid(arrays: tuple):
+    """
+    Wrap the arrays returned by ``VTKArrays`` in a VTK unstructured grid without copying.
+
+    :param tuple arrays: Points, connectivity, cell offsets, cell types, cell sub-shape IDs,
+        and point sub-shape IDs.
+    :return: Unstructured grid.
+    :rtype: vtkmodules.vtkCommonDataModel.vtkUnstructuredGrid
+    :raises ImportError: If the ``vtk`` package is not installed.
+    """
+    try:
+        from vtkmodules.util.numpy_support import numpy_to_vtk, numpy_to_vtkIdTypeArray
+        from vtkmodules.vtkCommonCore import vtkPoints
+        from vtkmodules.vtkCommonDataModel import vtkCellArray, vtkUnstructuredGrid
+    except ImportError as e:
+        raise ImportError("The vtk package is required to build a VTK grid.") from e
+
+    points, connectivity, offsets, types, cell_shape_ids, point_shape_ids = arrays
+
+    vtk_points = vtkPoints()
+    vtk_points.SetData(numpy_to_vtk(points, deep=False))
+    cells = vtkCellArray()
+    cells.SetData(numpy_to_vtkIdTypeArray(offsets, deep=False),
+                  numpy_to_vtkIdTypeArray(connectivity, deep=False))
+
+    grid = vtkUnstructuredGrid()
+    grid.SetPoints(vtk_points)
+    grid.SetCells(numpy_to_vtk(types, deep=False), cells)
+
+    for data, ids in ((grid.GetPointData(), point_shape_ids),
+                      (grid.GetCellData(), cell_shape_ids)):
+        array = numpy_to_vtk(ids, deep=False)
+        array.SetName('ShapeId')
+        data.AddArray(array)
+
+    return grid
+
+
+class Mesh:
+    """
+    Represents a generated mesh.
+
+    :ivar IMesh imesh: Underlying mesh.
+    """
+
+    @classmethod
+    def generate(cls, shape: Shape, global_control: MeshControl, local_controls: Optional[Iterable[
+        MeshControl]] = None, cache: Optional[MeshCache] = None,
+                 cancel_token: Optional[CancelToken] = None,
+                 generator: Optional[MeshGenerator] = None, assembly: bool = False) -> Mesh:
+        """
+        Generate a mesh for a shape.
+
+        NETGEN keeps its parameters and terminate flag in process-global state, so the NETGEN
+        computations of all meshes in the process, including those of other threads, run one at a
+        time. To mesh independent shapes concurrently, generate them in separate processes.
+
+        If a cache is provided, a mesh previously generated for the same shape and controls is
+        loaded from the cache instead of being computed, and newly computed meshes are stored in
+        it.
+
+        The GIL is released while meshing, so other Python threads keep running.
+
+        If a generator is provided, the mesh shares its generator and hypotheses with other
+        meshes generated by it. Otherwise, the mesh gets a private generator.
+
+        In assembly mode, the solids of the shape (or its faces if it has no solids) are first
+        split by a general fuse so that touching bodies share a single face at each interface.
+        Each shared face is then meshed once and used by the solids on both sides, which gives a
+        conformal mesh for multi-material analysis. Controls apply to the images of their
+        targets in the fused shape, available from :attr:`shape`.
+
+        :param Shape shape: Shape to mesh.
+        :param MeshControl global_control: Global mesh control.
+        :param Optional[Iterable[MeshControl]] local_controls: Local mesh controls.
+        :param Optional[MeshCache] cache: Mesh cache.
+        :param Optional[CancelToken] cancel_token: Token to cancel the computation.
+        :param Optional[MeshGenerator] generator: Generator to share.
+        :param bool assembly: Option to fuse touching bodies first for a conformal mesh.
+        :return: Generated mesh.
+        :rtype: Mesh
+        :raises IMeshCancelledError: If the computation is cancelled.
+        :raises IMeshComputeError: If the general fuse of an assembly fails.
+        :raises RuntimeError: If the generator is closed.
+        """
+        local_controls = [] if local_controls is None else list(local_controls)
+
+        if cache is not None:
+            key = cache.key(shape, global_control, local_controls, assembly)
+            mesh = cache.load(key, None if assembly else shape)
+            if mesh is not None:
+                return mesh
+
+        local_imeshcontrols = [c.imeshcontrol for c in local_controls]
+        token = None if cancel_token is None else cancel_token.imeshcanceltoken
+        imeshgenerator = None if generator is None else generator.imeshgenerator
+        imesh = IMesh.MakeMesh(shape.ishape, global_control.imeshcontrol, local_imeshcontrols,
+                               token, imeshgenerator, assembly)
+        mesh = cls(imesh)
+
+        if cache is not None:
+            cache.store(key, mesh)
+
+        return mesh
+
+    @classmethod
+    async def generate_async(cls, shape: Shape, global_control: MeshControl,
+                             local_controls: Optional[Iterable[MeshControl]] = None,
+                             cache: Optional[MeshCache] = None,
+                             cancel_token: Optional[CancelToken] = None,
+                             timeout: Optional[float] = None,
+                             executor: Optional[Executor] = None,
+                             generator: Optional[MeshGenerator] = None,
+                             assembly: bool = False) -> Mesh:
+        """
+        Generate a mesh for a shape on an executor without blocking the event loop.
+
+        If the timeout expires or the awaiting task is cancelled, the token is cancelled so that
+        the computation is aborted and the executor thread is released.
+
+        :param Shape shape: Shape to mesh.
+        :param MeshControl global_control: Global mesh control.
+        :param Optional[Iterable[MeshControl]] local_controls: Local mesh controls.
+        :param Optional[MeshCache] cache: Mesh cache.
+        :param Optional[CancelToken] cancel_token: Token to cancel the computation.
+        :param Optional[float] timeout: Timeout in seconds.
+        :param Optional[Executor] executor: Executor to run on. The default executor of the
+            event loop is used if not provided.
+        :param Optional[MeshGenerator] generator: Generator to share.
+        :param bool assembly: Option to fuse touching bodies first for a conformal mesh.
+        :return: Generated mesh.
+        :rtype: Mesh
+        :raises asyncio.TimeoutError: If the timeout expires.
+        :raises IMeshCancelledError: If the computation is cancelled through the token.
+        """
+        token = CancelToken() if cancel_token is None else cancel_token
+        local_controls = None if local_controls is None else list(local_controls)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(executor, functools.partial(
+            cls.generate, shape, global_control, local_controls, cache, token, generator, assembly))
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # Retrieve the outcome of the abandoned computation so that its cancellation error is
+            # not logged as never retrieved
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            token.cancel()
+            raise
+
+    @classmethod
+    def estimate(cls, shape: Shape, global_control: MeshControl,
+                 local_controls: Optional[Iterable[MeshControl]] = None) -> MeshEstimate:
+        """
+        Estimate the size, time, and memory of a mesh computation without meshing.
+
+        No mesher runs, so the estimate takes about as long as a few geometric queries per
+        sub-shape and can be used to reject or re-queue oversized jobs up front.
+
+        :param Shape shape: Shape to mesh.
+        :param MeshControl global_control: Global mesh control.
+        :param Optional[Iterable[MeshControl]] local_controls: Local mesh controls.
+        :return: Mesh estimate.
+        :rtype: MeshEstimate
+        :raises IMeshControlError: If the mesh size file of a size field cannot be read.
+        """
+        local_controls = [] if local_controls is None else list(local_controls)
+        return MeshEstimate(EstimateIMesh(shape.ishape, global_control.imeshcontrol,
+                                          [c.imeshcontrol for c in local_controls]))
+
+    @classmethod
+    def by_unv(cls, path: str) -> Mesh:
+        """
+        Import a mesh from a UNV file.
+
+        The imported mesh is not associated with a shape.
+
+        :param str path: File path.
+        :return: Imported mesh.
+        :rtype: Mesh
+        :raises FileNotFoundError: If the file does not exist.
+        """
+        if not os.path.isfile(path):
+            raise FileNotFoundError(path)
+        return cls(IMesh.ImportUNV(path))
+
+    def __init__(self, m: IMesh):
+        """
+        Initialize from an IMesh.
+
+        :param IMesh m: Underlying mesh.
+        """
+        assert isinstance(m, IMesh)
+        self._imesh = m
+
+    @property
+    def imesh(self) -> IMesh:
+        """
+        Underlying mesh.
+
+        :return: IMesh object.
+        :rtype: IMesh
+        """
+        return self._imesh
+
+    @property
+    def shape(self) -> Optional[Shape]:
+        """
+        Meshed shape.
+
+        For assembly meshes, this is the fused shape whose sub-shapes are used by sub-shape
+        queries and shape IDs.
+
+        :return: Meshed shape, or *None* if the mesh was imported.
+        :rtype: Shape or None
+        """
+        ishape = self._imesh.Shape()
+        return None if ishape is None else Shape.by_ishape(ishape)
+
+    @property
+    def num_nodes(self) -> int:
+        """
+        Number of nodes in the mesh.
+
+        :return: Node count.
+        :rtype: int
+        """
+        return self.imesh.NumNodes()
+
+    @property
+    def num_tetras(self) -> int:
+        """
+        Number of tetrahedra in the mesh.
+
+        :return: Tetrahedron count.
+        :rtype: int
+        """
+        return self.imesh.NumTetras()
+
+    @property
+    def nodes(self) -> np.ndarray:
+        """
+        Node coordinates.
+
+        :return: Array of shape (N, 3) with the coordinates of each node.
+        :rtype: numpy.ndarray
+        """
+        return self.imesh.Nodes()
+
+    def elements(self, kind: ElementKind) -> np.ndarray:
+        """
+        Element connectivity for a kind of element.
+
+        :param ElementKind kind: Kind of elements.
+        :return: Array of shape (M, k) with 0-based indices into :attr:`nodes` for the corner
+            nodes of each element.
+        :rtype: numpy.ndarray
+        """
+        return self.imesh.Elements(kind.value)
+
+    def quality(self, metric: QualityMetric, threads: int = 1) -> np.ndarray:
+        """
+        Quality metric of each tetrahedron.
+
+        :param QualityMetric metric: Quality metric.
+        :param int threads: Number of threads used to compute the metric.
+        :return: Array with one value per tetrahedron, in the same order as
+            ``elements(ElementKind.TETRA)``.
+        :rtype: numpy.ndarray
+        :raises ValueError: If threads is less than one.
+        """
+        if threads < 1:
+            raise ValueError("Number of threads must be at least one.")
+        return self.imesh.Quality(metric.value, threads)
+
+    def quality_summary(self, metric: QualityMetric, bins: int = 10,
+                        threads: int = 1) -> QualitySummary:
+        """
+        Summary statistics and histogram of a quality metric of the tetrahedra.
+
+        :param QualityMetric metric: Quality metric.
+        :param int bins: Number of histogram bins.
+        :param int threads: Number of threads used to compute the metric.
+        :return: Quality summary.
+        :rtype: QualitySummary
+        """
+        return QualitySummary(self.quality(metric, threads), bins)
+
+    def nodes_on(self, subshape: Shape) -> np.ndarray:
+        """
+        Nodes on a sub-shape of the meshed shape.
+
+        Nodes on the boundary of the sub-shape are included, e.g., the nodes on the edges and
+        vertices of a face. The nodes are grouped by sub-shape once and reused afterwards.
+
+        :param Shape subshape: Sub-shape of the meshed shape.
+        :return: Sorted array of 0-based indices into :attr:`nodes`.
+        :rtype: numpy.ndarray
+        :raises IMeshControlError: If the mesh is not associated with a shape or the shape is not
+            a sub-shape of it.
+        """
+        return self.imesh.NodesOn(subshape.ishape)
+
+    def elements_on(self, subshape: Shape, kind: ElementKind) -> np.ndarray:
+        """
+        Elements of a kind on a sub-shape of the meshed shape.
+
+        Elements on the boundary of the sub-shape are included, e.g., the triangles on the
+        faces of a solid. The elements are grouped by sub-shape once and reused afterwards.
+
+        :param Shape subshape: Sub-shape of the meshed shape.
+        :param ElementKind kind: Kind of elements.
+        :return: Sorted array of 0-based indices into ``elements(kind)``.
+        :rtype: numpy.ndarray
+        :raises IMeshControlError: If the mesh is not associated with a shape or the shape is not
+            a sub-shape of it.
+        """
+        return self.imesh.ElementsOn(subshape.ishape, kind.value)
+
+    def nodes_on_all(self, kind: ShapeKind) -> list[np.ndarray]:
+        """
+        Nodes on each sub-shape of a kind of the meshed shape.
+
+        :param ShapeKind kind: Kind of sub-shapes.
+        :return: List with one array of node indices per sub-shape, in the same order as the
+            sub-shapes in :class:`pyocctlite.topology.MapShape`.
+        :rtype: list(numpy.ndarray)
+        :raises IMeshControlError: If the mesh is not associated with a shape.
+
+        .. seealso:: :meth:`nodes_on`
+        """
+        return self.imesh.NodesOnAll(kind.value)
+
+    def elements_on_all(self, kind: ShapeKind, element_kind: ElementKind) -> list[np.ndarray]:
+        """
+        Elements of a kind on each sub-shape of a kind of the meshed shape.
+
+        :param ShapeKind kind: Kind of sub-shapes.
+        :param ElementKind element_kind: Kind of elements.
+        :return: List with one array of element indices per sub-shape, in the same order as the
+            sub-shapes in :class:`pyocctlite.topology.MapShape`.
+        :rtype: list(numpy.ndarray)
+        :raises IMeshControlError: If the mesh is not associated with a shape.
+
+        .. seealso:: :meth:`elements_on`
+        """
+        return self.imesh.ElementsOnAll(kind.value, element_kind.value)
+
+    def nearest_nodes(self, points: np.ndarray) -> np.ndarray:
+        """
+        Nearest node to each point.
+
+        A KD-tree over the nodes is built on first use of a spatial query and reused afterwards.
+
+        :param numpy.ndarray points: Array of shape (N, 3) with point coordinates.
+        :return: Array with the 0-based index into :attr:`nodes` of the nearest node to each
+            point.
+        :rtype: numpy.ndarray
+        :raises ValueError: If the points are not an (N, 3) array.
+        """
+        return self.imesh.NearestNodes(np.asarray(points, dtype=float))
+
+    def locate_tetras(self, points: np.ndarray,
+                      tol: float = 1.e-9) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Tetrahedron containing each point and the barycentric coordinates of the point in it.
+
+        A bounding volume hierarchy over the tetrahedra is built on first use of a spatial
+        query and reused afterwards.
+
+        :param numpy.ndarray points: Array of shape (N, 3) with point coordinates.
+        :param float tol: Tolerance on the barycentric coordinates for points on the boundary
+            of a tetrahedron.
+        :return: Array with the 0-based index into ``elements(ElementKind.TETRA)`` of the
+            containing tetrahedron of each point (-1 if none), and array of shape (N, 4) with
+            the barycentric coordinates of each point w.r.t. the corner nodes of the tetrahedron
+            (zeros if none).
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        :raises ValueError: If the points are not an (N, 3) array.
+        """
+        return self.imesh.LocateTetras(np.asarray(points, dtype=float), tol)
+
+    def remesh(self, changed_controls: Iterable[MeshControl]) -> None:
+        """
+        Replace or add local controls and recompute the mesh in place.
+
+        A control replaces the one previously applied to the same shape and dimension, or is
+        added if there is none. The sub-meshes of the changed shapes are cleared along with those
+        depending on them, which are the solids containing them and the faces sharing an edge
+        with them since their boundary changes. Clearing a solid also clears the edge and face
+        meshes its NETGEN 2D/3D algorithm computed, so only edges and faces with controls of
+        their own that are not adjacent to a changed shape keep their mesh and are not
+        recomputed. Meshes loaded from a file or a cache have no controls and cannot be
+        remeshed.
+
+        :param Iterable[MeshControl] changed_controls: Changed or new mesh controls.
+        :return: None.
+        :raises IMeshControlError: If the mesh is not associated with a shape or has no controls.
+        :raises IMeshComputeError: If the mesh computation fails.
+        :raises RuntimeError: If the generator of the mesh is closed.
+        """
+        self.imesh.Remesh([c.imeshcontrol for c in changed_controls])
+
+    def replicate(self, transforms: Iterable[Transform], tolerance: float = 1.0e-7) -> Mesh:
+        """
+        Build a mesh of transformed copies of this mesh without remeshing them.
+
+        The new mesh holds one copy per transform, so an identity transform keeps the original
+        placement. If the mesh is associated with a shape, the new mesh is associated with a
+        compound of the transformed shapes. Nodes of a copy closer than the tolerance to a node of
+        a previous copy are merged with it, so copies meeting on a symmetry plane share their
+        nodes. Elements of a mirrored copy are reoriented to keep positive volumes.
+
+        :param Iterable[Transform] transforms: Transforms of the copies.
+        :param float tolerance: Node merging tolerance (0 to not merge nodes).
+        :return: The replicated mesh.
+        :rtype: Mesh
+        :raises RuntimeError: If the generator of the mesh is closed.
+        """
+        return Mesh(self.imesh.Replicate([t.itransform for t in transforms], tolerance))
+
+    def export_unv(self, path: str) -> None:
+        """
+        Export the mesh to a UNV file.
+
+        :param str path: File path.
+        :return: None
+        :rtype: None
+        """
+        self.imesh.ExportUNV(path)
+
+    def export_med(self, path: str) -> None:
+        """
+        Export the mesh to a MED file.
+
+        :param str path: File path.
+        :return: None
+        :rtype: None
+        """
+        self.imesh.ExportMED(path)
+
+    def export_msh(self, path: str) -> None:
+        """
+        Export the mesh to a binary Gmsh MSH 4.1 file.
+
+        Nodes and elements are streamed from the mesh to the file in chunks without copying the
+        mesh. Only the corner nodes of elements are written.
+
+        :param str path: File path.
+        :return: None
+        :rtype: None
+        """
+        self.imesh.ExportMSH(path)
+
+    def export_vtu(self, path: str) -> None:
+        """
+        Export the mesh to a VTK XML unstructured grid file with appended binary data.
+
+        Nodes and elements are streamed from the mesh to the file in chunks without copying the
+        mesh. Only the corner nodes of elements are written.
+
+        :param str path: File path.
+        :return: None
+        :rtype: None
+        """
+        self.imesh.ExportVTU(path)
+
+    def to_vtk(self):
+        """
+        Build a VTK unstructured grid of the mesh in memory.
+
+        The arrays of the grid are filled directly from the mesh without freezing it first, and
+        the VTK arrays wrap them without copying. Requires the ``vtk`` package.
+
+        :return: Unstructured grid.
+        :rtype: vtkmodules.vtkCommonDataModel.vtkUnstructuredGrid
+        :raises ImportError: If the ``vtk`` package is not installed.
+
+        .. seealso:: :meth:`FrozenMesh.to_vtk`
+        """
+        return _vtk_grid(self.imesh.VTKArrays())
+
+    def export_native(self, path: str, compress: bool = False) -> None:
+        """
+        Export the mesh to the native binary container read by :class:`MeshFile`.
+
+        Each array is streamed from the mesh to the file one row at a time (one chunk at a time
+        if compressed) without copying the mesh.
+
+        .. seealso:: :meth:`FrozenMesh.export_native`
+
+        :param str path: File path.
+        :param bool compress: Option to compress each array in chunks with zlib.
+        :return: None
+        :rtype: None
+        """
+        self.imesh.ExportNative(path, compress)
+
+    def shape_id(self, subshape: Shape) -> int:
+        """
+        ID of a sub-shape as used by the shape IDs of a frozen mesh.
+
+        :param Shape subshape: Sub-shape of the meshed shape.
+        :return: Sub-shape ID, or 0 if not a sub-shape of the meshed shape.
+        :rtype: int
+        """
+        return self.imesh.ShapeId(subshape.ishape)
+
+    @property
+    def report(self) -> MeshReport:
+        """
+        Report of the last computation by :meth:`generate` or :meth:`remesh`.
+
+        Meshes imported from a file, including those loaded from a :class:`MeshCache`, have an
+        empty report.
+
+        :return: Mesh report.
+        :rtype: MeshReport
+        """
+        return MeshReport(self.imesh.Report())
+
+    def freeze(self) -> FrozenMesh:
+        """
+        Copy the mesh into a compact read-only mesh.
+
+        The frozen mesh holds contiguous node and connectivity arrays and the sub-shape ID of
+        each node and element, but no reference to the SMESH structures or the meshed shape.
+        These are released once this mesh is deleted.
+
+        :return: Frozen mesh.
+        :rtype: FrozenMesh
+        """
+        return FrozenMesh(self.imesh.Freeze())
+
+    def node_elements(self, kind: ElementKind) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Elements of a kind around each node.
+
+        The elements of node ``i`` are ``indices[indptr[i]:indptr[i + 1]]``. The arrays can be
+        used directly as a sparse node-to-element incidence matrix, e.g.,
+        ``scipy.sparse.csr_matrix((np.ones(indices.size), indices, indptr))``.
+
+        :param ElementKind kind: Kind of elements.
+        :return: CSR offsets (one more than the number of nodes) and sorted element indices
+            in the same order as ``elements(kind)``.
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        return self.imesh.NodeElements(kind.value)
+
+    def element_neighbors(self, kind: ElementKind) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Elements of a kind sharing a facet with each element.
+
+        Facets are the faces of tetrahedra and the edges of triangles and quadrangles. Elements
+        on the boundary have fewer neighbors than facets.
+
+        :param ElementKind kind: Kind of elements.
+        :return: CSR offsets (one more than the number of elements) and element indices in the
+            same order as ``elements(kind)``.
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        return self.imesh.ElementNeighbors(kind.value)
+
+    def node_neighbors(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Nodes sharing an element with each node.
+
+        This is the sparsity pattern of matrices assembled from the mesh, without the diagonal.
+
+        :return: CSR offsets (one more than the number of nodes) and sorted node indices.
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        return self.imesh.NodeNeighbors()
+
+    @property
+    def bandwidth(self) -> int:
+        """
+        Largest index difference between two nodes sharing an element.
+
+        This bounds the bandwidth of matrices assembled from the mesh in its node numbering.
+
+        :return: Bandwidth.
+        :rtype: int
+        """
+        return self.imesh.Bandwidth()
+
+    def renumber(self, method: str = 'rcm', apply: bool = True) -> NodeRenumbering:
+        """
+        Renumber the nodes to reduce the bandwidth.
+
+        The ``'rcm'`` method orders the nodes by reverse Cuthill-McKee on the graph of nodes
+        sharing an element, starting each connected part from a pseudo-peripheral node. If
+        applied, node arrays, connectivity, sub-shape queries, and all exports use the new
+        numbering until the mesh is recomputed by :meth:`remesh`.
+
+        :param str method: Renumbering method. Only ``'rcm'`` is supported.
+        :param bool apply: Option to apply the new numbering to this mesh, or only return it.
+        :return: Node order with the bandwidth before and after.
+        :rtype: NodeRenumbering
+        :raises ValueError: If the method is not supported.
+        """
+        if method != 'rcm':
+            raise ValueError(f"Unsupported renumbering method: {method}")
+
+        order = self.imesh.ReverseCuthillMcKee()
+        before = self.imesh.Bandwidth()
+        after = self.imesh.Bandwidth(order)
+        if apply:
+            self.imesh.Renumber(order)
+        return NodeRenumbering(order, before, after)
+
+    def partition(self, n_parts: int) -> MeshPartition:
+        """
+        Partition the mesh for distributed solvers.
+
+        The mesh is frozen first and the partition refers to that frozen copy, which it keeps
+        alive, instead of copying it again.
+
+        .. seealso:: :meth:`FrozenMesh.partition`
+
+        :param int n_parts: Number of parts.
+        :return: Mesh partition.
+        :rtype: MeshPartition
+        """
+        return self.freeze().partition(n_parts)
+
+
+class FrozenMesh:
+    """
+    Compact read-only mesh backed by contiguous arrays.
+
+    :ivar IFrozenMesh ifrozenmesh: Underlying frozen mesh.
+    """
+
+    def __init__(self, m: IFrozenMesh):
+        """
+        Initialize from an IFrozenMesh.
+
+        :param IFrozenMesh m: Underlying frozen mesh.
+        """
+        assert isinstance(m, IFrozenMesh)
+        self._ifrozenmesh = m
+
+    @property
+    def ifrozenmesh(self) -> IFrozenMesh:
+        """
+        Underlying frozen mesh.
+
+        :return: IFrozenMesh object.
+        :rtype: IFrozenMesh
+        """
+        return self._ifrozenmesh
+
+    @property
+    def num_nodes(self) -> int:
+        """
+        Number of nodes in the mesh.
+
+        :return: Node count.
+        :rtype: int
+        """
+        return self.ifrozenmesh.NumNodes()
+
+    @property
+    def num_tetras(self) -> int:
+        """
+        Number of tetrahedra in the mesh.
+
+        :return: Tetrahedron count.
+        :rtype: int
+        """
+        return self.ifrozenmesh.NumTetras()
+
+    @property
+    def nodes(self) -> np.ndarray:
+        """
+        Node coordinates.
+
+        :return: Array of shape (N, 3) with the coordinates of each node.
+        :rtype: numpy.ndarray
+        """
+        return self.ifrozenmesh.Nodes()
+
+    @property
+    def node_shape_ids(self) -> np.ndarray:
+        """
+        Sub-shape ID of each node.
+
+        :return: Array with one ID per node, 0 if the node is not on a sub-shape.
+        :rtype: numpy.ndarray
+
+        .. seealso:: :meth:`Mesh.shape_id`
+        """
+        return self.ifrozenmesh.NodeShapeIds()
+
+    def elements(self, kind: ElementKind) -> np.ndarray:
+        """
+        Element connectivity for a kind of element.
+
+        :param ElementKind kind: Kind of elements.
+        :return: Array of shape (M, k) with 0-based indices into :attr:`nodes` for the corner
+            nodes of each element.
+        :rtype: numpy.ndarray
+        """
+        return self.ifrozenmesh.Elements(kind.value)
+
+    def element_shape_ids(self, kind: ElementKind) -> np.ndarray:
+        """
+        Sub-shape ID of each element of a kind.
+
+        :param ElementKind kind: Kind of elements.
+        :return: Array with one ID per element, 0 if the element is not on a sub-shape.
+        :rtype: numpy.ndarray
+
+        .. seealso:: :meth:`Mesh.shape_id`
+        """
+        return self.ifrozenmesh.ElementShapeIds(kind.value)
+
+    def export_msh(self, path: str) -> None:
+        """
+        Export the mesh to a binary Gmsh MSH 4.1 file.
+
+        :param str path: File path.
+        :return: None
+        :rtype: None
+        """
+        self.ifrozenmesh.ExportMSH(path)
+
+    def export_vtu(self, path: str) -> None:
+        """
+        Export the mesh to a VTK XML unstructured grid file with appended binary data.
+
+        :param str path: File path.
+        :return: None
+        :rtype: None
+        """
+        self.ifrozenmesh.ExportVTU(path)
 
-class MeshControl:
+    def to_vtk(self):
+        """
+        Build a VTK unstructured grid of the mesh in memory.
+
+        The points, connectivity, offsets, and cell types are built in one pass into arrays laid
+        out as VTK expects, and the VTK arrays wrap these buffers without copying them. The
+        sub-shape ID of each node and element is attached as a ``ShapeId`` point and cell
+        array. Only the corner nodes of elements are used. Requires the ``vtk`` package.
+
+        :return: Unstructured grid.
+        :rtype: vtkmodules.vtkCommonDataModel.vtkUnstructuredGrid
+        :raises ImportError: If the ``vtk`` package is not installed.
+        """
+        return _vtk_grid(self.ifrozenmesh.VTKArrays())
+
+    def export_native(self, path: str, compress: bool = False) -> None:
+        """
+        Export the mesh to the native binary container read by :class:`MeshFile`.
+
+        The file holds a header, a table of arrays, and the node coordinates, node sub-shape
+        IDs, and the connectivity and sub-shape IDs of each element type, each aligned to 64
+        bytes. Uncompressed arrays are memory-mapped by readers. Compressed arrays are split
+        into chunks of about 4 MB so that readers only decompress the chunks they touch.
+
+        :param str path: File path.
+        :param bool compress: Option to compress each array in chunks with zlib.
+        :return: None
+        :rtype: None
+        """
+        self.ifrozenmesh.ExportNative(path, compress)
+
+    def partition(self, n_parts: int) -> MeshPartition:
+        """
+        Partition the mesh for distributed solvers.
+
+        The elements of highest dimension are partitioned by a multilevel recursive bisection of
+        their dual graph, in which elements sharing a facet are connected, so that parts have
+        about the same number of elements and few shared facets. Lower dimension elements are
+        assigned to the lowest part containing all their nodes.
+
+        :param int n_parts: Number of parts.
+        :return: Mesh partition.
+        :rtype: MeshPartition
+        :raises ValueError: If the number of parts is less than one.
+        """
+        return MeshPartition(PartitionIMesh(self.ifrozenmesh, n_parts))
+
+
+class MeshPartition:
     """
-    Controls mesh generation.
+    Partition of a mesh into parts.
 
-    :ivar IMeshControl imeshcontrol: Underlying mesh control.
+    :ivar PartitionIMesh itool: Underlying tool.
     """
 
-    @classmethod
-    def by_control_1d(cls, shape: Shape, edge_size: Optional[float] = None,
-                      deflection: Optional[float] = None) -> MeshControl:
+    def __init__(self, itool: PartitionIMesh):
         """
-        Create 1D mesh control.
+        Initialize from a PartitionIMesh.
 
-        :param Shape shape: Shape to control.
-        :param Optional[float] edge_size: Edge size.
-        :param Optional[float] deflection: Deflection.
-        :return: New mesh control.
-        :rtype: MeshControl
+        :param PartitionIMesh itool: Underlying tool.
         """
-        c = IMeshControl.Make1D(shape.ishape, edge_size, deflection)
-        return cls(c)
+        assert isinstance(itool, PartitionIMesh)
+        self._itool = itool
 
-    @classmethod
-    def by_control_2d(cls, shape: Shape, edge_size: Optional[float] = None,
-                      deflection: Optional[float] = None, allow_quads: bool = False) -> MeshControl:
+    @property
+    def itool(self) -> PartitionIMesh:
         """
-        Create 2D mesh control.
+        Underlying tool.
 
-        :param Shape shape: Shape to control.
-        :param Optional[float] edge_size: Edge size.
-        :param Optional[float] deflection: Deflection.
-        :param bool allow_quads: Whether to allow quadrilaterals.
-        :return: New mesh control.
-        :rtype: MeshControl
+        :return: PartitionIMesh object.
+        :rtype: PartitionIMesh
         """
-        c = IMeshControl.Make2D(shape.ishape, edge_size, deflection, allow_quads)
-        return cls(c)
+        return self._itool
 
-    @classmethod
-    def by_control_3d(cls, shape: Shape, edge_size: Optional[float] = None,
-                      deflection: Optional[float] = None) -> MeshControl:
+    @property
+    def n_parts(self) -> int:
         """
-        Create 3D mesh control.
+        Number of parts.
 
-        :param Shape shape: Shape to control.
-        :param Optional[float] edge_size: Edge size.
-        :param Optional[float] deflection: Deflection.
-        :return: New mesh control.
-        :rtype: MeshControl
+        :return: Part count.
+        :rtype: int
         """
-        c = IMeshControl.Make3D(shape.ishape, edge_size, deflection)
-        return cls(c)
+        return self._itool.NumParts()
 
-    def __init__(self, c: IMeshControl):
+    @property
+    def edge_cut(self) -> int:
         """
-        Initialize from an IMeshControl.
+        Number of pairs of elements sharing a facet that are in different parts.
 
-        :param IMeshControl c: Underlying mesh control.
+        :return: Edge cut of the dual graph.
+        :rtype: int
         """
-        assert isinstance(c, IMeshControl)
-        self._icontrol = c
+        return self._itool.EdgeCut()
+
+    def parts(self, kind: ElementKind) -> np.ndarray:
+        """
+        Part of each element of a kind.
+
+        :param ElementKind kind: Kind of elements.
+        :return: Array with the part of each element, in the same order as
+            ``elements(kind)``, or -1 for lower dimension elements not in any part.
+        :rtype: numpy.ndarray
+        """
+        return self._itool.Parts(kind.value)
+
+    def interface_nodes(self, part: int) -> np.ndarray:
+        """
+        Nodes of a part shared with other parts.
+
+        :param int part: Part index.
+        :return: Sorted array of global node indices.
+        :rtype: numpy.ndarray
+        :raises IndexError: If the part index is out of range.
+        """
+        return self._itool.InterfaceNodes(part)
+
+    def global_nodes(self, part: int) -> np.ndarray:
+        """
+        Global indices of the nodes of a part.
+
+        :param int part: Part index.
+        :return: Sorted array of global node indices, indexed by the local node indices of
+            :meth:`part`.
+        :rtype: numpy.ndarray
+        :raises IndexError: If the part index is out of range.
+        """
+        return self._itool.GlobalNodes(part)
+
+    def part(self, part: int) -> FrozenMesh:
+        """
+        Mesh of a part.
+
+        :param int part: Part index.
+        :return: Frozen mesh of the part with local node indices.
+        :rtype: FrozenMesh
+        :raises IndexError: If the part index is out of range.
+        """
+        return FrozenMesh(self._itool.Part(part))
+
+    def export(self, directory: str, prefix: str = 'part', fmt: str = 'vtu') -> list[str]:
+        """
+        Export one file per part.
+
+        Files are named ``<prefix>_<part>.<fmt>`` so that each rank can load only its own part.
+        Each part file holds local node numbering, so the global index of each of its nodes, as
+        given by :meth:`global_nodes`, is saved next to it in a NumPy file named
+        ``<prefix>_<part>_nodes.npy``.
+
+        :param str directory: Output directory.
+        :param str prefix: File name prefix.
+        :param str fmt: File format, either 'vtu' or 'msh'.
+        :return: List of file paths, one per part.
+        :rtype: list(str)
+        :raises ValueError: If the format is not supported.
+        """
+        if fmt not in ('vtu', 'msh'):
+            raise ValueError(f"Unsupported format: {fmt}")
+
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for i in range(self.n_parts):
+            path = os.path.join(directory, f'{prefix}_{i}.{fmt}')
+            mesh = self.part(i)
+            if fmt == 'vtu':
+                mesh.export_vtu(path)
+            else:
+                mesh.export_msh(path)
+            np.save(os.path.join(directory, f'{prefix}_{i}_nodes.npy'), self.global_nodes(i))
+            paths.append(path)
+        return paths
+
+
+class MeshFile:
+    """
+    Mesh in the native binary container, opened with memory maps.
+
+    Uncompressed arrays are returned as read-only :class:`numpy.memmap` objects, so that
+    processes reading the same file share pages and only load the slices they touch.
+
+    :ivar str path: File path.
+    """
+
+    MAGIC = b'PYOCCTLM'
+    VERSION = 1
+
+    _HEADER = np.dtype([('magic', 'S8'), ('version', '<u4'), ('num_arrays', '<u4'),
+                        ('table_offset', '<u8'), ('reserved', 'V40')])
+    _ENTRY = np.dtype([('name', 'S48'), ('dtype', 'S8'), ('rows', '<u8'), ('cols', '<u8'),
+                       ('ndim', '<u4'), ('compression', '<u4'), ('offset', '<u8'),
+                       ('nbytes', '<u8'), ('chunk_rows', '<u8'), ('num_chunks', '<u8'),
+                       ('reserved', 'V16')])
+
+    # Number of corner nodes of each element kind
+    _NUM_CORNERS = {ElementKind.TRIANGLE: 3, ElementKind.QUADRANGLE: 4, ElementKind.TETRA: 4}
+
+    def __init__(self, path: str):
+        """
+        Open a file written by :meth:`Mesh.export_native`.
+
+        :param str path: File path.
+        :raises ValueError: If the file is not a native mesh container of a supported version.
+        """
+        header = np.fromfile(path, dtype=self._HEADER, count=1)
+        if header.size == 0 or header['magic'][0] != self.MAGIC:
+            raise ValueError(f"Not a native mesh file: {path}")
+        if header['version'][0] != self.VERSION:
+            raise ValueError(f"Unsupported native mesh file version: {header['version'][0]}")
+
+        table = np.fromfile(path, dtype=self._ENTRY, count=int(header['num_arrays'][0]),
+                            offset=int(header['table_offset'][0]))
+        self._path = path
+        self._entries = {e['name'].decode(): e for e in table}
+        self._chunks = {}
 
     @property
-    def imeshcontrol(self) -> IMeshControl:
+    def path(self) -> str:
         """
-        Underlying mesh control.
+        File path.
 
-        :return: IMeshControl object.
-        :rtype: IMeshControl
+        :return: Path.
+        :rtype: str
         """
-        return self._icontrol
+        return self._path
 
     @property
-    def edge_size(self) -> Optional[float]:
+    def names(self) -> list[str]:
         """
-        Edge size.
+        Names of the arrays in the file.
 
-        :return: Size value.
-        :rtype: Optional[float]
+        :return: Array names.
+        :rtype: list(str)
         """
-        return self.imeshcontrol.EdgeSize()
+        return list(self._entries)
 
     @property
-    def deflection(self) -> Optional[float]:
+    def num_nodes(self) -> int:
         """
-        Deflection.
+        Number of nodes.
 
-        :return: Deflection value.
-        :rtype: Optional[float]
+        :return: Node count.
+        :rtype: int
         """
-        return self.imeshcontrol.Deflection()
+        return int(self._entries['nodes']['rows'])
+
+    def num_elements(self, kind: ElementKind) -> int:
+        """
+        Number of elements of a kind.
+
+        :param ElementKind kind: Kind of elements.
+        :return: Element count.
+        :rtype: int
+        """
+        e = self._entries.get(f'elements/{kind.name.lower()}')
+        return 0 if e is None else int(e['rows'])
+
+    def is_compressed(self, name: str) -> bool:
+        """
+        Check if an array is compressed.
+
+        :param str name: Array name.
+        :return: *True* if compressed, *False* if memory-mapped.
+        :rtype: bool
+        :raises KeyError: If there is no such array.
+        """
+        return bool(self._entries[name]['compression'])
+
+    def array(self, name: str) -> np.ndarray:
+        """
+        Get a whole array.
+
+        :param str name: Array name.
+        :return: Read-only memory map, or the decompressed array if the array is compressed.
+        :rtype: numpy.ndarray
+        :raises KeyError: If there is no such array.
+        """
+        e = self._entries[name]
+        if e['compression']:
+            return self.read(name)
+
+        shape = self._shape(e, int(e['rows']))
+        if e['rows'] == 0:
+            return np.empty(shape, dtype=e['dtype'].decode())
+        return np.memmap(self._path, dtype=e['dtype'].decode(), mode='r',
+                         offset=int(e['offset']), shape=shape)
+
+    def read(self, name: str, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Read a range of rows of an array.
+
+        Only the pages or compressed chunks containing the rows are read.
+
+        :param str name: Array name.
+        :param int start: First row.
+        :param int stop: Row after the last one (the number of rows if *None*).
+        :return: Rows of the array.
+        :rtype: numpy.ndarray
+        :raises KeyError: If there is no such array.
+        """
+        e = self._entries[name]
+        rows = int(e['rows'])
+        start, stop, _ = slice(start, stop).indices(rows)
+        stop = max(start, stop)
+        if not e['compression']:
+            return np.array(self.array(name)[start:stop])
+
+        dtype = np.dtype(e['dtype'].decode())
+        chunk_rows = int(e['chunk_rows'])
+        chunks = self._chunk_table(name)
+        first, last = start // chunk_rows, -(-stop // chunk_rows)
+        parts = []
+        with open(self._path, 'rb') as f:
+            for offset, size in chunks[first:last]:
+                f.seek(int(offset))
+                parts.append(np.frombuffer(zlib.decompress(f.read(int(size))), dtype=dtype))
+        data = np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+        data = data.reshape(self._shape(e, data.size // int(e['cols'])))
+        begin = start - first * chunk_rows
+        return data[begin:begin + stop - start]
 
     @property
-    def allow_quads(self) -> Optional[bool]:
+    def nodes(self) -> np.ndarray:
         """
-        Whether quadrilaterals are allowed.
+        Node coordinates.
 
-        :return: True if allowed.
-        :rtype: Optional[bool]
+        :return: Array of shape (N, 3).
+        :rtype: numpy.ndarray
         """
-        return self.imeshcontrol.AllowQuads()
+        return self.array('nodes')
 
+    @property
+    def node_shape_ids(self) -> np.ndarray:
+        """
+        ID of the sub-shape each node lies on.
 
-class Mesh:
+        :return: Array of sub-shape IDs, 0 for nodes not on a sub-shape.
+        :rtype: numpy.ndarray
+        """
+        return self.array('node_shape_ids')
+
+    def elements(self, kind: ElementKind) -> np.ndarray:
+        """
+        Element connectivity of a kind.
+
+        :param ElementKind kind: Kind of elements.
+        :return: Array of shape (M, k) with 0-based node indices.
+        :rtype: numpy.ndarray
+        """
+        name = f'elements/{kind.name.lower()}'
+        if name not in self._entries:
+            return np.empty((0, self._NUM_CORNERS[kind]), dtype=np.int64)
+        return self.array(name)
+
+    def element_shape_ids(self, kind: ElementKind) -> np.ndarray:
+        """
+        ID of the sub-shape each element of a kind lies on.
+
+        :param ElementKind kind: Kind of elements.
+        :return: Array of sub-shape IDs, 0 for elements not on a sub-shape.
+        :rtype: numpy.ndarray
+        """
+        name = f'element_shape_ids/{kind.name.lower()}'
+        if name not in self._entries:
+            return np.empty(0, dtype=np.int32)
+        return self.array(name)
+
+    @staticmethod
+    def _shape(e: np.void, rows: int) -> tuple[int, ...]:
+        """
+        Shape of a number of rows of an array.
+        """
+        return (rows, int(e['cols'])) if e['ndim'] == 2 else (rows,)
+
+    def _chunk_table(self, name: str) -> np.ndarray:
+        """
+        Offsets and sizes of the compressed chunks of an array.
+        """
+        if name not in self._chunks:
+            e = self._entries[name]
+            table = np.fromfile(self._path, dtype='<u8', count=2 * int(e['num_chunks']),
+                                offset=int(e['offset']))
+            self._chunks[name] = table.reshape(-1, 2)
+        return self._chunks[name]
+
+
+class MeshCache:
     """
-    Represents a generated mesh.
+    Persistent on-disk cache of generated meshes.
 
-    :ivar IMesh imesh: Underlying mesh.
+    Meshes are stored as UNV files in a local directory and keyed by a hash of the shape's BRep
+    and the parameters of the mesh controls. Next to each UNV file, a compressed NumPy file keeps
+    the meshed shape and the sub-shape positions of the nodes and elements, so that meshes loaded
+    from the cache are associated with the shape like computed ones. Once the total size of the
+    cached files exceeds the limit, the least recently used files are evicted.
+
+    :ivar str directory: Cache directory.
+    :ivar int max_bytes: Size limit of the cache in bytes.
+    :ivar int hits: Number of cache hits.
+    :ivar int misses: Number of cache misses.
     """
 
-    @classmethod
-    def generate(cls, shape: Shape, global_control: MeshControl, local_controls: Optional[Iterable[
-        MeshControl]] = None) -> Mesh:
+    _VERSION = 4
+    _SUFFIX = '.unv'
+    _SHAPE_SUFFIX = '.npz'
+
+    def __init__(self, directory: str, max_bytes: int = 2 ** 30):
         """
-        Generate a mesh for a shape.
+        Initialize with a cache directory.
 
-        :param Shape shape: Shape to mesh.
-        :param MeshControl global_control: Global mesh control.
-        :param Optional[Iterable[MeshControl]] local_controls: Local mesh controls.
-        :return: Generated mesh.
-        :rtype: Mesh
+        :param str directory: Cache directory. Created if it does not exist.
+        :param int max_bytes: Size limit of the cache in bytes.
+        :raises ValueError: If max_bytes is not positive.
         """
-        if local_controls is None:
-            imesh = IMesh.MakeMesh(shape.ishape, global_control.imeshcontrol)
-        else:
-            local_imeshcontrols = [c.imeshcontrol for c in local_controls]
-            imesh = IMesh.MakeMesh(shape.ishape, global_control.imeshcontrol, local_imeshcontrols)
-        return cls(imesh)
+        if max_bytes <= 0:
+            raise ValueError("Cache size limit must be positive.")
 
-    def __init__(self, m: IMesh):
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def directory(self) -> str:
         """
-        Initialize from an IMesh.
+        Cache directory.
 
-        :param IMesh m: Underlying mesh.
+        :return: Directory path.
+        :rtype: str
         """
-        assert isinstance(m, IMesh)
-        self._imesh = m
+        return self._directory
 
     @property
-    def imesh(self) -> IMesh:
+    def max_bytes(self) -> int:
         """
-        Underlying mesh.
+        Size limit of the cache in bytes.
 
-        :return: IMesh object.
-        :rtype: IMesh
+        :return: Size limit.
+        :rtype: int
         """
-        return self._imesh
+        return self._max_bytes
 
     @property
-    def num_nodes(self) -> int:
+    def hits(self) -> int:
         """
-        Number of nodes in the mesh.
+        Number of cache hits.
 
-        :return: Node count.
+        :return: Hit count.
         :rtype: int
         """
-        return self.imesh.NumNodes()
+        return self._hits
 
     @property
-    def num_tetras(self) -> int:
+    def misses(self) -> int:
         """
-        Number of tetrahedra in the mesh.
+        Number of cache misses.
 
-        :return: Tetrahedron count.
+        :return: Miss count.
         :rtype: int
         """
-        return self.imesh.NumTetras()
+        return self._misses
 
-    def export_unv(self, path: str) -> None:
+    @property
+    def size(self) -> int:
         """
-        Export the mesh to a UNV file.
+        Total size of the cached files in bytes.
 
-        :param str path: File path.
+        :return: Size in bytes.
+        :rtype: int
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def key(self, shape: Shape, global_control: MeshControl,
+            local_controls: Optional[Iterable[MeshControl]] = None,
+            assembly: bool = False) -> str:
+        """
+        Compute the cache key of a shape and its mesh controls.
+
+        :param Shape shape: Shape to mesh.
+        :param MeshControl global_control: Global mesh control.
+        :param Optional[Iterable[MeshControl]] local_controls: Local mesh controls.
+        :param bool assembly: Option to fuse touching bodies first for a conformal mesh.
+        :return: Hexadecimal key.
+        :rtype: str
+        """
+        h = hashlib.sha256()
+        h.update(f'v{self._VERSION}\n'.encode())
+        h.update(shape.ishape.ToBRep().encode())
+        if assembly:
+            h.update(b'assembly\n')
+
+        controls = [global_control] + ([] if local_controls is None else list(local_controls))
+        maps = {}
+        for c in controls:
+            # Identify the controlled shape by its index among the sub-shapes of the same kind
+            target = c.shape
+            if target.ishape.IsSame(shape.ishape):
+                identity = 'self'
+            else:
+                if target.kind not in maps:
+                    maps[target.kind] = shape.map(target.kind)
+                index = maps[target.kind].find_index(target)
+                if index is None:
+                    identity = hashlib.sha256(target.ishape.ToBRep().encode()).hexdigest()
+                else:
+                    identity = f'{target.kind.name}:{index}'
+            size_field = None
+            if c.size_field is not None:
+                size_field = hashlib.sha256(np.column_stack(
+                    [c.size_field.points, c.size_field.sizes]).tobytes()).hexdigest()
+            fineness = None if c.fineness is None else c.fineness.name
+            h.update(f'{c.dimension}|{c.edge_size!r}|{c.deflection!r}|{c.allow_quads!r}|'
+                     f'{size_field}|{fineness}|{c.growth_rate!r}|{c.surface_opt_steps!r}|'
+                     f'{c.volume_opt_steps!r}|{identity}\n'.encode())
+
+        return h.hexdigest()
+
+    def load(self, key: str, shape: Optional[Shape] = None) -> Optional[Mesh]:
+        """
+        Load a mesh from the cache.
+
+        :param str key: Cache key.
+        :param Optional[Shape] shape: Shape the key was computed for, to associate the mesh
+            with. If not provided, the mesh is associated with a copy of the stored meshed shape,
+            which is also used for assembly meshes whose meshed shape is the fused one.
+        :return: Cached mesh, or None if not found.
+        :rtype: Optional[Mesh]
+        """
+        path = self._path(key)
+        shape_path = self._shape_path(path)
+        if not os.path.isfile(path) or not os.path.isfile(shape_path):
+            self._misses += 1
+            return None
+
+        # Mark as recently used, treating an entry evicted by another process as a miss
+        try:
+            os.utime(path)
+            with np.load(shape_path) as data:
+                brep = str(data['brep'])
+                positions = (data['node_shape_ids'], data['node_params'],
+                             data['element_shape_ids'])
+        except FileNotFoundError:
+            self._misses += 1
+            return None
+        self._hits += 1
+
+        if not brep:
+            return Mesh(IMesh.ImportUNV(path))
+        if shape is None:
+            shape = Shape.by_brep(brep)
+        return Mesh(IMesh.ImportUNV(path, shape.ishape, *positions))
+
+    def store(self, key: str, mesh: Mesh) -> None:
+        """
+        Store a mesh in the cache and evict least recently used meshes if over the size limit.
+
+        :param str key: Cache key.
+        :param Mesh mesh: Mesh to store.
         :return: None
         :rtype: None
         """
-        self.imesh.ExportUNV(path)
+        # Write to unique temporary files first so readers never see a partial entry, with the
+        # shape positions in place before the mesh file that marks the entry as present
+        path = self._path(key)
+        shape = mesh.shape
+        node_shape_ids, node_params, element_shape_ids = mesh.imesh.ShapePositions()
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self._directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez_compressed(f, brep='' if shape is None else shape.ishape.ToBRep(),
+                                    node_shape_ids=node_shape_ids, node_params=node_params,
+                                    element_shape_ids=element_shape_ids)
+            os.replace(tmp, self._shape_path(path))
+
+            fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self._directory)
+            os.close(fd)
+            mesh.export_unv(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        self._evict(keep=path)
+
+    def clear(self) -> None:
+        """
+        Remove all cached meshes.
+
+        :return: None
+        :rtype: None
+        """
+        for path, _, _ in self._entries():
+            self._remove(path)
+
+    def _path(self, key: str) -> str:
+        """
+        File path of a cache key.
+
+        :param str key: Cache key.
+        :return: File path.
+        :rtype: str
+        """
+        return os.path.join(self._directory, key + self._SUFFIX)
+
+    def _shape_path(self, path: str) -> str:
+        """
+        File path of the shape positions of a cached mesh.
+
+        :param str path: File path of the cached mesh.
+        :return: File path.
+        :rtype: str
+        """
+        return path[:-len(self._SUFFIX)] + self._SHAPE_SUFFIX
+
+    def _remove(self, path: str) -> None:
+        """
+        Remove a cached mesh and its shape positions. Files already removed by another process
+        are skipped.
+
+        :param str path: File path of the cached mesh.
+        :return: None
+        :rtype: None
+        """
+        for p in (path, self._shape_path(path)):
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+
+    def _entries(self) -> list[tuple[str, int, float]]:
+        """
+        Cached meshes with the size of their files and their last use time. Meshes removed by
+        another process while listing are skipped.
+
+        :return: List of (path, size, time).
+        :rtype: list[tuple[str, int, float]]
+        """
+        entries = []
+        for name in os.listdir(self._directory):
+            if name.endswith(self._SUFFIX):
+                path = os.path.join(self._directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                size = stat.st_size
+                try:
+                    size += os.path.getsize(self._shape_path(path))
+                except FileNotFoundError:
+                    pass
+                entries.append((path, size, stat.st_mtime))
+        return entries
+
+    def _evict(self, keep: str) -> None:
+        """
+        Remove least recently used files until the cache is within its size limit.
+
+        :param str keep: File path that is never removed.
+        :return: None
+        :rtype: None
+        """
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self._max_bytes:
+                break
+            if path != keep:
+                self._remove(path)
+                total -= size
@@ -3,10 +3,12 @@ from __future__ import annotations
 from enum import Enum
 from typing import Generic, Iterable, Iterator, Optional, Self, TypeVar, Union
 
+import numpy as np
+
 from pyocctlite._occtlite import (CopyIShape, CutIShapes, ExploreIShape, ExtrudeIShape,
                                   FilletIShape,
-                                  IShape, IShapeKind, LoftIShape, MapIShape, ThickenIShape,
-                                  TransformIShape, UniteIShapes)
+                                  IShape, IShapeKind, LoftIShape, MapIShape, TessellateIShape,
+                                  ThickenIShape, TransformIShape, UniteIShapes)
 
 from pyocctlite.geometry import Curve, Curve2D, Point, Surface, Transform, TrimmedCurve, Vector
 
@@ -65,6 +67,18 @@ class Shape:
             case _:
                 raise RuntimeError("Cannot create unknown shape.")
 
+    @staticmethod
+    def by_brep(brep: str) -> Shape:
+        """
+        Create a Shape from a BRep string.
+
+        :param str brep: BRep string as written by :meth:`IShape.ToBRep`.
+        :return: New shape.
+        :rtype: Shape
+        :raises ValueError: If the string is not a valid BRep.
+        """
+        return Shape.by_ishape(IShape.FromBRep(brep))
+
     @staticmethod
     def by_ishapes(ishapes: Iterable[IShape]) -> list[Shape]:
         """
@@ -325,6 +339,28 @@ class Shape:
         ishape = itool.Shape()
         return Shape.by_ishape(ishape)
 
+    def tessellate(self, linear_deflection: float, angular_deflection: float = 0.5,
+                   parallel: bool = True) -> list[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Tessellate the faces of this shape for visualization.
+
+        The triangulation is stored on the shape and reused by later calls with the same or a
+        coarser linear and angular deflection, in which case no meshing is performed. Otherwise,
+        the shape is tessellated again from scratch.
+
+        :param float linear_deflection: Maximum distance between the triangles and the surface.
+        :param float angular_deflection: Maximum angle between adjacent triangles (radians).
+        :param bool parallel: Whether to tessellate faces in parallel.
+        :return: Vertices (N, 3), normals (N, 3), and triangles (M, 3) for each face, in the
+            same order as :meth:`faces`.
+        :rtype: list[tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]]
+        """
+        itool = TessellateIShape(self.ishape, linear_deflection, angular_deflection, parallel)
+
+        # OCCT is 1-based
+        return [(itool.Vertices(i), itool.Normals(i), itool.Triangles(i))
+                for i in range(1, itool.NumFaces() + 1)]
+
     def export_step(self, path: str) -> bool:
         """
         Export this shape to a STEP file.
@@ -806,6 +842,16 @@ class MapShape(Generic[T]):
         """
         self._itool = MapIShape(shape.ishape, kind.value)
 
+    @property
+    def itool(self) -> MapIShape:
+        """
+        Underlying tool.
+
+        :return: MapIShape object.
+        :rtype: MapIShape
+        """
+        return self._itool
+
     def __len__(self) -> int:
         """
         Number of mapped shapes.
@@ -0,0 +1,391 @@
+#include "EstimateIMesh.hpp"
+
+#include <algorithm>
+#include <array>
+#include <cmath>
+#include <fstream>
+#include <map>
+#include <optional>
+
+#include <Bnd_Box.hxx>
+#include <BRep_Tool.hxx>
+#include <BRepAdaptor_Curve.hxx>
+#include <BRepAdaptor_Surface.hxx>
+#include <BRepBndLib.hxx>
+#include <BRepLProp_CLProps.hxx>
+#include <BRepLProp_SLProps.hxx>
+#include <BRepTools.hxx>
+#include <gp_Pnt.hxx>
+#include <Precision.hxx>
+#include <TopExp.hxx>
+#include <TopTools_IndexedMapOfShape.hxx>
+
+// Number of segments per edge of the default element size (bounding box diagonal over it)
+static constexpr double kDefaultSegments = 15.;
+
+// Number of samples per parameter direction to find the largest curvature
+static constexpr int kCurvatureSamples = 8;
+
+// Elements per area and volume for regular triangles, quadrangles, and tetrahedra of unit edge
+static const double kTrianglesPerArea = 4. / std::sqrt(3.);
+static constexpr double kQuadranglesPerArea = 1.;
+static const double kTetrasPerVolume = 6. * std::sqrt(2.);
+
+// Throughput of a serial computation in elements per second
+static constexpr double kEdgesPerSecond = 1.0e7;
+static constexpr double kFacesPerSecond = 2.0e5;
+static constexpr double kVolumesPerSecond = 3.0e4;
+
+// Memory of the mesh data structure and the peak working memory of the mesher in bytes
+static constexpr double kBytesPerNode = 160.;
+static constexpr double kBytesPerElement = 120.;
+static constexpr double kWorkBytesPerFace = 200.;
+static constexpr double kWorkBytesPerVolume = 500.;
+
+static constexpr double kPi = 3.14159265358979323846;
+
+// NETGEN growth rate and segments per edge and per radius of each fineness level (the full hypothesis defaults to moderate)
+struct FinenessParameters {
+  double growthRate;
+  double segmentsPerEdge;
+  double segmentsPerRadius;
+};
+
+static const FinenessParameters& finenessParameters(std::optional<IMeshFineness> fineness)
+{
+  static const FinenessParameters table[] = {
+    { 0.7, 0.3, 1. },
+    { 0.5, 0.5, 1.5 },
+    { 0.3, 1., 2. },
+    { 0.2, 2., 3. },
+    { 0.1, 3., 5. }
+  };
+  return table[static_cast<int>(fineness.value_or(IMeshFineness::Moderate))];
+}
+
+// Check if a control is applied by the full NETGEN hypothesis, which also refines by edge length and curvature
+static bool usesFullHypothesis(const IMeshControl& c)
+{
+  return c.Dimension() >= 2 && (c.Deflection() || c.SizeFile() || c.HasNetgenParameters());
+}
+
+// Growth rate of the element size away from finer regions
+static double growthRate(const IMeshControl& c)
+{
+  return c.GrowthRate().value_or(finenessParameters(c.Fineness()).growthRate);
+}
+
+// Control with the sub-shapes it applies to
+struct Governor {
+  const IMeshControl* control;
+  TopTools_IndexedMapOfShape shapes;
+};
+
+// Element size of a sub-shape and the control it follows
+struct Sizing {
+  double size;
+  const IMeshControl* control;
+};
+
+// Points and sizes of a NETGEN mesh size file (.msz) and the volume per point of their bounding box
+struct SizeFile {
+  std::vector<std::array<double, 4>> points;
+  double cellVolume = 0.;
+};
+
+static SizeFile readSizeFile(const std::string& path)
+{
+  std::ifstream in(path);
+  size_t n = 0;
+  if (!(in >> n)) {
+    throw IMeshControlError("Unable to read mesh size file: " + path);
+  }
+
+  SizeFile file;
+  file.points.reserve(n);
+  Bnd_Box box;
+  std::array<double, 4> p;
+  for (size_t i = 0; i < n && in >> p[0] >> p[1] >> p[2] >> p[3]; ++i) {
+    file.points.push_back(p);
+    box.Add(gp_Pnt(p[0], p[1], p[2]));
+  }
+  if (!box.IsVoid() && !file.points.empty()) {
+    double x0, y0, z0, x1, y1, z1;
+    box.Get(x0, y0, z0, x1, y1, z1);
+    file.cellVolume = (x1 - x0) * (y1 - y0) * (z1 - z0) / file.points.size();
+  }
+  return file;
+}
+
+// Extra elements of dimension dim (2 or 3) over a uniform size H from the size field points within a box, as the smaller
+// of the graded disc or ball around an isolated point and the cell of a point in a dense field
+static double sizeFieldElements(const SizeFile& file, const Bnd_Box& box, int dim, double perMeasure, double H, double g, double& minSize)
+{
+  if (box.IsVoid()) {
+    return 0.;
+  }
+  const double spacing = std::cbrt(file.cellVolume);
+  Bnd_Box near = box;
+  if (dim == 2) {
+    near.Enlarge(0.5 * spacing);
+  }
+
+  double extra = 0.;
+  for (const std::array<double, 4>& p : file.points) {
+    const double h = p[3];
+    if (!(h > 0.) || h >= H || near.IsOut(gp_Pnt(p[0], p[1], p[2]))) {
+      continue;
+    }
+    minSize = std::min(minSize, h);
+    const double R = (H - h) / g;
+    const double r = h / H;
+    double isolated, dense;
+    if (dim == 2) {
+      isolated = 2. * kPi / (g * g) * (std::log(1. / r) - 1. + r) - kPi * R * R / (H * H);
+      dense = spacing * spacing * (1. / (h * h) - 1. / (H * H));
+    }
+    else {
+      isolated = 4. * kPi / (g * g * g) * (std::log(1. / r) - 1.5 + 2. * r - 0.5 * r * r) - 4. / 3. * kPi * R * R * R / (H * H * H);
+      dense = file.cellVolume * (1. / (h * h * h) - 1. / (H * H * H));
+    }
+    extra += perMeasure * (file.cellVolume > 0. ? std::min(isolated, dense) : isolated);
+  }
+  return std::max(0., extra);
+}
+
+// Largest curvature of an edge sampled along its parameter range
+static double edgeCurvature(const TopoDS_Edge& edge)
+{
+  BRepAdaptor_Curve curve(edge);
+  BRepLProp_CLProps props(curve, 2, Precision::Confusion());
+  const double u0 = curve.FirstParameter();
+  const double u1 = curve.LastParameter();
+  double k = 0.;
+  for (int i = 0; i <= kCurvatureSamples; ++i) {
+    props.SetParameter(u0 + (u1 - u0) * i / kCurvatureSamples);
+    if (props.IsTangentDefined()) {
+      k = std::max(k, std::abs(props.Curvature()));
+    }
+  }
+  return k;
+}
+
+// Largest principal curvature of a face sampled on a grid of its parameter bounds
+static double faceCurvature(const TopoDS_Face& face)
+{
+  BRepAdaptor_Surface surface(face);
+  BRepLProp_SLProps props(surface, 2, Precision::Confusion());
+  double u0, u1, v0, v1;
+  BRepTools::UVBounds(face, u0, u1, v0, v1);
+  double k = 0.;
+  for (int i = 0; i <= kCurvatureSamples; ++i) {
+    for (int j = 0; j <= kCurvatureSamples; ++j) {
+      props.SetParameters(u0 + (u1 - u0) * i / kCurvatureSamples, v0 + (v1 - v0) * j / kCurvatureSamples);
+      if (props.IsCurvatureDefined()) {
+        k = std::max({ k, std::abs(props.MaxCurvature()), std::abs(props.MinCurvature()) });
+      }
+    }
+  }
+  return k;
+}
+
+EstimateIMesh::EstimateIMesh(const IShape& shape, const IMeshControl& globalControl, const std::vector<IMeshControl>& localControls)
+{
+  const TopoDS_Shape& target = static_cast<const TopoDS_Shape&>(shape);
+
+  // Default element size of controls without an edge size
+  Bnd_Box box;
+  BRepBndLib::Add(target, box);
+  const double defaultSize = box.IsVoid() ? 1. : std::sqrt(box.SquareExtent()) / kDefaultSegments;
+
+  std::vector<Governor> locals(localControls.size());
+  for (size_t i = 0; i < localControls.size(); ++i) {
+    locals[i].control = &localControls[i];
+    TopExp::MapShapes(localControls[i].Shape(), locals[i].shapes);
+  }
+
+  // Size field of each control with a mesh size file, read once per file
+  std::map<std::string, SizeFile> sizeFiles;
+  auto sizeFile = [&](const IMeshControl& c) -> const SizeFile*
+  {
+    if (!c.SizeFile()) {
+      return nullptr;
+    }
+    auto found = sizeFiles.find(*c.SizeFile());
+    if (found == sizeFiles.end()) {
+      found = sizeFiles.emplace(*c.SizeFile(), readSizeFile(*c.SizeFile())).first;
+    }
+    return &found->second;
+  };
+
+  // Element size of a sub-shape of a dimension from the finest local control of at least that dimension containing it, else the global control (none if not meshed)
+  auto sizing = [&](const TopoDS_Shape& s, int dim, double curvature, double length) -> std::optional<Sizing>
+  {
+    auto size = [&](const IMeshControl& c)
+    {
+      double h = c.EdgeSize().value_or(defaultSize);
+      if (c.Deflection() && curvature > 0.) {
+        h = std::min(h, std::sqrt(8. * *c.Deflection() / curvature));
+      }
+      if (usesFullHypothesis(c)) {
+        const FinenessParameters& f = finenessParameters(c.Fineness());
+        if (curvature > 0.) {
+          h = std::min(h, 1. / (curvature * f.segmentsPerRadius));
+        }
+        if (length > 0.) {
+          h = std::min(h, length / f.segmentsPerEdge);
+        }
+      }
+      return h;
+    };
+
+    std::optional<Sizing> result;
+    for (const Governor& g : locals) {
+      if (g.control->Dimension() >= dim && g.shapes.Contains(s)) {
+        const double h = size(*g.control);
+        if (!result || h < result->size) {
+          result = Sizing{ h, g.control };
+        }
+      }
+    }
+    if (!result && globalControl.Dimension() >= dim) {
+      result = Sizing{ size(globalControl), &globalControl };
+    }
+    if (result) {
+      minSize_ = minSize_ > 0. ? std::min(minSize_, result->size) : result->size;
+    }
+    return result;
+  };
+
+  // Curvature is only sampled if some control refines by it
+  auto curved = [](const IMeshControl& c) { return c.Deflection().has_value() || usesFullHypothesis(c); };
+  const bool curvature = curved(globalControl) || std::any_of(localControls.begin(), localControls.end(), curved);
+
+  TopTools_IndexedMapOfShape vertices, edges, faces, solids;
+  TopExp::MapShapes(target, TopAbs_VERTEX, vertices);
+  TopExp::MapShapes(target, TopAbs_EDGE, edges);
+  TopExp::MapShapes(target, TopAbs_FACE, faces);
+  TopExp::MapShapes(target, TopAbs_SOLID, solids);
+
+  // Element size and length or area of each meshed edge and face (size 0 if not meshed) to grade the elements next to them
+  std::vector<double> edgeSizes(edges.Extent(), 0.), edgeLengths(edges.Extent(), 0.);
+  std::vector<double> faceSizes(faces.Extent(), 0.), faceAreas(faces.Extent(), 0.);
+
+  // Nodes interior to each dimension from the counts of elements (about two triangles and six tetrahedra per node)
+  double numNodes = vertices.Extent();
+  for (int i = 1; i <= edges.Extent(); ++i) {
+    const TopoDS_Edge& edge = TopoDS::Edge(edges(i));
+    if (BRep_Tool::Degenerated(edge)) {
+      continue;
+    }
+    const double length = IShape(edge).Length();
+    const auto s = sizing(edge, 1, curvature ? edgeCurvature(edge) : 0., length);
+    if (s) {
+      const std::int64_t n = std::max<std::int64_t>(1, static_cast<std::int64_t>(std::ceil(length / s->size)));
+      numEdges_ += n;
+      numNodes += n - 1;
+      edgeSizes[i - 1] = s->size;
+      edgeLengths[i - 1] = length;
+    }
+  }
+
+  // Faces are uniform at their size except for strips graded from finer edges and regions refined by a size field
+  for (int i = 1; i <= faces.Extent(); ++i) {
+    const TopoDS_Face& face = TopoDS::Face(faces(i));
+    const auto s = sizing(face, 2, curvature ? faceCurvature(face) : 0., 0.);
+    if (!s) {
+      continue;
+    }
+    const double H = s->size;
+    const double g = growthRate(*s->control);
+    const double perArea = s->control->AllowQuads() ? kQuadranglesPerArea : kTrianglesPerArea;
+    const double area = IShape(face).Area();
+
+    TopTools_IndexedMapOfShape boundary;
+    TopExp::MapShapes(face, TopAbs_EDGE, boundary);
+    double strips = 0.;
+    double stripArea = 0.;
+    for (int j = 1; j <= boundary.Extent(); ++j) {
+      const int k = edges.FindIndex(boundary(j)) - 1;
+      const double h = k >= 0 ? edgeSizes[k] : 0.;
+      if (h > 0. && h < H) {
+        const double w = std::min((H - h) / g, area / edgeLengths[k]);
+        strips += perArea * edgeLengths[k] / g * (1. / h - 1. / (h + g * w));
+        stripArea += edgeLengths[k] * w;
+      }
+    }
+    const double scale = stripArea > area ? area / stripArea : 1.;
+    double elements = perArea * std::max(0., area - stripArea) / (H * H) + scale * strips;
+
+    if (const SizeFile* file = sizeFile(*s->control)) {
+      Bnd_Box faceBox;
+      BRepBndLib::Add(face, faceBox);
+      elements += sizeFieldElements(*file, faceBox, 2, perArea, H, g, minSize_);
+    }
+
+    const std::int64_t n = std::max<std::int64_t>(1, static_cast<std::int64_t>(std::ceil(elements)));
+    numFaces_ += n;
+    numNodes += (s->control->AllowQuads() ? 1. : 0.5) * n;
+    faceSizes[i - 1] = H;
+    faceAreas[i - 1] = area;
+  }
+
+  // Solids are uniform at their size except for layers graded from finer faces and regions refined by a size field
+  for (int i = 1; i <= solids.Extent(); ++i) {
+    const TopoDS_Shape& solid = solids(i);
+    const auto s = sizing(solid, 3, 0., 0.);
+    if (!s) {
+      continue;
+    }
+    const double H = s->size;
+    const double g = growthRate(*s->control);
+    const double volume = IShape(solid).Volume();
+
+    TopTools_IndexedMapOfShape boundary;
+    TopExp::MapShapes(solid, TopAbs_FACE, boundary);
+    double layers = 0.;
+    double layerVolume = 0.;
+    for (int j = 1; j <= boundary.Extent(); ++j) {
+      const int k = faces.FindIndex(boundary(j)) - 1;
+      const double h = k >= 0 ? faceSizes[k] : 0.;
+      if (h > 0. && h < H && faceAreas[k] > 0.) {
+        const double t = std::min((H - h) / g, volume / faceAreas[k]);
+        const double ht = h + g * t;
+        layers += kTetrasPerVolume * faceAreas[k] / (2. * g) * (1. / (h * h) - 1. / (ht * ht));
+        layerVolume += faceAreas[k] * t;
+      }
+    }
+    const double scale = layerVolume > volume ? volume / layerVolume : 1.;
+    double elements = kTetrasPerVolume * std::max(0., volume - layerVolume) / (H * H * H) + scale * layers;
+
+    if (const SizeFile* file = sizeFile(*s->control)) {
+      Bnd_Box solidBox;
+      BRepBndLib::Add(solid, solidBox);
+      elements += sizeFieldElements(*file, solidBox, 3, kTetrasPerVolume, H, g, minSize_);
+    }
+
+    const std::int64_t n = std::max<std::int64_t>(1, static_cast<std::int64_t>(std::ceil(elements)));
+    numVolumes_ += n;
+    numNodes += n / 6.;
+  }
+  numNodes_ = static_cast<std::int64_t>(std::ceil(numNodes));
+
+  time_ = numEdges_ / kEdgesPerSecond + numFaces_ / kFacesPerSecond + numVolumes_ / kVolumesPerSecond;
+  memory_ = numNodes_ * kBytesPerNode + (numEdges_ + numFaces_ + numVolumes_) * kBytesPerElement + numFaces_ * kWorkBytesPerFace + numVolumes_ * kWorkBytesPerVolume;
+}
+
+// Python bindings
+void bind_EstimateIMesh(py::module& m) {
+
+  py::class_<EstimateIMesh>(m, "EstimateIMesh", "Estimate the size, time, and memory of a mesh computation without meshing.")
+    .def(py::init<const IShape&, const IMeshControl&, const std::vector<IMeshControl>&>(), py::arg("shape"), py::arg("global"), py::arg("locals") = std::vector<IMeshControl>(), py::call_guard<py::gil_scoped_release>(), "Construct and estimate from the sub-shapes, the control sizes, growth rates and fineness, and the size fields.")
+
+    .def("NumNodes", &EstimateIMesh::NumNodes, "Get the estimated number of nodes.")
+    .def("NumEdges", &EstimateIMesh::NumEdges, "Get the estimated number of segments.")
+    .def("NumFaces", &EstimateIMesh::NumFaces, "Get the estimated number of surface elements.")
+    .def("NumVolumes", &EstimateIMesh::NumVolumes, "Get the estimated number of volume elements.")
+    .def("Time", &EstimateIMesh::Time, "Get the estimated wall time in seconds of a serial computation.")
+    .def("Memory", &EstimateIMesh::Memory, "Get the estimated peak memory in bytes.")
+    .def("MinSize", &EstimateIMesh::MinSize, "Get the smallest element size used by the estimate.");
+
+}
@@ -0,0 +1,63 @@
+#pragma once
+
+#include "occtlite.hpp"
+
+#include <cstdint>
+#include <vector>
+
+#include "IShape.hpp"
+#include "IMeshControl.hpp"
+
+// Tool to estimate the size, time, and memory of a mesh computation from the shape and its controls without meshing
+class EstimateIMesh {
+public:
+
+  // Construct and estimate from the lengths, areas, volumes, and curvature of the sub-shapes and the sizes, growth rates, fineness, and size fields of the controls
+  // (elements are graded from finer edges into faces and from finer faces into solids)
+  EstimateIMesh(const IShape& shape, const IMeshControl& globalControl, const std::vector<IMeshControl>& localControls = {});
+
+  // Get the estimated number of nodes
+  std::int64_t NumNodes() const {
+    return numNodes_;
+  }
+
+  // Get the estimated number of segments, surface elements, and volume elements
+  std::int64_t NumEdges() const {
+    return numEdges_;
+  }
+
+  std::int64_t NumFaces() const {
+    return numFaces_;
+  }
+
+  std::int64_t NumVolumes() const {
+    return numVolumes_;
+  }
+
+  // Get the estimated wall time in seconds of a serial computation
+  double Time() const {
+    return time_;
+  }
+
+  // Get the estimated peak memory in bytes of a computation
+  double Memory() const {
+    return memory_;
+  }
+
+  // Get the smallest element size used by the estimate
+  double MinSize() const {
+    return minSize_;
+  }
+
+private:
+  std::int64_t numNodes_ = 0;
+  std::int64_t numEdges_ = 0;
+  std::int64_t numFaces_ = 0;
+  std::int64_t numVolumes_ = 0;
+  double time_ = 0.;
+  double memory_ = 0.;
+  double minSize_ = 0.;
+};
+
+// Python bindings
+void bind_EstimateIMesh(py::module& m);
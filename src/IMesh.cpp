@@ -1,140 +1,2306 @@
 #include "IMesh.hpp"
 
+#include <algorithm>
+#include <array>
+#include <chrono>
+#include <cstdint>
+#include <cmath>
+#include <cstdio>
+#include <cstdlib>
+#include <fstream>
+#include <functional>
+#include <iterator>
+#include <limits>
+#include <map>
+#include <numeric>
+#include <sstream>
+#include <thread>
 #include <type_traits>
+#include <unordered_map>
 
+#include <zlib.h>
+
+#include <BRepAlgoAPI_BuilderAlgo.hxx>
+#include <BRep_Builder.hxx>
+#include <BRepBuilderAPI_Transform.hxx>
+#include <gp_XYZ.hxx>
+#include <TopExp.hxx>
+#include <TopExp_Explorer.hxx>
+#include <TopoDS_Compound.hxx>
 #include <TopoDS_Shape.hxx>
+#include <TopTools_IndexedMapOfShape.hxx>
+#include <TopTools_ListOfShape.hxx>
+
+#include <SMDS_MeshElement.hxx>
+#include <SMDS_MeshInfo.hxx>
+#include <SMDS_MeshNode.hxx>
+#include <SMESHDS_Mesh.hxx>
+#include <SMESHDS_SubMesh.hxx>
+#include <SMESH_Algo.hxx>
+#include <SMESH_ComputeError.hxx>
+#include <SMESH_MeshEditor.hxx>
+#include <SMESH_subMesh.hxx>
+#include <SMESH_subMeshEventListener.hxx>
+
+#include <NETGENPlugin_Hypothesis.hxx>
+#include <NETGENPlugin_Hypothesis_2D.hxx>
+#include <NETGENPlugin_SimpleHypothesis_3D.hxx>
+#include <NETGENPlugin_NETGEN_2D3D.hxx>
+#include <NETGENPlugin_SimpleHypothesis_2D.hxx>
+#include <NETGENPlugin_NETGEN_2D.hxx>
+#include <StdMeshers_Adaptive1D.hxx>
+#include <StdMeshers_Deflection1D.hxx>
+#include <StdMeshers_LocalLength.hxx>
+#include <StdMeshers_Regular_1D.hxx>
+
+// Linear element type with its corner node order in VTK/Gmsh convention
+struct ElementType {
+  SMDSAbs_GeometryType geom;
+  int dim;
+  std::vector<int> order;
+  int gmshType;
+  std::uint8_t vtkType;
+  const char* name;
+};
+
+// Element types supported by array queries and exporters (SMDS volumes are mirrored w.r.t. VTK)
+static const std::vector<ElementType>& elementTypes() {
+  static const std::vector<ElementType> types = {
+    { SMDSGeom_EDGE,       1, { 0, 1 },                   1, 3, "edge" },
+    { SMDSGeom_TRIANGLE,   2, { 0, 1, 2 },                2, 5, "triangle" },
+    { SMDSGeom_QUADRANGLE, 2, { 0, 1, 2, 3 },             3, 9, "quadrangle" },
+    { SMDSGeom_TETRA,      3, { 0, 2, 1, 3 },             4, 10, "tetra" },
+    { SMDSGeom_PYRAMID,    3, { 0, 3, 2, 1, 4 },          7, 14, "pyramid" },
+    { SMDSGeom_PENTA,      3, { 0, 2, 1, 3, 5, 4 },       6, 13, "penta" },
+    { SMDSGeom_HEXA,       3, { 0, 3, 2, 1, 4, 7, 6, 5 }, 5, 12, "hexa" },
+  };
+  return types;
+}
+
+// Get the element type of a geometry type
+static const ElementType& elementType(SMDSAbs_GeometryType geom) {
+  for (const ElementType& t : elementTypes()) {
+    if (t.geom == geom) {
+      return t;
+    }
+  }
+  throw std::logic_error("Unsupported mesh element kind.");
+}
+
+// Buffered binary file writer that writes in fixed size chunks
+class ChunkWriter {
+public:
+  explicit ChunkWriter(const std::string& path) : out_(path, std::ios::binary) {
+    if (!out_) {
+      throw IMeshExportError("Unable to open file for writing: " + path);
+    }
+    buffer_.reserve(kChunkSize);
+  }
+
+  template <typename T>
+  void Put(const T& value) {
+    const char* p = reinterpret_cast<const char*>(&value);
+    buffer_.insert(buffer_.end(), p, p + sizeof(T));
+    if (buffer_.size() >= kChunkSize) {
+      Flush();
+    }
+  }
+
+  void PutText(const std::string& text) {
+    buffer_.insert(buffer_.end(), text.begin(), text.end());
+    if (buffer_.size() >= kChunkSize) {
+      Flush();
+    }
+  }
+
+  void PutBytes(const void* data, size_t n) {
+    const char* p = static_cast<const char*>(data);
+    buffer_.insert(buffer_.end(), p, p + n);
+    if (buffer_.size() >= kChunkSize) {
+      Flush();
+    }
+  }
+
+  // Position of the next byte in the file
+  std::uint64_t Tell() {
+    return static_cast<std::uint64_t>(out_.tellp()) + buffer_.size();
+  }
+
+  // Overwrite bytes already written at a position
+  void Patch(std::uint64_t pos, const void* data, size_t n) {
+    Flush();
+    const std::streampos end = out_.tellp();
+    out_.seekp(static_cast<std::streamoff>(pos));
+    out_.write(static_cast<const char*>(data), n);
+    out_.seekp(end);
+  }
+
+  void Flush() {
+    out_.write(buffer_.data(), buffer_.size());
+    buffer_.clear();
+  }
+
+  void Close() {
+    Flush();
+    out_.close();
+    if (out_.fail()) {
+      throw IMeshExportError("Failed to write file.");
+    }
+  }
+
+private:
+  static constexpr size_t kChunkSize = 1 << 20;
+  std::ofstream out_;
+  std::vector<char> buffer_;
+};
+
+// Check if the host is little endian
+static bool isLittleEndian() {
+  const std::uint16_t one = 1;
+  return *reinterpret_cast<const std::uint8_t*>(&one) == 1;
+}
+
+// Native container layout: a header, a table of array entries, then each array aligned to 64 bytes
+static constexpr char kNativeMagic[8] = { 'P', 'Y', 'O', 'C', 'C', 'T', 'L', 'M' };
+static constexpr std::uint32_t kNativeVersion = 1;
+static constexpr std::uint64_t kNativeAlignment = 64;
+
+// Uncompressed size of the chunks of compressed arrays
+static constexpr std::uint64_t kNativeChunkBytes = 1 << 22;
+
+struct NativeHeader {
+  char magic_[8];
+  std::uint32_t version_;
+  std::uint32_t numArrays_;
+  std::uint64_t tableOffset_;
+  std::uint8_t reserved_[40];
+};
+static_assert(sizeof(NativeHeader) == 64, "Unexpected native header size.");
+
+// Array entry (a compressed array starts with a (numChunks, 2) table of chunk offsets and sizes)
+struct NativeEntry {
+  char name_[48];
+  char dtype_[8];
+  std::uint64_t rows_;
+  std::uint64_t cols_;
+  std::uint32_t ndim_;
+  std::uint32_t compression_;
+  std::uint64_t offset_;
+  std::uint64_t nbytes_;
+  std::uint64_t chunkRows_;
+  std::uint64_t numChunks_;
+  std::uint8_t reserved_[16];
+};
+static_assert(sizeof(NativeEntry) == 128, "Unexpected native entry size.");
+
+// Write an array of rows to a native container, compressed by zlib in chunks of rows if requested (rows(put) calls put(row) for each row in order)
+template <typename T, typename Rows>
+static NativeEntry writeNativeArray(ChunkWriter& w, const std::string& name, std::uint64_t numRows, std::uint64_t cols, std::uint32_t ndim, bool compress, Rows rows)
+{
+  static_assert(std::is_arithmetic<T>::value, "Native arrays must be numeric.");
+
+  NativeEntry e{};
+  std::snprintf(e.name_, sizeof(e.name_), "%s", name.c_str());
+  std::snprintf(e.dtype_, sizeof(e.dtype_), "%c%c%zu", isLittleEndian() ? '<' : '>', std::is_floating_point<T>::value ? 'f' : 'i', sizeof(T));
+  e.rows_ = numRows;
+  e.cols_ = cols;
+  e.ndim_ = ndim;
+  e.compression_ = compress ? 1 : 0;
+
+  // Align the start of the array
+  static const char zeros[kNativeAlignment] = {};
+  w.PutBytes(zeros, static_cast<size_t>((kNativeAlignment - w.Tell() % kNativeAlignment) % kNativeAlignment));
+  e.offset_ = w.Tell();
+
+  const std::uint64_t rowBytes = cols * sizeof(T);
+  std::uint64_t written = 0;
+  if (!compress) {
+    rows([&](const T* row) {
+      w.PutBytes(row, static_cast<size_t>(rowBytes));
+      ++written;
+    });
+    if (written != e.rows_) {
+      throw IMeshExportError("Unexpected number of rows in array: " + name);
+    }
+    e.nbytes_ = e.rows_ * rowBytes;
+    return e;
+  }
+
+  // Chunk table followed by the compressed chunks
+  e.chunkRows_ = std::max<std::uint64_t>(1, kNativeChunkBytes / rowBytes);
+  e.numChunks_ = (e.rows_ + e.chunkRows_ - 1) / e.chunkRows_;
+  std::vector<std::uint64_t> chunks(e.numChunks_ * 2, 0);
+  w.PutBytes(chunks.data(), chunks.size() * sizeof(std::uint64_t));
+
+  // Rows are gathered one chunk at a time
+  std::vector<T> chunk;
+  chunk.reserve(static_cast<size_t>(std::min(e.rows_, e.chunkRows_) * cols));
+  std::vector<Bytef> buffer;
+  std::uint64_t c = 0;
+  auto flush = [&]() {
+    if (c >= e.numChunks_) {
+      throw IMeshExportError("Unexpected number of rows in array: " + name);
+    }
+    const uLong n = static_cast<uLong>(chunk.size() * sizeof(T));
+    uLongf size = compressBound(n);
+    buffer.resize(size);
+    if (compress2(buffer.data(), &size, reinterpret_cast<const Bytef*>(chunk.data()), n, Z_DEFAULT_COMPRESSION) != Z_OK) {
+      throw IMeshExportError("Failed to compress array: " + name);
+    }
+    chunks[c * 2] = w.Tell();
+    chunks[c * 2 + 1] = size;
+    w.PutBytes(buffer.data(), size);
+    chunk.clear();
+    ++c;
+  };
+  rows([&](const T* row) {
+    chunk.insert(chunk.end(), row, row + cols);
+    ++written;
+    if (chunk.size() == e.chunkRows_ * cols) {
+      flush();
+    }
+  });
+  if (!chunk.empty()) {
+    flush();
+  }
+  if (written != e.rows_) {
+    throw IMeshExportError("Unexpected number of rows in array: " + name);
+  }
+  w.Patch(e.offset_, chunks.data(), chunks.size() * sizeof(std::uint64_t));
+  e.nbytes_ = w.Tell() - e.offset_;
+  return e;
+}
+
+// Node and element source streaming from the SMDS iterators of a mesh
+class SMDSMeshSource {
+public:
+  SMDSMeshSource(const SMESHDS_Mesh* ds, std::function<SMDS_NodeIteratorPtr()> nodes, const std::vector<std::int64_t>& index)
+    : ds_(ds), nodes_(std::move(nodes)), index_(index) {}
+
+  std::uint64_t NumNodes() const {
+    return static_cast<std::uint64_t>(ds_->NbNodes());
+  }
+
+  std::uint64_t NumElements(const ElementType& t) const {
+    return static_cast<std::uint64_t>(ds_->GetMeshInfo().NbElementsOfGeom(t.geom));
+  }
+
+  // Call f(x, y, z, shapeId) for each node in the order of node indices
+  template <typename F>
+  void ForEachNode(F f) const {
+    for (SMDS_NodeIteratorPtr it = nodes_(); it->more();) {
+      const SMDS_MeshNode* n = it->next();
+      f(n->X(), n->Y(), n->Z(), static_cast<std::int32_t>(n->GetShapeID()));
+    }
+  }
+
+  // Call f(corners, shapeId) for each element of a type with its 0-based corner node indices in VTK order
+  template <typename F>
+  void ForEachElement(const ElementType& t, F f) const {
+    std::int64_t corners[8];
+    for (SMDS_ElemIteratorPtr it = ds_->elementGeomIterator(t.geom); it->more();) {
+      const SMDS_MeshElement* e = it->next();
+      for (size_t j = 0; j < t.order.size(); ++j) {
+        corners[j] = index_[e->GetNode(t.order[j])->GetID()];
+      }
+      f(static_cast<const std::int64_t*>(corners), static_cast<std::int32_t>(e->GetShapeID()));
+    }
+  }
+
+private:
+  const SMESHDS_Mesh* ds_;
+  std::function<SMDS_NodeIteratorPtr()> nodes_;
+  const std::vector<std::int64_t>& index_;
+};
+
+// Node and element source reading the arrays of a frozen mesh
+class FrozenMeshSource {
+public:
+  explicit FrozenMeshSource(const IFrozenMesh& mesh) : mesh_(mesh) {}
+
+  std::uint64_t NumNodes() const {
+    return mesh_.nodeShapeIds_.size();
+  }
+
+  std::uint64_t NumElements(const ElementType& t) const {
+    const IFrozenMesh::Block* b = mesh_.FindBlock(t.geom);
+    return b ? b->shapeIds_.size() : 0;
+  }
+
+  template <typename F>
+  void ForEachNode(F f) const {
+    const std::vector<double>& x = mesh_.nodes_;
+    for (size_t i = 0; i < mesh_.nodeShapeIds_.size(); ++i) {
+      f(x[3 * i], x[3 * i + 1], x[3 * i + 2], mesh_.nodeShapeIds_[i]);
+    }
+  }
+
+  template <typename F>
+  void ForEachElement(const ElementType& t, F f) const {
+    const IFrozenMesh::Block* b = mesh_.FindBlock(t.geom);
+    if (!b) {
+      return;
+    }
+    const size_t k = t.order.size();
+    for (size_t i = 0; i < b->shapeIds_.size(); ++i) {
+      f(b->connectivity_.data() + i * k, b->shapeIds_[i]);
+    }
+  }
+
+private:
+  const IFrozenMesh& mesh_;
+};
+
+// Write the nodes and elements of a source to a binary Gmsh MSH 4.1 file, streamed in chunks
+template <typename Source>
+static void writeMSH(const Source& src, const std::string& path)
+{
+  // Mesh dimension, number of element blocks, and number of elements
+  std::uint64_t numElements = 0;
+  std::uint64_t numBlocks = 0;
+  int dim = 0;
+  for (const ElementType& t : elementTypes()) {
+    const std::uint64_t n = src.NumElements(t);
+    if (n > 0) {
+      numElements += n;
+      ++numBlocks;
+      dim = std::max(dim, t.dim);
+    }
+  }
+  const std::uint64_t numNodes = src.NumNodes();
+
+  ChunkWriter w(path);
+  w.PutText("$MeshFormat\n4.1 1 8\n");
+  w.Put<int>(1);
+  w.PutText("\n$EndMeshFormat\n");
+
+  // Nodes in a single block with contiguous 1-based tags
+  w.PutText("$Nodes\n");
+  w.Put<std::uint64_t>(numNodes > 0 ? 1 : 0);
+  w.Put<std::uint64_t>(numNodes);
+  w.Put<std::uint64_t>(numNodes > 0 ? 1 : 0);
+  w.Put<std::uint64_t>(numNodes);
+  if (numNodes > 0) {
+    w.Put<int>(dim);
+    w.Put<int>(1);
+    w.Put<int>(0);
+    w.Put<std::uint64_t>(numNodes);
+    for (std::uint64_t tag = 1; tag <= numNodes; ++tag) {
+      w.Put<std::uint64_t>(tag);
+    }
+    src.ForEachNode([&](double x, double y, double z, std::int32_t) {
+      w.Put<double>(x);
+      w.Put<double>(y);
+      w.Put<double>(z);
+    });
+  }
+  w.PutText("\n$EndNodes\n");
+
+  // Elements in one block per element type
+  w.PutText("$Elements\n");
+  w.Put<std::uint64_t>(numBlocks);
+  w.Put<std::uint64_t>(numElements);
+  w.Put<std::uint64_t>(numElements > 0 ? 1 : 0);
+  w.Put<std::uint64_t>(numElements);
+  std::uint64_t tag = 1;
+  for (const ElementType& t : elementTypes()) {
+    const std::uint64_t n = src.NumElements(t);
+    if (n == 0) {
+      continue;
+    }
+    const size_t k = t.order.size();
+    w.Put<int>(t.dim);
+    w.Put<int>(1);
+    w.Put<int>(t.gmshType);
+    w.Put<std::uint64_t>(n);
+    src.ForEachElement(t, [&](const std::int64_t* corners, std::int32_t) {
+      w.Put<std::uint64_t>(tag++);
+      for (size_t j = 0; j < k; ++j) {
+        w.Put<std::uint64_t>(corners[j] + 1);
+      }
+    });
+  }
+  w.PutText("\n$EndElements\n");
+
+  w.Close();
+}
+
+// Write the nodes and elements of a source to a VTK XML unstructured grid file with appended binary data, streamed in chunks
+template <typename Source>
+static void writeVTU(const Source& src, const std::string& path)
+{
+  // Sizes of the appended arrays
+  std::uint64_t numCells = 0;
+  std::uint64_t numConnectivity = 0;
+  for (const ElementType& t : elementTypes()) {
+    const std::uint64_t n = src.NumElements(t);
+    numCells += n;
+    numConnectivity += n * t.order.size();
+  }
+  const std::uint64_t numNodes = src.NumNodes();
+  const std::uint64_t pointsOffset = 0;
+  const std::uint64_t connectivityOffset = pointsOffset + 8 + numNodes * 3 * 8;
+  const std::uint64_t offsetsOffset = connectivityOffset + 8 + numConnectivity * 8;
+  const std::uint64_t typesOffset = offsetsOffset + 8 + numCells * 8;
+
+  std::ostringstream header;
+  header << "<?xml version=\"1.0\"?>\n"
+    << "<VTKFile type=\"UnstructuredGrid\" version=\"1.0\" byte_order=\"" << (isLittleEndian() ? "LittleEndian" : "BigEndian") << "\" header_type=\"UInt64\">\n"
+    << "  <UnstructuredGrid>\n"
+    << "    <Piece NumberOfPoints=\"" << numNodes << "\" NumberOfCells=\"" << numCells << "\">\n"
+    << "      <Points>\n"
+    << "        <DataArray type=\"Float64\" NumberOfComponents=\"3\" format=\"appended\" offset=\"" << pointsOffset << "\"/>\n"
+    << "      </Points>\n"
+    << "      <Cells>\n"
+    << "        <DataArray type=\"Int64\" Name=\"connectivity\" format=\"appended\" offset=\"" << connectivityOffset << "\"/>\n"
+    << "        <DataArray type=\"Int64\" Name=\"offsets\" format=\"appended\" offset=\"" << offsetsOffset << "\"/>\n"
+    << "        <DataArray type=\"UInt8\" Name=\"types\" format=\"appended\" offset=\"" << typesOffset << "\"/>\n"
+    << "      </Cells>\n"
+    << "    </Piece>\n"
+    << "  </UnstructuredGrid>\n"
+    << "  <AppendedData encoding=\"raw\">\n"
+    << "   _";
+
+  ChunkWriter w(path);
+  w.PutText(header.str());
+
+  // Points
+  w.Put<std::uint64_t>(numNodes * 3 * 8);
+  src.ForEachNode([&](double x, double y, double z, std::int32_t) {
+    w.Put<double>(x);
+    w.Put<double>(y);
+    w.Put<double>(z);
+  });
+
+  // Connectivity
+  w.Put<std::uint64_t>(numConnectivity * 8);
+  for (const ElementType& t : elementTypes()) {
+    const size_t k = t.order.size();
+    src.ForEachElement(t, [&](const std::int64_t* corners, std::int32_t) {
+      w.PutBytes(corners, k * sizeof(std::int64_t));
+    });
+  }
+
+  // Offsets
+  w.Put<std::uint64_t>(numCells * 8);
+  std::int64_t offset = 0;
+  for (const ElementType& t : elementTypes()) {
+    const std::int64_t k = static_cast<std::int64_t>(t.order.size());
+    for (std::uint64_t i = 0; i < src.NumElements(t); ++i) {
+      offset += k;
+      w.Put<std::int64_t>(offset);
+    }
+  }
+
+  // Types
+  w.Put<std::uint64_t>(numCells);
+  for (const ElementType& t : elementTypes()) {
+    for (std::uint64_t i = 0; i < src.NumElements(t); ++i) {
+      w.Put<std::uint8_t>(t.vtkType);
+    }
+  }
+
+  w.PutText("\n  </AppendedData>\n</VTKFile>\n");
+  w.Close();
+}
+
+// Write the nodes and elements of a source to a native container, streamed one array at a time
+template <typename Source>
+static void writeNative(const Source& src, const std::string& path, bool compress)
+{
+  // Element types with at least one element, each stored as a connectivity and a sub-shape ID array
+  std::vector<const ElementType*> types;
+  for (const ElementType& t : elementTypes()) {
+    if (src.NumElements(t) > 0) {
+      types.push_back(&t);
+    }
+  }
+  const std::uint64_t numNodes = src.NumNodes();
+
+  ChunkWriter w(path);
+
+  // Header and a table filled in once the arrays are written
+  NativeHeader header{};
+  std::copy(std::begin(kNativeMagic), std::end(kNativeMagic), header.magic_);
+  header.version_ = kNativeVersion;
+  header.numArrays_ = static_cast<std::uint32_t>(2 + 2 * types.size());
+  header.tableOffset_ = sizeof(NativeHeader);
+  w.PutBytes(&header, sizeof(header));
+  std::vector<NativeEntry> table(header.numArrays_);
+  w.PutBytes(table.data(), table.size() * sizeof(NativeEntry));
+
+  // Nodes, connectivity, and the sub-shape IDs used as groups
+  table[0] = writeNativeArray<double>(w, "nodes", numNodes, 3, 2, compress, [&](auto put) {
+    src.ForEachNode([&](double x, double y, double z, std::int32_t) {
+      const double p[3] = { x, y, z };
+      put(p);
+    });
+  });
+  table[1] = writeNativeArray<std::int32_t>(w, "node_shape_ids", numNodes, 1, 1, compress, [&](auto put) {
+    src.ForEachNode([&](double, double, double, std::int32_t shapeId) {
+      put(&shapeId);
+    });
+  });
+  for (size_t i = 0; i < types.size(); ++i) {
+    const ElementType& t = *types[i];
+    const std::uint64_t n = src.NumElements(t);
+    table[2 + 2 * i] = writeNativeArray<std::int64_t>(w, std::string("elements/") + t.name, n, t.order.size(), 2, compress, [&](auto put) {
+      src.ForEachElement(t, [&](const std::int64_t* corners, std::int32_t) {
+        put(corners);
+      });
+    });
+    table[3 + 2 * i] = writeNativeArray<std::int32_t>(w, std::string("element_shape_ids/") + t.name, n, 1, 1, compress, [&](auto put) {
+      src.ForEachElement(t, [&](const std::int64_t*, std::int32_t shapeId) {
+        put(&shapeId);
+      });
+    });
+  }
+
+  w.Patch(header.tableOffset_, table.data(), table.size() * sizeof(NativeEntry));
+  w.Close();
+}
+
+// Fill the arrays of a VTK unstructured grid directly from a source: points, connectivity, cell offsets, cell types, cell and point sub-shape IDs
+template <typename Source>
+static py::tuple vtkArrays(const Source& src)
+{
+  const py::ssize_t numNodes = static_cast<py::ssize_t>(src.NumNodes());
+  py::ssize_t numCells = 0;
+  py::ssize_t numConnectivity = 0;
+  for (const ElementType& t : elementTypes()) {
+    const py::ssize_t n = static_cast<py::ssize_t>(src.NumElements(t));
+    numCells += n;
+    numConnectivity += n * static_cast<py::ssize_t>(t.order.size());
+  }
+
+  py::array_t<double> points({ numNodes, py::ssize_t(3) });
+  py::array_t<std::int32_t> pointShapeIds(numNodes);
+  py::array_t<std::int64_t> connectivity(numConnectivity);
+  py::array_t<std::int64_t> offsets(numCells + 1);
+  py::array_t<std::uint8_t> types(numCells);
+  py::array_t<std::int32_t> cellShapeIds(numCells);
+
+  double* x = points.mutable_data();
+  std::int32_t* ps = pointShapeIds.mutable_data();
+  src.ForEachNode([&](double vx, double vy, double vz, std::int32_t shapeId) {
+    *x++ = vx;
+    *x++ = vy;
+    *x++ = vz;
+    *ps++ = shapeId;
+  });
+
+  // Cells of all element types in type order
+  std::int64_t* c = connectivity.mutable_data();
+  std::int64_t* o = offsets.mutable_data();
+  std::uint8_t* ct = types.mutable_data();
+  std::int32_t* cs = cellShapeIds.mutable_data();
+  std::int64_t offset = 0;
+  *o++ = 0;
+  for (const ElementType& t : elementTypes()) {
+    const size_t k = t.order.size();
+    src.ForEachElement(t, [&](const std::int64_t* corners, std::int32_t shapeId) {
+      c = std::copy(corners, corners + k, c);
+      offset += static_cast<std::int64_t>(k);
+      *o++ = offset;
+      *ct++ = t.vtkType;
+      *cs++ = shapeId;
+    });
+  }
+
+  return py::make_tuple(points, connectivity, offsets, types, cellShapeIds, pointShapeIds);
+}
+
+// Quality metric of a tetrahedron with corner nodes in VTK order (worst-case value if degenerate)
+static double tetraQuality(IMeshQualityMetric metric, const gp_XYZ p[4])
+{
+  const gp_XYZ u = p[1] - p[0];
+  const gp_XYZ v = p[2] - p[0];
+  const gp_XYZ w = p[3] - p[0];
+  const double jacobian = u.Dot(v.Crossed(w));
+
+  switch (metric) {
+  case IMeshQualityMetric::Volume:
+    return jacobian / 6.0;
+
+  case IMeshQualityMetric::AspectRatio:
+  {
+    // Circumradius over three times the inradius (1 for a regular tetrahedron, infinite for a flat one)
+    const double area = 0.5 * (u.Crossed(v).Modulus() + v.Crossed(w).Modulus() + w.Crossed(u).Modulus() + (p[2] - p[1]).Crossed(p[3] - p[1]).Modulus());
+    if (jacobian == 0.0 || area == 0.0) {
+      return std::numeric_limits<double>::infinity();
+    }
+    const gp_XYZ center = (u.SquareModulus() * v.Crossed(w) + v.SquareModulus() * w.Crossed(u) + w.SquareModulus() * u.Crossed(v)) / (2.0 * jacobian);
+    const double inradius = 0.5 * std::abs(jacobian) / area;
+    return center.Modulus() / (3.0 * inradius);
+  }
+
+  case IMeshQualityMetric::MinDihedralAngle:
+  {
+    // Outward face normals, where face i is opposite to node i
+    const gp_XYZ n[4] = {
+      (p[2] - p[1]).Crossed(p[3] - p[1]),
+      (p[3] - p[0]).Crossed(p[2] - p[0]),
+      (p[1] - p[0]).Crossed(p[3] - p[0]),
+      (p[2] - p[0]).Crossed(p[1] - p[0]),
+    };
+    const double pi = std::acos(-1.0);
+    double minAngle = pi;
+    for (int i = 0; i < 4; ++i) {
+      // A face collapsed to a segment or point has no normal, so the angle is zero
+      if (n[i].Modulus() == 0.0) {
+        return 0.0;
+      }
+    }
+    for (int i = 0; i < 4; ++i) {
+      for (int j = i + 1; j < 4; ++j) {
+        const double c = n[i].Dot(n[j]) / (n[i].Modulus() * n[j].Modulus());
+        minAngle = std::min(minAngle, pi - std::acos(std::clamp(c, -1.0, 1.0)));
+      }
+    }
+    return minAngle;
+  }
+
+  case IMeshQualityMetric::ScaledJacobian:
+  {
+    // Jacobian over the largest product of edge lengths at a corner (1 for a regular tetrahedron)
+    const double l01 = u.SquareModulus(), l02 = v.SquareModulus(), l03 = w.SquareModulus();
+    const double l12 = (p[2] - p[1]).SquareModulus(), l13 = (p[3] - p[1]).SquareModulus(), l23 = (p[3] - p[2]).SquareModulus();
+    const double lengths = std::sqrt(std::max({ l01 * l02 * l03, l01 * l12 * l13, l02 * l12 * l23, l03 * l13 * l23 }));
+    return lengths > 0.0 ? jacobian * std::sqrt(2.0) / lengths : 0.0;
+  }
+
+  default:
+    throw std::logic_error("Unsupported mesh quality metric.");
+  }
+}
+
+// Set the position of a copied node on the sub-shape with the given index (nothing if 0)
+static void copyNodePosition(const SMDS_MeshNode* n, const SMDS_MeshNode* copy, int index, SMESHDS_Mesh* dstDS)
+{
+  if (index == 0) {
+    return;
+  }
+  SMDS_PositionPtr pos = n->GetPosition();
+  switch (pos->GetTypeOfPosition()) {
+  case SMDS_TOP_VERTEX: dstDS->SetNodeOnVertex(copy, index); break;
+  case SMDS_TOP_EDGE:   dstDS->SetNodeOnEdge(copy, index, pos->GetParameters()[0]); break;
+  case SMDS_TOP_FACE:   dstDS->SetNodeOnFace(copy, index, pos->GetParameters()[0], pos->GetParameters()[1]); break;
+  case SMDS_TOP_3DSPACE: dstDS->SetNodeInVolume(copy, index); break;
+  default: break;
+  }
+}
+
+// Hash of a cell of a uniform grid
+struct CellHash {
+  size_t operator()(const std::array<std::int64_t, 3>& c) const {
+    return static_cast<size_t>((c[0] * 73856093) ^ (c[1] * 19349663) ^ (c[2] * 83492791));
+  }
+};
+
+// Copy all nodes and elements of a mesh into another mesh that contains the same sub-shapes (nodes are created in iteration order)
+static void copyMesh(SMESH_Mesh& src, SMESH_Mesh& dst, SMDS_NodeIteratorPtr srcNodes = SMDS_NodeIteratorPtr())
+{
+  SMESHDS_Mesh* srcDS = src.GetMeshDS();
+  SMESHDS_Mesh* dstDS = dst.GetMeshDS();
+
+  // Index of the source shape with the given ID in the destination mesh
+  auto dstShapeIndex = [&](int srcShapeId) {
+    if (srcShapeId <= 0) {
+      return 0;
+    }
+    const TopoDS_Shape& s = srcDS->IndexToShape(srcShapeId);
+    return s.IsNull() ? 0 : dstDS->ShapeToIndex(s);
+  };
+
+  // Copy nodes along with their position on the shape
+  std::vector<const SMDS_MeshNode*> nodes(static_cast<size_t>(srcDS->MaxNodeID()) + 1, nullptr);
+  for (SMDS_NodeIteratorPtr it = srcNodes ? srcNodes : srcDS->nodesIterator(); it->more();) {
+    const SMDS_MeshNode* n = it->next();
+    const SMDS_MeshNode* copy = dstDS->AddNode(n->X(), n->Y(), n->Z());
+    nodes[n->GetID()] = copy;
+    copyNodePosition(n, copy, dstShapeIndex(n->GetShapeID()), dstDS);
+  }
+
+  // Copy elements of all types
+  SMESH_MeshEditor editor(&dst);
+  SMESH_MeshEditor::ElemFeatures features;
+  std::vector<const SMDS_MeshNode*> elemNodes;
+  for (SMDS_ElemIteratorPtr it = srcDS->elementsIterator(); it->more();) {
+    const SMDS_MeshElement* e = it->next();
+    elemNodes.clear();
+    for (int j = 0; j < e->NbNodes(); ++j) {
+      elemNodes.push_back(nodes[e->GetNode(j)->GetID()]);
+    }
+    const SMDS_MeshElement* copy = editor.AddElement(elemNodes, features.Init(e));
+
+    const int index = dstShapeIndex(e->GetShapeID());
+    if (copy && index > 0) {
+      dstDS->SetMeshElementOnShape(copy, index);
+    }
+  }
+}
+
+// Listener recording the wall time until each sub-mesh is computed since the previous one
+class ComputeTimer : public SMESH_subMeshEventListener {
+public:
+  ComputeTimer() : SMESH_subMeshEventListener(false, "pyocctlite.ComputeTimer") {}
+
+  void ProcessEvent(const int event, const int eventType, SMESH_subMesh* subMesh, SMESH_subMeshEventListenerData*, const SMESH_Hypothesis*) override
+  {
+    if (eventType != SMESH_subMesh::COMPUTE_EVENT || (event != SMESH_subMesh::COMPUTE && event != SMESH_subMesh::COMPUTE_SUBMESH)) {
+      return;
+    }
+    const auto now = std::chrono::steady_clock::now();
+    times_[subMesh->GetId()] += std::chrono::duration<double>(now - last_).count();
+    last_ = now;
+  }
+
+  std::chrono::steady_clock::time_point last_ = std::chrono::steady_clock::now();
+  std::map<int, double> times_;
+};
+
+// Iterator over nodes in a given order of SMDS IDs
+class OrderedNodeIterator : public SMDS_Iterator<const SMDS_MeshNode*> {
+public:
+  OrderedNodeIterator(const SMDS_Mesh* mesh, const std::vector<std::int64_t>& ids) : mesh_(mesh), ids_(ids) {}
+  bool more() override { return next_ < ids_.size(); }
+  const SMDS_MeshNode* next() override { return mesh_->FindNode(static_cast<smIdType>(ids_[next_++])); }
+
+private:
+  const SMDS_Mesh* mesh_;
+  const std::vector<std::int64_t>& ids_;
+  size_t next_ = 0;
+};
+
+// Node order of reverse Cuthill-McKee (new index to old index) on a graph in CSR form
+static std::vector<std::int64_t> reverseCuthillMcKee(const std::vector<std::int64_t>& offsets, const std::vector<std::int64_t>& adjacency)
+{
+  const std::int64_t n = static_cast<std::int64_t>(offsets.size()) - 1;
+  auto degree = [&](std::int64_t v) { return offsets[v + 1] - offsets[v]; };
+
+  // Breadth-first search from a root returning the number of levels and the start of the last level in the queue
+  std::vector<std::int64_t> stamp(n, -1);
+  std::vector<std::int64_t> queue;
+  std::int64_t search = 0;
+  auto levels = [&](std::int64_t root, size_t& last) {
+    queue.clear();
+    queue.push_back(root);
+    stamp[root] = ++search;
+    size_t begin = 0;
+    for (int depth = 1;; ++depth) {
+      const size_t end = queue.size();
+      for (size_t i = begin; i < end; ++i) {
+        for (std::int64_t j = offsets[queue[i]]; j < offsets[queue[i] + 1]; ++j) {
+          if (stamp[adjacency[j]] != search) {
+            stamp[adjacency[j]] = search;
+            queue.push_back(adjacency[j]);
+          }
+        }
+      }
+      if (queue.size() == end) {
+        last = begin;
+        return depth;
+      }
+      begin = end;
+    }
+  };
+
+  std::vector<std::int64_t> order;
+  order.reserve(n);
+  std::vector<char> visited(n, 0);
+  std::vector<std::int64_t> next;
+  for (std::int64_t v = 0; v < n; ++v) {
+    if (visited[v]) {
+      continue;
+    }
+
+    // Pseudo-peripheral start node of the component (George-Liu)
+    std::int64_t start = v;
+    size_t last = 0;
+    int depth = levels(start, last);
+    for (;;) {
+      const std::int64_t candidate = *std::min_element(queue.begin() + last, queue.end(), [&](std::int64_t a, std::int64_t b) { return degree(a) < degree(b); });
+      const int candidateDepth = levels(candidate, last);
+      if (candidateDepth <= depth) {
+        break;
+      }
+      start = candidate;
+      depth = candidateDepth;
+    }
+
+    // Cuthill-McKee ordering visiting neighbours by increasing degree
+    const size_t begin = order.size();
+    order.push_back(start);
+    visited[start] = 1;
+    for (size_t i = begin; i < order.size(); ++i) {
+      next.clear();
+      for (std::int64_t j = offsets[order[i]]; j < offsets[order[i] + 1]; ++j) {
+        if (!visited[adjacency[j]]) {
+          visited[adjacency[j]] = 1;
+          next.push_back(adjacency[j]);
+        }
+      }
+      std::stable_sort(next.begin(), next.end(), [&](std::int64_t a, std::int64_t b) { return degree(a) < degree(b); });
+      order.insert(order.end(), next.begin(), next.end());
+    }
+  }
+
+  std::reverse(order.begin(), order.end());
+  return order;
+}
+
+// Copy CSR vectors into a pair of arrays
+static std::pair<py::array_t<std::int64_t>, py::array_t<std::int64_t>> toCSR(const std::vector<std::int64_t>& offsets, const std::vector<std::int64_t>& indices)
+{
+  py::array_t<std::int64_t> o(static_cast<py::ssize_t>(offsets.size()));
+  py::array_t<std::int64_t> i(static_cast<py::ssize_t>(indices.size()));
+  std::copy(offsets.begin(), offsets.end(), o.mutable_data());
+  std::copy(indices.begin(), indices.end(), i.mutable_data());
+  return { o, i };
+}
+
+// Check that an array is a permutation of [0, n) and return it as a vector
+static std::vector<std::int64_t> checkOrder(const py::array_t<std::int64_t, py::array::c_style | py::array::forcecast>& order, std::int64_t n)
+{
+  if (order.ndim() != 1 || order.shape(0) != n) {
+    throw std::invalid_argument("Node order must be a 1D array with one entry per node.");
+  }
+  std::vector<std::int64_t> result(order.data(), order.data() + n);
+  std::vector<char> seen(n, 0);
+  for (std::int64_t i : result) {
+    if (i < 0 || i >= n || seen[i]) {
+      throw std::invalid_argument("Node order must be a permutation of the node indices.");
+    }
+    seen[i] = 1;
+  }
+  return result;
+}
+
+// NETGEN keeps its parameters and terminate flag in process-global state, so only one computation runs at a time (and is the only one a token can cancel)
+static std::mutex& netgenMutex()
+{
+  static std::mutex mutex;
+  return mutex;
+}
+
+void IMeshCancelToken::Cancel()
+{
+  std::lock_guard<std::mutex> lock(data_->mutex_);
+  data_->cancelled_ = true;
+  for (auto& c : data_->running_) {
+    c.gen_->CancelCompute(*c.mesh_, c.shape_);
+  }
+}
+
+bool IMeshCancelToken::IsCancelled() const
+{
+  std::lock_guard<std::mutex> lock(data_->mutex_);
+  return data_->cancelled_;
+}
+
+bool IMeshCancelToken::Begin(SMESH_Gen* gen, SMESH_Mesh* mesh, const TopoDS_Shape& shape)
+{
+  std::lock_guard<std::mutex> lock(data_->mutex_);
+  if (data_->cancelled_) {
+    return false;
+  }
+  // Reset the cancel flag of the generator before it can be cancelled
+  gen->PrepareCompute(*mesh, shape);
+  data_->running_.push_back({ gen, mesh, shape });
+  return true;
+}
+
+void IMeshCancelToken::End(SMESH_Gen* gen)
+{
+  std::lock_guard<std::mutex> lock(data_->mutex_);
+  auto& running = data_->running_;
+  running.erase(std::remove_if(running.begin(), running.end(), [&](const Computation& c) { return c.gen_ == gen; }), running.end());
+}
+
+void IMeshGenerator::Close()
+{
+  std::lock_guard<std::mutex> lock(data_->mutex_);
+  data_->closed_ = true;
+  data_->table_.clear();
+}
+
+bool IMeshGenerator::IsClosed() const
+{
+  std::lock_guard<std::mutex> lock(data_->mutex_);
+  return data_->closed_;
+}
+
+int IMeshGenerator::NumHypotheses() const
+{
+  std::lock_guard<std::mutex> lock(data_->mutex_);
+  return static_cast<int>(data_->table_.size());
+}
+
+std::shared_ptr<IMeshGenerator::Data> IMeshGenerator::Open() const
+{
+  if (IsClosed()) {
+    throw std::logic_error("Mesh generator is closed.");
+  }
+  return data_;
+}
+
+IMesh IMesh::MakeMesh(const IShape& shape, const IMeshControl& globalControl, const std::vector<IMeshControl>& localControls, IMeshCancelToken* cancel, IMeshGenerator* generator, bool assembly)
+{
+  if (assembly) {
+    // Bodies are the solids of the shape, or its faces if there are no solids
+    TopTools_ListOfShape bodies;
+    for (TopExp_Explorer exp(shape, TopAbs_SOLID); exp.More(); exp.Next()) {
+      bodies.Append(exp.Current());
+    }
+    if (bodies.IsEmpty()) {
+      for (TopExp_Explorer exp(shape, TopAbs_FACE); exp.More(); exp.Next()) {
+        bodies.Append(exp.Current());
+      }
+    }
+
+    if (bodies.Extent() > 1) {
+      // General fuse so that touching bodies share one face (or edge) per interface, meshed once for both sides
+      BRepAlgoAPI_BuilderAlgo fuse;
+      fuse.SetArguments(bodies);
+      fuse.SetNonDestructive(true);
+      fuse.Build();
+      if (!fuse.IsDone() || fuse.HasErrors()) {
+        throw IMeshComputeError("General fuse of the assembly failed.");
+      }
+      const IShape fused(fuse.Shape());
+
+      // Controls apply to the images of their targets in the fused shape
+      auto images = [&](const TopoDS_Shape& s) {
+        std::vector<IShape> result;
+        if (s.IsSame(shape)) {
+          result.push_back(fused);
+        }
+        else if (!fuse.Modified(s).IsEmpty()) {
+          for (const TopoDS_Shape& m : fuse.Modified(s)) {
+            result.emplace_back(m);
+          }
+        }
+        else if (!fuse.IsDeleted(s)) {
+          result.emplace_back(s);
+        }
+        return result;
+      };
+
+      std::vector<IMeshControl> fusedLocals;
+      std::vector<IShape> globalImages = images(globalControl.Shape());
+      if (globalImages.empty()) {
+        throw IMeshControlError("Target of the global control was removed by the general fuse.");
+      }
+      for (size_t i = 1; i < globalImages.size(); ++i) {
+        fusedLocals.push_back(globalControl.WithShape(globalImages[i]));
+      }
+      for (const auto& c : localControls) {
+        for (const IShape& image : images(c.Shape())) {
+          fusedLocals.push_back(c.WithShape(image));
+        }
+      }
+
+      return MakeMesh(fused, globalControl.WithShape(globalImages[0]), fusedLocals, cancel, generator);
+    }
+  }
+
+  // Generator of the resulting mesh, used by one computation at a time
+  auto gen = generator ? generator->Open() : std::make_shared<IMeshGenerator::Data>();
+
+  const TopoDS_Shape& target = static_cast<const TopoDS_Shape&>(shape);
+  const TopoDS_Shape& globalTarget = static_cast<const TopoDS_Shape&>(globalControl.Shape());
+
+  std::lock_guard<std::mutex> lock(gen->mutex_);
+  auto state = std::make_shared<State>(gen);
+  state->shape_ = target;
+  state->mesh_->ShapeToMesh(state->shape_);
+  ApplyControl(*state, globalTarget, globalControl);
+  for (const auto& c : localControls) {
+    ApplyControl(*state, c.Shape(), c);
+  }
+  Compute(*state, cancel);
+  return IMesh(state);
+}
+
+IMesh IMesh::ImportUNV(const std::string& path)
+{
+  auto state = std::make_shared<State>();
+  state->mesh_->UNVToMesh(path.c_str());
+
+  return IMesh(state);
+}
+
+IMesh IMesh::ImportUNV(const std::string& path, const IShape& shape, const py::array_t<std::int32_t, py::array::c_style | py::array::forcecast>& nodeShapeIds, const py::array_t<double, py::array::c_style | py::array::forcecast>& nodeParams, const py::array_t<std::int32_t, py::array::c_style | py::array::forcecast>& elementShapeIds)
+{
+  const IMesh imported = ImportUNV(path);
+  const SMESHDS_Mesh* srcDS = imported.state_->mesh_->GetMeshDS();
+  const py::ssize_t numNodes = srcDS->NbNodes();
+  const py::ssize_t numElements = srcDS->NbElements();
+  if (nodeShapeIds.ndim() != 1 || nodeShapeIds.shape(0) != numNodes || nodeParams.ndim() != 2 || nodeParams.shape(0) != numNodes || nodeParams.shape(1) != 2
+    || elementShapeIds.ndim() != 1 || elementShapeIds.shape(0) != numElements) {
+    throw std::invalid_argument("Shape positions must have one entry per node and element of the file.");
+  }
+
+  auto state = std::make_shared<State>();
+  state->shape_ = shape;
+  state->mesh_->ShapeToMesh(state->shape_);
+  SMESHDS_Mesh* ds = state->mesh_->GetMeshDS();
+
+  // Sub-shape ID checked against the shape
+  const int maxIndex = ds->MaxShapeIndex();
+  auto checkId = [&](int id) {
+    if (id < 0 || id > maxIndex) {
+      throw std::invalid_argument("Shape position refers to sub-shape ID " + std::to_string(id) + " which is not in the shape.");
+    }
+    return id;
+  };
+
+  // Nodes are read in ID order, which is the order they were written in
+  auto ids = nodeShapeIds.unchecked<1>();
+  auto params = nodeParams.unchecked<2>();
+  std::vector<const SMDS_MeshNode*> nodes(static_cast<size_t>(srcDS->MaxNodeID()) + 1, nullptr);
+  py::ssize_t i = 0;
+  for (SMDS_NodeIteratorPtr it = srcDS->nodesIterator(); it->more(); ++i) {
+    const SMDS_MeshNode* n = it->next();
+    const SMDS_MeshNode* copy = ds->AddNode(n->X(), n->Y(), n->Z());
+    nodes[n->GetID()] = copy;
+
+    const int index = checkId(ids(i));
+    if (index == 0) {
+      continue;
+    }
+    switch (ds->IndexToShape(index).ShapeType()) {
+    case TopAbs_VERTEX: ds->SetNodeOnVertex(copy, index); break;
+    case TopAbs_EDGE:   ds->SetNodeOnEdge(copy, index, params(i, 0)); break;
+    case TopAbs_FACE:   ds->SetNodeOnFace(copy, index, params(i, 0), params(i, 1)); break;
+    default:            ds->SetNodeInVolume(copy, index); break;
+    }
+  }
+
+  // Elements likewise
+  auto elementIds = elementShapeIds.unchecked<1>();
+  SMESH_MeshEditor editor(state->mesh_.get());
+  SMESH_MeshEditor::ElemFeatures features;
+  std::vector<const SMDS_MeshNode*> elemNodes;
+  i = 0;
+  for (SMDS_ElemIteratorPtr it = srcDS->elementsIterator(); it->more(); ++i) {
+    const SMDS_MeshElement* e = it->next();
+    elemNodes.clear();
+    for (int j = 0; j < e->NbNodes(); ++j) {
+      elemNodes.push_back(nodes[e->GetNode(j)->GetID()]);
+    }
+    const SMDS_MeshElement* copy = editor.AddElement(elemNodes, features.Init(e));
+
+    const int index = checkId(elementIds(i));
+    if (copy && index > 0) {
+      ds->SetMeshElementOnShape(copy, index);
+    }
+  }
+
+  return IMesh(state);
+}
+
+void IMesh::ApplyControl(State& state, const TopoDS_Shape& target, const IMeshControl& c)
+{
+  // Get a hypothesis/algorithm from the table of the generator, creating it on first use
+  auto shared = [&](const std::string& key, auto create) -> SMESH_Hypothesis*
+  {
+    IMeshGenerator::Data& gen = *state.gen_;
+    auto found = gen.table_.find(key);
+    if (found == gen.table_.end()) {
+      found = gen.table_.emplace(key, std::shared_ptr<SMESH_Hypothesis>(create(gen.nextId_++, gen.gen_.get()))).first;
+    }
+    state.owned_.push_back(found->second);
+    return found->second.get();
+  };
+
+  // Key of a hypothesis from its type and the control parameters
+  auto key = [&](const char* type)
+  {
+    std::ostringstream ss;
+    ss.precision(17);
+    ss << type;
+    for (const auto& value : { c.EdgeSize(), c.Deflection() }) {
+      ss << '|';
+      if (value) {
+        ss << *value;
+      }
+    }
+    ss << '|' << c.AllowQuads() << '|' << c.SizeFile().value_or("");
+    ss << '|' << (c.Fineness() ? static_cast<int>(*c.Fineness()) : -1) << '|' << c.SurfaceOptSteps().value_or(-1) << '|' << c.VolumeOptSteps().value_or(-1) << '|';
+    if (c.GrowthRate()) {
+      ss << *c.GrowthRate();
+    }
+    return ss.str();
+  };
+
+  // Assign helper to add a hypothesis and algorithm to the target and record them
+  auto assign = [&](SMESH_Hypothesis* hyp, SMESH_Hypothesis* algo)
+  {
+    state.mesh_->AddHypothesis(target, hyp->GetID());
+    state.mesh_->AddHypothesis(target, algo->GetID());
+    state.assignments_.push_back({ target, c.Dimension(), hyp->GetID(), algo->GetID() });
+  };
+
+  // Helper to apply 1D controls
+  auto apply1D = [&]()
+  {
+    // 1D size hypothesis, adapted to curvature if a deflection is given
+    SMESH_Hypothesis* hyp = nullptr;
+    if (c.Deflection() && c.EdgeSize()) {
+      hyp = shared(key("Adaptive1D"), [&](int id, SMESH_Gen* gen)
+        {
+          auto adaptive = new StdMeshers_Adaptive1D(id, gen);
+          adaptive->SetMaxSize(*c.EdgeSize());
+          adaptive->SetDeflection(*c.Deflection());
+          return adaptive;
+        });
+    }
+    else if (c.Deflection()) {
+      hyp = shared(key("Deflection1D"), [&](int id, SMESH_Gen* gen)
+        {
+          auto deflection = new StdMeshers_Deflection1D(id, gen);
+          deflection->SetDeflection(*c.Deflection());
+          return deflection;
+        });
+    }
+    else {
+      hyp = shared(key("LocalLength"), [&](int id, SMESH_Gen* gen)
+        {
+          auto length = new StdMeshers_LocalLength(id, gen);
+          if (c.EdgeSize()) {
+            length->SetLength(*c.EdgeSize());
+          }
+          return length;
+        });
+    }
+
+    // 1D meshing algorithm
+    auto algo = shared("Regular_1D", [](int id, SMESH_Gen* gen) { return new StdMeshers_Regular_1D(id, gen); });
+
+    assign(hyp, algo);
+  };
+
+  // Helper to set curvature-driven sizing, the size field, and NETGEN parameters on a full NETGEN hypothesis
+  auto setFull = [&](NETGENPlugin_Hypothesis* hyp)
+  {
+    if (c.EdgeSize()) {
+      hyp->SetMaxSize(*c.EdgeSize());
+    }
+    hyp->SetSurfaceCurvature(c.Deflection().has_value());
+    if (c.Deflection()) {
+      hyp->SetChordalErrorEnabled(true);
+      hyp->SetChordalError(*c.Deflection());
+    }
+    if (c.SizeFile()) {
+      hyp->SetMeshSizeFile(*c.SizeFile());
+    }
+
+    // Fineness first since it resets the growth rate
+    if (c.Fineness()) {
+      hyp->SetFineness(static_cast<NETGENPlugin_Hypothesis::Fineness>(*c.Fineness()));
+    }
+    if (c.GrowthRate()) {
+      hyp->SetGrowthRate(*c.GrowthRate());
+    }
+    if (c.SurfaceOptSteps()) {
+      hyp->SetNbSurfOptSteps(*c.SurfaceOptSteps());
+    }
+    if (c.VolumeOptSteps()) {
+      hyp->SetNbVolOptSteps(*c.VolumeOptSteps());
+    }
+  };
+
+  // Helper to apply 2D controls
+  auto apply2D = [&]()
+  {
+    // 2D size hypothesis, adapted to curvature if a deflection is given, to a size field, and to NETGEN parameters if given
+    SMESH_Hypothesis* hyp = nullptr;
+    if (c.Deflection() || c.SizeFile() || c.HasNetgenParameters()) {
+      hyp = shared(key("NETGEN_Parameters_2D"), [&](int id, SMESH_Gen* gen)
+        {
+          auto full = new NETGENPlugin_Hypothesis_2D(id, gen);
+          setFull(full);
+          full->SetQuadAllowed(c.AllowQuads());
+          return full;
+        });
+    }
+    else {
+      hyp = shared(key("NETGEN_SimpleParameters_2D"), [&](int id, SMESH_Gen* gen)
+        {
+          auto simple = new NETGENPlugin_SimpleHypothesis_2D(id, gen);
+          if (c.EdgeSize()) {
+            simple->SetLocalLength(*c.EdgeSize());
+          }
+          simple->SetAllowQuadrangles(c.AllowQuads());
+          return simple;
+        });
+    }
+
+    // 2D meshing algorithm
+    auto algo = shared("NETGEN_2D", [](int id, SMESH_Gen* gen) { return new NETGENPlugin_NETGEN_2D(id, gen); });
+
+    assign(hyp, algo);
+  };
+
+  // Helper to apply 3D controls
+  auto apply3D = [&]()
+  {
+    // 3D size hypothesis, adapted to curvature if a deflection is given, to a size field, and to NETGEN parameters if given
+    SMESH_Hypothesis* hyp = nullptr;
+    if (c.Deflection() || c.SizeFile() || c.HasNetgenParameters()) {
+      hyp = shared(key("NETGEN_Parameters"), [&](int id, SMESH_Gen* gen)
+        {
+          auto full = new NETGENPlugin_Hypothesis(id, gen);
+          setFull(full);
+          return full;
+        });
+    }
+    else {
+      hyp = shared(key("NETGEN_SimpleParameters_3D"), [&](int id, SMESH_Gen* gen)
+        {
+          auto simple = new NETGENPlugin_SimpleHypothesis_3D(id, gen);
+          if (c.EdgeSize()) {
+            simple->SetLocalLength(*c.EdgeSize());
+          }
+          return simple;
+        });
+    }
+
+    // 3D meshing algorithm
+    auto algo = shared("NETGEN_2D3D", [](int id, SMESH_Gen* gen) { return new NETGENPlugin_NETGEN_2D3D(id, gen); });
+
+    assign(hyp, algo);
+  };
+
+  // Apply the control based on its dimension
+  switch (c.Dimension()) {
+  case 1: apply1D(); break;
+  case 2: apply2D(); break;
+  case 3: apply3D(); break;
+  default:
+    throw IMeshControlError("Unsupported mesh control dimension: " + std::to_string(c.Dimension()));
+  }
+}
+
+void IMesh::Remesh(const std::vector<IMeshControl>& changedControls)
+{
+  State& state = *state_;
+  if (state.shape_.IsNull()) {
+    throw IMeshControlError("Mesh is not associated with a shape.");
+  }
+  if (state.assignments_.empty()) {
+    throw IMeshControlError("Mesh has no controls to change since it was not computed.");
+  }
+
+  std::lock_guard<std::mutex> lock(state.gen_->mutex_);
+  if (state.gen_->closed_) {
+    throw std::logic_error("Mesh generator is closed.");
+  }
+
+  // Queries already running keep their copy of the spatial index
+  std::lock_guard<std::mutex> caches(state.cacheMutex_);
+
+  for (const auto& c : changedControls) {
+    const TopoDS_Shape target = c.Shape();
+
+    // Remove the hypothesis and algorithm previously assigned to the same target and dimension
+    auto found = std::find_if(state.assignments_.begin(), state.assignments_.end(), [&](const State::Assignment& a)
+      {
+        return a.dim_ == c.Dimension() && a.target_.IsSame(target);
+      });
+    if (found != state.assignments_.end()) {
+      for (int id : { found->hypId_, found->algoId_ }) {
+        state.mesh_->RemoveHypothesis(found->target_, id);
+        auto owned = std::find_if(state.owned_.begin(), state.owned_.end(), [&](const auto& p) { return p->GetID() == id; });
+        if (owned != state.owned_.end()) {
+          state.owned_.erase(owned);
+        }
+      }
+      state.assignments_.erase(found);
+    }
+
+    // Changing hypotheses cleans the affected sub-meshes and their dependants
+    ApplyControl(state, target, c);
+  }
+
+  // Only sub-meshes that are not computed are meshed again
+  state.nodeOrder_.clear();
+  state.nodeIndex_.clear();
+  state.spatialIndex_.reset();
+  state.shapeGroups_.clear();
+  Compute(state);
+}
+
+IMesh IMesh::Replicate(const std::vector<ITransform>& transforms, double tolerance) const
+{
+  const State& src = *state_;
+  SMESHDS_Mesh* srcDS = src.mesh_->GetMeshDS();
+
+  std::shared_ptr<State> state;
+  {
+    std::lock_guard<std::mutex> lock(src.gen_->mutex_);
+    state = std::make_shared<State>(src.gen_);
+  }
+  SMESHDS_Mesh* ds = state->mesh_->GetMeshDS();
+
+  // Transformed shape of each copy in one compound
+  std::vector<std::unique_ptr<BRepBuilderAPI_Transform>> shapes;
+  if (!src.shape_.IsNull()) {
+    BRep_Builder builder;
+    TopoDS_Compound compound;
+    builder.MakeCompound(compound);
+    for (const ITransform& t : transforms) {
+      shapes.push_back(std::make_unique<BRepBuilderAPI_Transform>(src.shape_, static_cast<gp_Trsf>(t)));
+      builder.Add(compound, shapes.back()->Shape());
+    }
+    state->shape_ = compound;
+    state->mesh_->ShapeToMesh(state->shape_);
+  }
+
+  SMESH_MeshEditor editor(state->mesh_.get());
+  SMESH_MeshEditor::ElemFeatures features;
+  std::vector<const SMDS_MeshNode*> nodes(static_cast<size_t>(srcDS->MaxNodeID()) + 1, nullptr);
+  std::vector<const SMDS_MeshNode*> elemNodes;
+  std::vector<const SMDS_MeshNode*> added;
+
+  // Nodes of previous copies by the cell of the tolerance grid containing them
+  std::unordered_map<std::array<std::int64_t, 3>, std::vector<const SMDS_MeshNode*>, CellHash> grid;
+  auto cell = [&](const gp_XYZ& p) {
+    return std::array<std::int64_t, 3>{ static_cast<std::int64_t>(std::floor(p.X() / tolerance)), static_cast<std::int64_t>(std::floor(p.Y() / tolerance)), static_cast<std::int64_t>(std::floor(p.Z() / tolerance)) };
+  };
+
+  for (size_t k = 0; k < transforms.size(); ++k) {
+    const gp_Trsf trsf = transforms[k];
+
+    // Sub-shape index in the new mesh of each sub-shape index of this mesh
+    std::vector<int> shapeIndex(static_cast<size_t>(srcDS->MaxShapeIndex()) + 1, 0);
+    if (!src.shape_.IsNull()) {
+      for (int i = 1; i < static_cast<int>(shapeIndex.size()); ++i) {
+        const TopoDS_Shape& s = srcDS->IndexToShape(i);
+        if (!s.IsNull()) {
+          shapeIndex[i] = ds->ShapeToIndex(shapes[k]->ModifiedShape(s));
+        }
+      }
+    }
+
+    // Transformed nodes, reusing a node of a previous copy within the tolerance
+    added.clear();
+    for (SMDS_NodeIteratorPtr it = NodesIterator(); it->more();) {
+      const SMDS_MeshNode* n = it->next();
+      gp_XYZ p(n->X(), n->Y(), n->Z());
+      trsf.Transforms(p);
+
+      const SMDS_MeshNode* copy = nullptr;
+      if (tolerance > 0. && !grid.empty()) {
+        const std::array<std::int64_t, 3> c = cell(p);
+        double best = tolerance * tolerance;
+        for (std::int64_t i = -1; i <= 1; ++i) {
+          for (std::int64_t j = -1; j <= 1; ++j) {
+            for (std::int64_t l = -1; l <= 1; ++l) {
+              auto found = grid.find({ c[0] + i, c[1] + j, c[2] + l });
+              if (found == grid.end()) {
+                continue;
+              }
+              for (const SMDS_MeshNode* m : found->second) {
+                const double d = (gp_XYZ(m->X(), m->Y(), m->Z()) - p).SquareModulus();
+                if (d <= best) {
+                  best = d;
+                  copy = m;
+                }
+              }
+            }
+          }
+        }
+      }
+      if (!copy) {
+        copy = ds->AddNode(p.X(), p.Y(), p.Z());
+        copyNodePosition(n, copy, shapeIndex[std::max(n->GetShapeID(), 0)], ds);
+        added.push_back(copy);
+      }
+      nodes[n->GetID()] = copy;
+    }
+    if (tolerance > 0.) {
+      for (const SMDS_MeshNode* n : added) {
+        grid[cell(gp_XYZ(n->X(), n->Y(), n->Z()))].push_back(n);
+      }
+    }
+
+    // Elements, reoriented if the transform is a reflection
+    for (SMDS_ElemIteratorPtr it = srcDS->elementsIterator(); it->more();) {
+      const SMDS_MeshElement* e = it->next();
+      elemNodes.clear();
+      for (int j = 0; j < e->NbNodes(); ++j) {
+        elemNodes.push_back(nodes[e->GetNode(j)->GetID()]);
+      }
+      const SMDS_MeshElement* copy = editor.AddElement(elemNodes, features.Init(e));
+      if (!copy) {
+        continue;
+      }
+      if (trsf.IsNegative()) {
+        editor.Reorient(copy);
+      }
+      const int index = shapeIndex[std::max(e->GetShapeID(), 0)];
+      if (index > 0) {
+        ds->SetMeshElementOnShape(copy, index);
+      }
+    }
+  }
+
+  return IMesh(state);
+}
+
+void IMesh::Compute(State& state, IMeshCancelToken* cancel)
+{
+  // Register with the token only while holding the NETGEN lock, so that cancelling, which sets the process-global NETGEN terminate flag, only stops this computation
+  std::lock_guard<std::mutex> netgen(netgenMutex());
+  SMESH_Gen* gen = state.gen_->gen_.get();
+  if (cancel && !cancel->Begin(gen, state.mesh_.get(), state.shape_)) {
+    throw IMeshCancelledError("Mesh computation was cancelled.");
+  }
+
+  // Unregister from the token even if the computation throws
+  struct Guard {
+    IMeshCancelToken* cancel_;
+    SMESH_Gen* gen_;
+    ~Guard() { if (cancel_) cancel_->End(gen_); }
+  } guard{ cancel, gen };
+
+  // Time sub-meshes by listening to their compute events
+  ComputeTimer timer;
+  std::vector<SMESH_subMesh*> subMeshes;
+  for (SMESH_subMeshIteratorPtr it = state.mesh_->GetSubMesh(state.shape_)->getDependsOnIterator(true); it->more();) {
+    SMESH_subMesh* sm = it->next();
+    sm->SetEventListener(&timer, nullptr, sm);
+    subMeshes.push_back(sm);
+  }
+
+  const auto start = std::chrono::steady_clock::now();
+  bool ok = false;
+  try {
+    ok = gen->Compute(*state.mesh_, state.shape_);
+  }
+  catch (...) {
+    for (SMESH_subMesh* sm : subMeshes) {
+      sm->DeleteEventListener(&timer);
+    }
+    throw;
+  }
+
+  // Report the time, size, and error of each sub-mesh
+  IMeshReport& report = state.report_;
+  report.entries_.clear();
+  report.totalTime_ = std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+  std::string errors;
+  for (SMESH_subMesh* sm : subMeshes) {
+    sm->DeleteEventListener(&timer);
+
+    IMeshReport::Entry e;
+    e.shape_ = sm->GetSubShape();
+    e.shapeId_ = sm->GetId();
+    if (const SMESH_Algo* algo = sm->GetAlgo()) {
+      e.algorithm_ = algo->GetName();
+    }
+    auto time = timer.times_.find(e.shapeId_);
+    e.time_ = time != timer.times_.end() ? time->second : 0.;
+    if (const SMESHDS_SubMesh* ds = sm->GetSubMeshDS()) {
+      e.numNodes_ = static_cast<int>(ds->NbNodes());
+      e.numElements_ = static_cast<int>(ds->NbElements());
+    }
+    e.computed_ = sm->IsMeshComputed();
+    const SMESH_ComputeErrorPtr error = sm->GetComputeError();
+    if (error && !error->IsOK()) {
+      e.error_ = error->CommonName();
+      if (!error->myComment.empty()) {
+        e.error_ += ": " + error->myComment;
+      }
+      errors += "\n  Sub-shape " + std::to_string(e.shapeId_) + (e.algorithm_.empty() ? "" : " (" + e.algorithm_ + ")") + ": " + e.error_;
+    }
+    report.entries_.push_back(std::move(e));
+  }
+
+  if (cancel && cancel->IsCancelled()) {
+    throw IMeshCancelledError("Mesh computation was cancelled.");
+  }
+  if (!ok) {
+    throw IMeshComputeError("Mesh computation failed." + errors);
+  }
+}
+
+int IMesh::NumNodes() const { return state_->mesh_->NbNodes(); }
+int IMesh::NumEdges() const { return state_->mesh_->NbEdges(); }
+int IMesh::NumFaces() const { return state_->mesh_->NbFaces(); }
+int IMesh::NumTriangles() const { return state_->mesh_->NbTriangles(); }
+int IMesh::NumQuadrangles() const { return state_->mesh_->NbQuadrangles(); }
+int IMesh::NumTetras() const { return state_->mesh_->NbTetras(); }
+
+const std::vector<std::int64_t>& IMesh::NodeIndex() const
+{
+  std::vector<std::int64_t>& index = state_->nodeIndex_;
+  if (!index.empty()) {
+    return index;
+  }
+
+  const SMESHDS_Mesh* ds = state_->mesh_->GetMeshDS();
+  index.assign(static_cast<size_t>(ds->MaxNodeID()) + 1, -1);
+
+  std::int64_t i = 0;
+  for (SMDS_NodeIteratorPtr it = NodesIterator(); it->more(); ++i) {
+    index[it->next()->GetID()] = i;
+  }
+
+  return index;
+}
+
+SMDS_NodeIteratorPtr IMesh::NodesIterator() const
+{
+  const SMESHDS_Mesh* ds = state_->mesh_->GetMeshDS();
+  if (state_->nodeOrder_.empty()) {
+    return ds->nodesIterator();
+  }
+  return SMDS_NodeIteratorPtr(new OrderedNodeIterator(ds, state_->nodeOrder_));
+}
+
+std::vector<std::int64_t> IMesh::ElementIndex(SMDSAbs_GeometryType geom) const
+{
+  const SMESHDS_Mesh* ds = state_->mesh_->GetMeshDS();
+  std::vector<std::int64_t> index(static_cast<size_t>(ds->MaxElementID()) + 1, -1);
+
+  std::int64_t i = 0;
+  for (SMDS_ElemIteratorPtr it = ds->elementGeomIterator(geom); it->more(); ++i) {
+    index[it->next()->GetID()] = i;
+  }
 
-#include <NETGENPlugin_SimpleHypothesis_3D.hxx>
-#include <NETGENPlugin_NETGEN_2D3D.hxx>
-#include <NETGENPlugin_SimpleHypothesis_2D.hxx>
-#include <NETGENPlugin_NETGEN_2D.hxx>
-#include <StdMeshers_LocalLength.hxx>
-#include <StdMeshers_Regular_1D.hxx>
+  return index;
+}
 
-IMesh IMesh::MakeMesh(const IShape& shape, const IMeshControl& globalControl, const std::vector<IMeshControl>& localControls)
+void IMesh::NodeGraph(std::vector<std::int64_t>& offsets, std::vector<std::int64_t>& adjacency) const
 {
-  auto state = std::make_shared<State>();
+  const std::vector<std::int64_t>& index = NodeIndex();
 
-  // Set shape to mesh
-  state->shape_ = static_cast<const TopoDS_Shape&>(shape);
-  state->mesh_->ShapeToMesh(state->shape_);
+  // Other nodes of the elements around each node from the inverse connectivity
+  offsets.assign(1, 0);
+  adjacency.clear();
+  std::vector<std::int64_t> row;
+  for (SMDS_NodeIteratorPtr it = NodesIterator(); it->more();) {
+    const SMDS_MeshNode* n = it->next();
+    row.clear();
+    for (SMDS_ElemIteratorPtr elems = n->GetInverseElementIterator(); elems->more();) {
+      const SMDS_MeshElement* e = elems->next();
+      for (int j = 0; j < e->NbNodes(); ++j) {
+        if (e->GetNode(j) != n) {
+          row.push_back(index[e->GetNode(j)->GetID()]);
+        }
+      }
+    }
+    std::sort(row.begin(), row.end());
+    adjacency.insert(adjacency.end(), row.begin(), std::unique(row.begin(), row.end()));
+    offsets.push_back(static_cast<std::int64_t>(adjacency.size()));
+  }
+}
+
+py::array_t<double> IMesh::Nodes() const
+{
+  const SMESHDS_Mesh* ds = state_->mesh_->GetMeshDS();
+
+  // Fill coordinates directly into the array in the order of node indices
+  py::array_t<double> nodes({ static_cast<py::ssize_t>(ds->NbNodes()), py::ssize_t(3) });
+  auto r = nodes.mutable_unchecked<2>();
 
-  // Global unique hypothesis/algorithm IDs
-  int nextId = 0;
+  py::ssize_t i = 0;
+  for (SMDS_NodeIteratorPtr it = NodesIterator(); it->more(); ++i) {
+    const SMDS_MeshNode* n = it->next();
+    r(i, 0) = n->X();
+    r(i, 1) = n->Y();
+    r(i, 2) = n->Z();
+  }
+
+  return nodes;
+}
+
+py::array_t<std::int64_t> IMesh::Elements(IMeshElementKind kind) const
+{
+  const SMESHDS_Mesh* ds = state_->mesh_->GetMeshDS();
+  const std::vector<std::int64_t>& index = NodeIndex();
+
+  const ElementType& type = elementType(static_cast<SMDSAbs_GeometryType>(kind));
+  const int k = static_cast<int>(type.order.size());
+
+  // Fill corner node indices directly into the array
+  py::array_t<std::int64_t> elements({ static_cast<py::ssize_t>(ds->GetMeshInfo().NbElementsOfGeom(type.geom)), py::ssize_t(k) });
+  auto r = elements.mutable_unchecked<2>();
+
+  py::ssize_t i = 0;
+  for (SMDS_ElemIteratorPtr it = ds->elementGeomIterator(type.geom); it->more(); ++i) {
+    const SMDS_MeshElement* e = it->next();
+    for (int j = 0; j < k; ++j) {
+      r(i, j) = index[e->GetNode(type.order[j])->GetID()];
+    }
+  }
+
+  return elements;
+}
+
+py::array_t<double> IMesh::Quality(IMeshQualityMetric metric, int threads) const
+{
+  const SMESHDS_Mesh* ds = state_->mesh_->GetMeshDS();
+  const ElementType& type = elementType(SMDSGeom_TETRA);
+
+  // Gather corner coordinates in one pass so threads only read plain arrays
+  const size_t count = ds->GetMeshInfo().NbElementsOfGeom(type.geom);
+  std::vector<gp_XYZ> corners;
+  corners.reserve(count * 4);
+  for (SMDS_ElemIteratorPtr it = ds->elementGeomIterator(type.geom); it->more();) {
+    const SMDS_MeshElement* e = it->next();
+    for (int j : type.order) {
+      const SMDS_MeshNode* n = e->GetNode(j);
+      corners.emplace_back(n->X(), n->Y(), n->Z());
+    }
+  }
 
-  // Own helper to keep created hypotheses/algorithms alive
-  auto own = [&](auto* p)
+  py::array_t<double> quality(static_cast<py::ssize_t>(count));
+  double* values = quality.mutable_data();
+  auto work = [&](size_t begin, size_t end)
   {
-    using T = std::remove_pointer_t<decltype(p)>;
-    T* raw = p;
-    state->owned_.emplace_back(std::unique_ptr<T>(p));
-    return raw;
+    for (size_t i = begin; i < end; ++i) {
+      values[i] = tetraQuality(metric, &corners[i * 4]);
+    }
   };
 
-  // Helper to apply 1D controls
-  auto apply1D = [&](const TopoDS_Shape& target, const IMeshControl& c)
+  // Split the elements into one contiguous range per thread
+  const size_t numThreads = std::max<size_t>(1, std::min<size_t>(threads, count));
+  const size_t chunk = (count + numThreads - 1) / numThreads;
+  std::vector<std::thread> pool;
+  for (size_t t = 1; t < numThreads; ++t) {
+    pool.emplace_back(work, t * chunk, std::min(count, (t + 1) * chunk));
+  }
+  work(0, std::min(count, chunk));
+  for (auto& t : pool) {
+    t.join();
+  }
+
+  return quality;
+}
+
+std::shared_ptr<const MeshSpatialIndex> IMesh::SpatialIndex() const
+{
+  // Wait for a Remesh running without the GIL to finish
+  std::unique_lock<std::mutex> lock(state_->cacheMutex_, std::defer_lock);
   {
-    // 1D  size hypothesis
-    auto hyp = own(new StdMeshers_LocalLength(nextId++, state->gen_.get()));
-    if (c.EdgeSize()) {
-      hyp->SetLength(*c.EdgeSize());
+    py::gil_scoped_release release;
+    lock.lock();
+  }
+  if (state_->spatialIndex_) {
+    return state_->spatialIndex_;
+  }
+
+  const SMESHDS_Mesh* ds = state_->mesh_->GetMeshDS();
+  const std::vector<std::int64_t>& index = NodeIndex();
+
+  std::vector<double> nodes;
+  nodes.reserve(static_cast<size_t>(ds->NbNodes()) * 3);
+  for (SMDS_NodeIteratorPtr it = NodesIterator(); it->more();) {
+    const SMDS_MeshNode* n = it->next();
+    nodes.insert(nodes.end(), { n->X(), n->Y(), n->Z() });
+  }
+
+  const ElementType& type = elementType(SMDSGeom_TETRA);
+  std::vector<std::int64_t> tetras;
+  tetras.reserve(ds->GetMeshInfo().NbElementsOfGeom(type.geom) * 4);
+  for (SMDS_ElemIteratorPtr it = ds->elementGeomIterator(type.geom); it->more();) {
+    const SMDS_MeshElement* e = it->next();
+    for (int j : type.order) {
+      tetras.push_back(index[e->GetNode(j)->GetID()]);
     }
-    // TODO 1D deflection hypothesis
+  }
 
-    // 1D meshing algorithm
-    auto algo = own(new StdMeshers_Regular_1D(nextId++, state->gen_.get()));
+  state_->spatialIndex_ = std::make_shared<const MeshSpatialIndex>(std::move(nodes), std::move(tetras));
+  return state_->spatialIndex_;
+}
 
-    state->mesh_->AddHypothesis(target, hyp->GetID());
-    state->mesh_->AddHypothesis(target, algo->GetID());
-  };
+const IMesh::State::ShapeGroups& IMesh::GroupsByShape(int geom) const
+{
+  if (state_->shape_.IsNull()) {
+    throw IMeshControlError("Mesh is not associated with a shape.");
+  }
 
-  // Helper to apply 2D controls
-  auto apply2D = [&](const TopoDS_Shape& target, const IMeshControl& c)
-  {
-    // 2D size hypothesis
-    auto hyp = own(new NETGENPlugin_SimpleHypothesis_2D(nextId++, state->gen_.get()));
-    if (c.EdgeSize()) {
-      hyp->SetLocalLength(*c.EdgeSize());
+  auto found = state_->shapeGroups_.find(geom);
+  if (found != state_->shapeGroups_.end()) {
+    return found->second;
+  }
+
+  // Sub-shape ID of each node or element in the order of the array queries
+  const SMESHDS_Mesh* ds = state_->mesh_->GetMeshDS();
+  std::vector<int> ids;
+  if (geom < 0) {
+    ids.reserve(ds->NbNodes());
+    for (SMDS_NodeIteratorPtr it = NodesIterator(); it->more();) {
+      ids.push_back(it->next()->GetShapeID());
+    }
+  }
+  else {
+    const SMDSAbs_GeometryType type = static_cast<SMDSAbs_GeometryType>(geom);
+    ids.reserve(ds->GetMeshInfo().NbElementsOfGeom(type));
+    for (SMDS_ElemIteratorPtr it = ds->elementGeomIterator(type); it->more();) {
+      ids.push_back(it->next()->GetShapeID());
+    }
+  }
+
+  // Counting sort of the indices by sub-shape ID
+  const int numShapes = ds->MaxShapeIndex();
+  State::ShapeGroups groups;
+  groups.offsets_.assign(static_cast<size_t>(numShapes) + 2, 0);
+  for (int id : ids) {
+    ++groups.offsets_[std::clamp(id, 0, numShapes) + 1];
+  }
+  std::partial_sum(groups.offsets_.begin(), groups.offsets_.end(), groups.offsets_.begin());
+  groups.indices_.resize(ids.size());
+  std::vector<std::int64_t> next(groups.offsets_.begin(), groups.offsets_.end() - 1);
+  for (size_t i = 0; i < ids.size(); ++i) {
+    groups.indices_[next[std::clamp(ids[i], 0, numShapes)]++] = static_cast<std::int64_t>(i);
+  }
+
+  return state_->shapeGroups_.emplace(geom, std::move(groups)).first->second;
+}
+
+std::vector<std::int64_t> IMesh::GatherOn(const State::ShapeGroups& groups, const TopoDS_Shape& subshape) const
+{
+  const SMESHDS_Mesh* ds = state_->mesh_->GetMeshDS();
+
+  // The sub-shape and its boundary, e.g., the edges and vertices of a face
+  TopTools_IndexedMapOfShape shapes;
+  TopExp::MapShapes(subshape, shapes);
+
+  std::vector<std::int64_t> indices;
+  bool found = false;
+  for (int i = 1; i <= shapes.Extent(); ++i) {
+    const int id = ds->ShapeToIndex(shapes(i));
+    found = found || id > 0;
+    if (id > 0 && id + 1 < static_cast<int>(groups.offsets_.size())) {
+      indices.insert(indices.end(), groups.indices_.begin() + groups.offsets_[id], groups.indices_.begin() + groups.offsets_[id + 1]);
     }
+  }
+  if (!found) {
+    throw IMeshControlError("Shape is not a sub-shape of the meshed shape.");
+  }
+  std::sort(indices.begin(), indices.end());
 
-    // 2D allow quads
-    hyp->SetAllowQuadrangles(c.AllowQuads());
+  return indices;
+}
 
-    // TODO 2D deflection hypothesis
+py::array_t<std::int64_t> IMesh::NodesOn(const IShape& subshape) const
+{
+  std::vector<std::int64_t> indices = GatherOn(GroupsByShape(-1), subshape);
+  return py::array_t<std::int64_t>(static_cast<py::ssize_t>(indices.size()), indices.data());
+}
 
-    // 2D meshing algorithm
-    auto algo = own(new NETGENPlugin_NETGEN_2D(nextId++, state->gen_.get()));
+py::array_t<std::int64_t> IMesh::ElementsOn(const IShape& subshape, IMeshElementKind kind) const
+{
+  std::vector<std::int64_t> indices = GatherOn(GroupsByShape(static_cast<int>(kind)), subshape);
+  return py::array_t<std::int64_t>(static_cast<py::ssize_t>(indices.size()), indices.data());
+}
 
-    state->mesh_->AddHypothesis(target, hyp->GetID());
-    state->mesh_->AddHypothesis(target, algo->GetID());
-  };
+std::vector<py::array_t<std::int64_t>> IMesh::NodesOnAll(IShapeKind kind) const
+{
+  const State::ShapeGroups& groups = GroupsByShape(-1);
 
-  // Helper to apply 3D controls
-  auto apply3D = [&](const TopoDS_Shape& target, const IMeshControl& c)
+  TopTools_IndexedMapOfShape shapes;
+  TopExp::MapShapes(state_->shape_, static_cast<TopAbs_ShapeEnum>(kind), shapes);
+
+  std::vector<py::array_t<std::int64_t>> result;
+  for (int i = 1; i <= shapes.Extent(); ++i) {
+    std::vector<std::int64_t> indices = GatherOn(groups, shapes(i));
+    result.emplace_back(static_cast<py::ssize_t>(indices.size()), indices.data());
+  }
+
+  return result;
+}
+
+std::vector<py::array_t<std::int64_t>> IMesh::ElementsOnAll(IShapeKind kind, IMeshElementKind elementKind) const
+{
+  const State::ShapeGroups& groups = GroupsByShape(static_cast<int>(elementKind));
+
+  TopTools_IndexedMapOfShape shapes;
+  TopExp::MapShapes(state_->shape_, static_cast<TopAbs_ShapeEnum>(kind), shapes);
+
+  std::vector<py::array_t<std::int64_t>> result;
+  for (int i = 1; i <= shapes.Extent(); ++i) {
+    std::vector<std::int64_t> indices = GatherOn(groups, shapes(i));
+    result.emplace_back(static_cast<py::ssize_t>(indices.size()), indices.data());
+  }
+
+  return result;
+}
+
+// Check that an array holds (N, 3) points
+static void checkPoints(const py::array_t<double, py::array::c_style | py::array::forcecast>& points)
+{
+  if (points.ndim() != 2 || points.shape(1) != 3) {
+    throw std::invalid_argument("Points must be an (N, 3) array.");
+  }
+}
+
+py::array_t<std::int64_t> IMesh::NearestNodes(const py::array_t<double, py::array::c_style | py::array::forcecast>& points) const
+{
+  checkPoints(points);
+  const std::shared_ptr<const MeshSpatialIndex> index = SpatialIndex();
+
+  const py::ssize_t n = points.shape(0);
+  py::array_t<std::int64_t> nodes(n);
+  const double* p = points.data();
+  std::int64_t* r = nodes.mutable_data();
   {
-    // 3D size hypothesis
-    auto hyp = own(new NETGENPlugin_SimpleHypothesis_3D(nextId++, state->gen_.get()));
-    if (c.EdgeSize()) {
-      hyp->SetLocalLength(*c.EdgeSize());
+    py::gil_scoped_release release;
+    for (py::ssize_t i = 0; i < n; ++i) {
+      r[i] = index->NearestNode(p + i * 3);
     }
+  }
+
+  return nodes;
+}
 
-    // TODO 3D deflection hypothesis
+std::pair<py::array_t<std::int64_t>, py::array_t<double>> IMesh::LocateTetras(const py::array_t<double, py::array::c_style | py::array::forcecast>& points, double tol) const
+{
+  checkPoints(points);
+  const std::shared_ptr<const MeshSpatialIndex> index = SpatialIndex();
 
-    // 3D meshing algorithm
-    auto algo = own(new NETGENPlugin_NETGEN_2D3D(nextId++, state->gen_.get()));
+  const py::ssize_t n = points.shape(0);
+  py::array_t<std::int64_t> tetras(n);
+  py::array_t<double> bary({ n, py::ssize_t(4) });
+  const double* p = points.data();
+  std::int64_t* r = tetras.mutable_data();
+  double* b = bary.mutable_data();
+  {
+    py::gil_scoped_release release;
+    for (py::ssize_t i = 0; i < n; ++i) {
+      r[i] = index->LocateTetra(p + i * 3, tol, b + i * 4);
+      if (r[i] < 0) {
+        std::fill(b + i * 4, b + i * 4 + 4, 0.);
+      }
+    }
+  }
 
-    state->mesh_->AddHypothesis(target, hyp->GetID());
-    state->mesh_->AddHypothesis(target, algo->GetID());
-  };
+  return { tetras, bary };
+}
 
+void IMesh::ExportUNV(const std::string& path) const
+{
+  if (state_->nodeOrder_.empty()) {
+    state_->mesh_->ExportUNV(path.c_str());
+  }
+  else {
+    Renumbered()->ExportUNV(path.c_str());
+  }
+}
+
+void IMesh::ExportMED(const std::string& path) const
+{
+  if (state_->nodeOrder_.empty()) {
+    state_->mesh_->ExportMED(path.c_str());
+  }
+  else {
+    Renumbered()->ExportMED(path.c_str());
+  }
+}
 
-  // Helper to apply a control based on its dimension
-  auto applyControl = [&](const IMeshControl& c)
+std::unique_ptr<SMESH_Mesh> IMesh::Renumbered() const
+{
+  std::unique_ptr<SMESH_Mesh> mesh;
   {
-    const TopoDS_Shape& target = static_cast<const TopoDS_Shape&>(c.Shape());
+    std::lock_guard<std::mutex> lock(state_->gen_->mutex_);
+    mesh.reset(state_->gen_->gen_->CreateMesh(true));
+  }
+  if (!state_->shape_.IsNull()) {
+    mesh->ShapeToMesh(state_->shape_);
+  }
+
+  // Nodes of a new mesh get consecutive IDs in creation order
+  copyMesh(*state_->mesh_, *mesh, NodesIterator());
+  return mesh;
+}
+
+void IMesh::ExportMSH(const std::string& path) const
+{
+  writeMSH(MeshSource(), path);
+}
+
+void IMesh::ExportVTU(const std::string& path) const
+{
+  writeVTU(MeshSource(), path);
+}
+
+void IMesh::ExportNative(const std::string& path, bool compress) const
+{
+  writeNative(MeshSource(), path, compress);
+}
+
+py::tuple IMesh::VTKArrays() const
+{
+  return vtkArrays(MeshSource());
+}
+
+std::optional<IShape> IMesh::Shape() const
+{
+  if (state_->shape_.IsNull()) {
+    return std::nullopt;
+  }
+  return IShape(state_->shape_);
+}
+
+int IMesh::ShapeId(const IShape& subshape) const
+{
+  if (state_->shape_.IsNull()) {
+    return 0;
+  }
+  return state_->mesh_->GetMeshDS()->ShapeToIndex(subshape);
+}
+
+py::tuple IMesh::ShapePositions() const
+{
+  const SMESHDS_Mesh* ds = state_->mesh_->GetMeshDS();
 
-    switch (c.Dimension()) {
-    case 1: apply1D(target, c); break;
-    case 2: apply2D(target, c); break;
-    case 3: apply3D(target, c); break;
-    default:
-      throw IMeshControlError("Unsupported mesh control dimension: " + std::to_string(c.Dimension()));
+  py::array_t<std::int32_t> nodeShapeIds(static_cast<py::ssize_t>(ds->NbNodes()));
+  py::array_t<double> nodeParams({ static_cast<py::ssize_t>(ds->NbNodes()), py::ssize_t(2) });
+  auto ids = nodeShapeIds.mutable_unchecked<1>();
+  auto params = nodeParams.mutable_unchecked<2>();
+  py::ssize_t i = 0;
+  for (SMDS_NodeIteratorPtr it = NodesIterator(); it->more(); ++i) {
+    const SMDS_MeshNode* n = it->next();
+    ids(i) = std::max(n->GetShapeID(), 0);
+    params(i, 0) = 0.;
+    params(i, 1) = 0.;
+    SMDS_PositionPtr pos = n->GetPosition();
+    switch (pos->GetTypeOfPosition()) {
+    case SMDS_TOP_EDGE:
+      params(i, 0) = pos->GetParameters()[0];
+      break;
+    case SMDS_TOP_FACE:
+      params(i, 0) = pos->GetParameters()[0];
+      params(i, 1) = pos->GetParameters()[1];
+      break;
+    default: break;
     }
-  };
+  }
 
-  // Apply controls
-  applyControl(globalControl);
-  for (const auto& c : localControls) {
-    applyControl(c);
+  // Elements are written in iteration order, with consecutive IDs if renumbered
+  py::array_t<std::int32_t> elementShapeIds(static_cast<py::ssize_t>(ds->NbElements()));
+  auto elementIds = elementShapeIds.mutable_unchecked<1>();
+  i = 0;
+  for (SMDS_ElemIteratorPtr it = ds->elementsIterator(); it->more(); ++i) {
+    elementIds(i) = std::max(it->next()->GetShapeID(), 0);
   }
 
-  // Compute mesh
-  const bool ok = state->gen_->Compute(*state->mesh_, state->shape_);
-  if (!ok) {
-    throw IMeshComputeError("Mesh computation failed.");
+  return py::make_tuple(nodeShapeIds, nodeParams, elementShapeIds);
+}
+
+SMDSMeshSource IMesh::MeshSource() const
+{
+  return SMDSMeshSource(state_->mesh_->GetMeshDS(), [this]() { return NodesIterator(); }, NodeIndex());
+}
+
+IFrozenMesh IMesh::Freeze() const
+{
+  const SMDSMeshSource src = MeshSource();
+  IFrozenMesh frozen;
+
+  // Nodes in the order of node indices
+  frozen.nodes_.reserve(src.NumNodes() * 3);
+  frozen.nodeShapeIds_.reserve(src.NumNodes());
+  src.ForEachNode([&](double x, double y, double z, std::int32_t shapeId) {
+    frozen.nodes_.insert(frozen.nodes_.end(), { x, y, z });
+    frozen.nodeShapeIds_.push_back(shapeId);
+  });
+
+  // Elements in one block per element type
+  for (const ElementType& t : elementTypes()) {
+    const std::uint64_t n = src.NumElements(t);
+    if (n == 0) {
+      continue;
+    }
+    IFrozenMesh::Block block;
+    block.geom_ = t.geom;
+    block.connectivity_.reserve(n * t.order.size());
+    block.shapeIds_.reserve(n);
+    src.ForEachElement(t, [&](const std::int64_t* corners, std::int32_t shapeId) {
+      block.connectivity_.insert(block.connectivity_.end(), corners, corners + t.order.size());
+      block.shapeIds_.push_back(shapeId);
+    });
+    frozen.blocks_.push_back(std::move(block));
   }
 
-  return IMesh(state);
+  return frozen;
 }
 
-int IMesh::NumNodes() const { return state_->mesh_->NbNodes(); }
-int IMesh::NumEdges() const { return state_->mesh_->NbEdges(); }
-int IMesh::NumFaces() const { return state_->mesh_->NbFaces(); }
-int IMesh::NumTriangles() const { return state_->mesh_->NbTriangles(); }
-int IMesh::NumQuadrangles() const { return state_->mesh_->NbQuadrangles(); }
-int IMesh::NumTetras() const { return state_->mesh_->NbTetras(); }
+std::pair<py::array_t<std::int64_t>, py::array_t<std::int64_t>> IMesh::NodeElements(IMeshElementKind kind) const
+{
+  const SMDSAbs_GeometryType geom = static_cast<SMDSAbs_GeometryType>(kind);
+  const std::vector<std::int64_t> elementIndex = ElementIndex(geom);
 
-void IMesh::ExportUNV(const std::string& path) const
+  std::vector<std::int64_t> offsets(1, 0);
+  std::vector<std::int64_t> indices;
+  for (SMDS_NodeIteratorPtr it = NodesIterator(); it->more();) {
+    const size_t begin = indices.size();
+    for (SMDS_ElemIteratorPtr elems = it->next()->GetInverseElementIterator(); elems->more();) {
+      const SMDS_MeshElement* e = elems->next();
+      if (e->GetGeomType() == geom) {
+        indices.push_back(elementIndex[e->GetID()]);
+      }
+    }
+    std::sort(indices.begin() + begin, indices.end());
+    offsets.push_back(static_cast<std::int64_t>(indices.size()));
+  }
+
+  return toCSR(offsets, indices);
+}
+
+std::pair<py::array_t<std::int64_t>, py::array_t<std::int64_t>> IMesh::ElementNeighbors(IMeshElementKind kind) const
+{
+  const SMESHDS_Mesh* ds = state_->mesh_->GetMeshDS();
+  const SMDSAbs_GeometryType geom = static_cast<SMDSAbs_GeometryType>(kind);
+  const std::vector<std::int64_t> elementIndex = ElementIndex(geom);
+
+  // Corner nodes of each facet (faces of a tetrahedron, edges of a triangle or quadrangle)
+  static const std::vector<std::vector<int>> tetraFacets = { { 0, 1, 2 }, { 0, 1, 3 }, { 0, 2, 3 }, { 1, 2, 3 } };
+  static const std::vector<std::vector<int>> triangleFacets = { { 0, 1 }, { 1, 2 }, { 2, 0 } };
+  static const std::vector<std::vector<int>> quadrangleFacets = { { 0, 1 }, { 1, 2 }, { 2, 3 }, { 3, 0 } };
+  const std::vector<std::vector<int>>& facets = geom == SMDSGeom_TETRA ? tetraFacets : geom == SMDSGeom_TRIANGLE ? triangleFacets : quadrangleFacets;
+
+  // Elements of the same type around the first node of a facet that contain its other nodes
+  std::vector<std::int64_t> offsets(1, 0);
+  std::vector<std::int64_t> indices;
+  for (SMDS_ElemIteratorPtr it = ds->elementGeomIterator(geom); it->more();) {
+    const SMDS_MeshElement* e = it->next();
+    for (const std::vector<int>& facet : facets) {
+      for (SMDS_ElemIteratorPtr elems = e->GetNode(facet[0])->GetInverseElementIterator(e->GetType()); elems->more();) {
+        const SMDS_MeshElement* other = elems->next();
+        if (other == e || other->GetGeomType() != geom) {
+          continue;
+        }
+        const bool shared = std::all_of(facet.begin() + 1, facet.end(), [&](int j) { return other->GetNodeIndex(e->GetNode(j)) >= 0; });
+        if (shared) {
+          indices.push_back(elementIndex[other->GetID()]);
+        }
+      }
+    }
+    offsets.push_back(static_cast<std::int64_t>(indices.size()));
+  }
+
+  return toCSR(offsets, indices);
+}
+
+std::pair<py::array_t<std::int64_t>, py::array_t<std::int64_t>> IMesh::NodeNeighbors() const
+{
+  std::vector<std::int64_t> offsets, adjacency;
+  NodeGraph(offsets, adjacency);
+  return toCSR(offsets, adjacency);
+}
+
+py::array_t<std::int64_t> IMesh::ReverseCuthillMcKee() const
+{
+  std::vector<std::int64_t> offsets, adjacency;
+  NodeGraph(offsets, adjacency);
+  const std::vector<std::int64_t> order = reverseCuthillMcKee(offsets, adjacency);
+
+  py::array_t<std::int64_t> result(static_cast<py::ssize_t>(order.size()));
+  std::copy(order.begin(), order.end(), result.mutable_data());
+  return result;
+}
+
+std::int64_t IMesh::Bandwidth(const std::optional<py::array_t<std::int64_t, py::array::c_style | py::array::forcecast>>& order) const
+{
+  std::vector<std::int64_t> offsets, adjacency;
+  NodeGraph(offsets, adjacency);
+  const std::int64_t n = static_cast<std::int64_t>(offsets.size()) - 1;
+
+  // New index of each current index
+  std::vector<std::int64_t> position(n);
+  if (order) {
+    const std::vector<std::int64_t> o = checkOrder(*order, n);
+    for (std::int64_t i = 0; i < n; ++i) {
+      position[o[i]] = i;
+    }
+  }
+  else {
+    std::iota(position.begin(), position.end(), std::int64_t(0));
+  }
+
+  std::int64_t bandwidth = 0;
+  for (std::int64_t v = 0; v < n; ++v) {
+    for (std::int64_t j = offsets[v]; j < offsets[v + 1]; ++j) {
+      bandwidth = std::max(bandwidth, std::abs(position[v] - position[adjacency[j]]));
+    }
+  }
+  return bandwidth;
+}
+
+void IMesh::Renumber(const py::array_t<std::int64_t, py::array::c_style | py::array::forcecast>& order)
+{
+  const std::vector<std::int64_t> o = checkOrder(order, NumNodes());
+
+  // SMDS IDs in the current order permuted to the new order
+  std::vector<std::int64_t> ids;
+  ids.reserve(o.size());
+  for (SMDS_NodeIteratorPtr it = NodesIterator(); it->more();) {
+    ids.push_back(it->next()->GetID());
+  }
+  std::vector<std::int64_t> nodeOrder(o.size());
+  for (size_t i = 0; i < o.size(); ++i) {
+    nodeOrder[i] = ids[o[i]];
+  }
+
+  std::lock_guard<std::mutex> lock(state_->cacheMutex_);
+  state_->nodeOrder_ = std::move(nodeOrder);
+  state_->nodeIndex_.clear();
+  state_->spatialIndex_.reset();
+  state_->shapeGroups_.erase(-1);
+}
+
+void IMeshReport::CheckIndex(int i) const
+{
+  if (i < 0 || i >= NumSubMeshes()) {
+    throw std::out_of_range("Sub-mesh index out of range.");
+  }
+}
+
+int IMeshReport::NumSubMeshes() const { return static_cast<int>(entries_.size()); }
+IShape IMeshReport::SubShape(int i) const { CheckIndex(i); return IShape(entries_[i].shape_); }
+int IMeshReport::ShapeId(int i) const { CheckIndex(i); return entries_[i].shapeId_; }
+std::string IMeshReport::Algorithm(int i) const { CheckIndex(i); return entries_[i].algorithm_; }
+double IMeshReport::Time(int i) const { CheckIndex(i); return entries_[i].time_; }
+int IMeshReport::NumNodes(int i) const { CheckIndex(i); return entries_[i].numNodes_; }
+int IMeshReport::NumElements(int i) const { CheckIndex(i); return entries_[i].numElements_; }
+bool IMeshReport::IsComputed(int i) const { CheckIndex(i); return entries_[i].computed_; }
+std::string IMeshReport::Error(int i) const { CheckIndex(i); return entries_[i].error_; }
+
+const IFrozenMesh::Block* IFrozenMesh::FindBlock(SMDSAbs_GeometryType geom) const
+{
+  for (const Block& b : blocks_) {
+    if (b.geom_ == geom) {
+      return &b;
+    }
+  }
+  return nullptr;
+}
+
+int IFrozenMesh::NumElements(SMDSAbs_GeometryType geom) const
+{
+  const Block* b = FindBlock(geom);
+  return b ? static_cast<int>(b->shapeIds_.size()) : 0;
+}
+
+int IFrozenMesh::NumNodes() const { return static_cast<int>(nodeShapeIds_.size()); }
+int IFrozenMesh::NumEdges() const { return NumElements(SMDSGeom_EDGE); }
+int IFrozenMesh::NumFaces() const { return NumTriangles() + NumQuadrangles(); }
+int IFrozenMesh::NumTriangles() const { return NumElements(SMDSGeom_TRIANGLE); }
+int IFrozenMesh::NumQuadrangles() const { return NumElements(SMDSGeom_QUADRANGLE); }
+int IFrozenMesh::NumTetras() const { return NumElements(SMDSGeom_TETRA); }
+
+py::array_t<double> IFrozenMesh::Nodes() const
+{
+  py::array_t<double> nodes({ static_cast<py::ssize_t>(NumNodes()), py::ssize_t(3) });
+  std::copy(nodes_.begin(), nodes_.end(), nodes.mutable_data());
+  return nodes;
+}
+
+py::array_t<std::int64_t> IFrozenMesh::Elements(IMeshElementKind kind) const
+{
+  const ElementType& type = elementType(static_cast<SMDSAbs_GeometryType>(kind));
+  const Block* b = FindBlock(type.geom);
+  const size_t n = b ? b->shapeIds_.size() : 0;
+
+  py::array_t<std::int64_t> elements({ static_cast<py::ssize_t>(n), static_cast<py::ssize_t>(type.order.size()) });
+  if (b) {
+    std::copy(b->connectivity_.begin(), b->connectivity_.end(), elements.mutable_data());
+  }
+  return elements;
+}
+
+py::array_t<std::int32_t> IFrozenMesh::NodeShapeIds() const
+{
+  py::array_t<std::int32_t> ids(static_cast<py::ssize_t>(nodeShapeIds_.size()));
+  std::copy(nodeShapeIds_.begin(), nodeShapeIds_.end(), ids.mutable_data());
+  return ids;
+}
+
+py::array_t<std::int32_t> IFrozenMesh::ElementShapeIds(IMeshElementKind kind) const
+{
+  const Block* b = FindBlock(static_cast<SMDSAbs_GeometryType>(kind));
+  py::array_t<std::int32_t> ids(static_cast<py::ssize_t>(b ? b->shapeIds_.size() : 0));
+  if (b) {
+    std::copy(b->shapeIds_.begin(), b->shapeIds_.end(), ids.mutable_data());
+  }
+  return ids;
+}
+
+py::tuple IFrozenMesh::VTKArrays() const
+{
+  return vtkArrays(FrozenMeshSource(*this));
+}
+
+void IFrozenMesh::ExportMSH(const std::string& path) const
 {
-  state_->mesh_->ExportUNV(path.c_str());
+  writeMSH(FrozenMeshSource(*this), path);
+}
+
+void IFrozenMesh::ExportVTU(const std::string& path) const
+{
+  writeVTU(FrozenMeshSource(*this), path);
+}
+
+void IFrozenMesh::ExportNative(const std::string& path, bool compress) const
+{
+  writeNative(FrozenMeshSource(*this), path, compress);
 }
 
 // Python bindings
 void bind_IMesh(pybind11::module& m)
 {
   using namespace pybind11;
+
+  enum_<IMeshElementKind>(m, "IMeshElementKind", "Enumeration for mesh element kinds.")
+    .value("Triangle", IMeshElementKind::Triangle)
+    .value("Quadrangle", IMeshElementKind::Quadrangle)
+    .value("Tetra", IMeshElementKind::Tetra);
+
+  enum_<IMeshQualityMetric>(m, "IMeshQualityMetric", "Enumeration for element quality metrics.")
+    .value("AspectRatio", IMeshQualityMetric::AspectRatio)
+    .value("MinDihedralAngle", IMeshQualityMetric::MinDihedralAngle)
+    .value("ScaledJacobian", IMeshQualityMetric::ScaledJacobian)
+    .value("Volume", IMeshQualityMetric::Volume);
+
+  class_<IMeshGenerator>(m, "IMeshGenerator", "Generator sharing one SMESH generator and a table of hypotheses across meshes.")
+    .def(init<>())
+    .def("Close", &IMeshGenerator::Close, "Release the hypothesis table (hypotheses in use are kept alive by their meshes).")
+    .def("IsClosed", &IMeshGenerator::IsClosed, "Check if the generator is closed.")
+    .def("NumHypotheses", &IMeshGenerator::NumHypotheses, "Number of hypotheses and algorithms in the table.");
+
+  class_<IMeshCancelToken>(m, "IMeshCancelToken", "Token to cancel mesh computations from another thread.")
+    .def(init<>())
+    .def("Cancel", &IMeshCancelToken::Cancel, "Request cancellation of running and later computations using this token.")
+    .def("IsCancelled", &IMeshCancelToken::IsCancelled, "Check if cancellation was requested.");
+
+  class_<IMeshReport>(m, "IMeshReport", "Report of a mesh computation with the wall time, size, and error of each sub-mesh.")
+    .def("NumSubMeshes", &IMeshReport::NumSubMeshes, "Get the number of sub-meshes.")
+    .def("SubShape", &IMeshReport::SubShape, arg("i"), "Get the sub-shape of a sub-mesh.")
+    .def("ShapeId", &IMeshReport::ShapeId, arg("i"), "Get the ID of the sub-shape of a sub-mesh.")
+    .def("Algorithm", &IMeshReport::Algorithm, arg("i"), "Get the name of the algorithm assigned to a sub-mesh (empty if none).")
+    .def("Time", &IMeshReport::Time, arg("i"), "Get the wall time in seconds from the end of the previous sub-mesh computation to the end of this one.")
+    .def("NumNodes", &IMeshReport::NumNodes, arg("i"), "Get the number of nodes of a sub-mesh.")
+    .def("NumElements", &IMeshReport::NumElements, arg("i"), "Get the number of elements of a sub-mesh.")
+    .def("IsComputed", &IMeshReport::IsComputed, arg("i"), "Check if a sub-mesh is computed.")
+    .def("Error", &IMeshReport::Error, arg("i"), "Get the compute error of a sub-mesh (empty if none).")
+    .def("TotalTime", &IMeshReport::TotalTime, "Get the wall time in seconds of the whole computation.");
+
+  // Meshing releases the GIL so that other Python threads keep running
   class_<IMesh>(m, "IMesh", "A Mesh.")
-    .def_static("MakeMesh", &IMesh::MakeMesh, arg("shape"), arg("global"), arg("locals") = std::vector<IMeshControl>(), "Make a mesh from a shape and mesh controls.")
+    .def_static("MakeMesh", &IMesh::MakeMesh, arg("shape"), arg("global"), arg("locals") = std::vector<IMeshControl>(), arg("cancel") = nullptr, arg("generator") = nullptr, arg("assembly") = false, call_guard<gil_scoped_release>(), "Make a mesh from a shape and mesh controls, fusing touching bodies first for a conformal assembly mesh if requested (NETGEN computations run one at a time in a process).")
+
+    .def_static("ImportUNV", overload_cast<const std::string&>(&IMesh::ImportUNV), arg("path"), "Import a mesh from a UNV file.")
+    .def_static("ImportUNV", overload_cast<const std::string&, const IShape&, const py::array_t<std::int32_t, py::array::c_style | py::array::forcecast>&, const py::array_t<double, py::array::c_style | py::array::forcecast>&, const py::array_t<std::int32_t, py::array::c_style | py::array::forcecast>&>(&IMesh::ImportUNV), arg("path"), arg("shape"), arg("node_shape_ids"), arg("node_params"), arg("element_shape_ids"), "Import a mesh from a UNV file written by ExportUNV and associate it with the meshed shape from its shape positions.")
+
+    .def("Remesh", &IMesh::Remesh, arg("changed"), call_guard<gil_scoped_release>(), "Replace or add controls and recompute only the affected sub-meshes (mutates this mesh).")
+
+    .def("Replicate", &IMesh::Replicate, arg("transforms"), arg("tolerance") = 1.0e-7, call_guard<gil_scoped_release>(), "Copy the mesh under each transform into a new mesh, merging nodes of different copies within the tolerance.")
 
     .def("NumNodes", &IMesh::NumNodes, "Get the number of nodes in the mesh.")
     .def("NumEdges", &IMesh::NumEdges, "Get the number of edges in the mesh.")
@@ -142,6 +2308,47 @@ void bind_IMesh(pybind11::module& m)
     .def("NumTriangles", &IMesh::NumTriangles, "Get the number of triangles in the mesh.")
     .def("NumQuadrangles", &IMesh::NumQuadrangles, "Get the number of quadrangles in the mesh.")
     .def("NumTetras", &IMesh::NumTetras, "Get the number of tetrahedra in the mesh.")
-    .def("ExportUNV", &IMesh::ExportUNV, arg("path"), "Export the mesh to a UNV file.");
+    .def("Nodes", &IMesh::Nodes, "Get the node coordinates as an (N, 3) array.")
+    .def("Elements", &IMesh::Elements, arg("kind"), "Get the element connectivity of a kind as an (M, k) array of 0-based node indices.")
+    .def("Quality", &IMesh::Quality, arg("metric"), arg("threads") = 1, "Get a quality metric of each tetrahedron, in the same order as Elements.")
+    .def("NodesOn", &IMesh::NodesOn, arg("subshape"), "Get the indices of the nodes on a sub-shape or its boundary (raises IMeshControlError if it is not a sub-shape of the meshed shape).")
+    .def("ElementsOn", &IMesh::ElementsOn, arg("subshape"), arg("kind"), "Get the indices of the elements of a kind on a sub-shape or its boundary (raises IMeshControlError if it is not a sub-shape of the meshed shape).")
+    .def("NodesOnAll", &IMesh::NodesOnAll, arg("kind"), "Get the node indices on each sub-shape of a kind of the meshed shape.")
+    .def("ElementsOnAll", &IMesh::ElementsOnAll, arg("kind"), arg("element_kind"), "Get the element indices of a kind on each sub-shape of a kind of the meshed shape.")
+    .def("NearestNodes", &IMesh::NearestNodes, arg("points"), "Get the index of the nearest node to each of the (N, 3) points.")
+    .def("LocateTetras", &IMesh::LocateTetras, arg("points"), arg("tol") = 1.0e-9, "Get the index of the tetrahedron containing each of the (N, 3) points (-1 if none) and the (N, 4) barycentric coordinates.")
+    .def("ExportUNV", &IMesh::ExportUNV, arg("path"), "Export the mesh to a UNV file.")
+    .def("ExportMED", &IMesh::ExportMED, arg("path"), "Export the mesh to a MED file.")
+    .def("ExportMSH", &IMesh::ExportMSH, arg("path"), "Export the mesh to a binary Gmsh MSH 4.1 file.")
+    .def("ExportVTU", &IMesh::ExportVTU, arg("path"), "Export the mesh to a VTK XML unstructured grid file with appended binary data.")
+    .def("VTKArrays", &IMesh::VTKArrays, "Get the points, connectivity, cell offsets, cell types, cell sub-shape IDs, and point sub-shape IDs laid out as in a VTK unstructured grid, filled from the mesh without an intermediate copy.")
+    .def("ExportNative", &IMesh::ExportNative, arg("path"), arg("compress") = false, "Export the mesh to a native binary container of aligned arrays, optionally compressed in chunks.")
+    .def("Shape", &IMesh::Shape, "Get the meshed shape (the fused shape for assembly meshes, None for imported meshes).")
+    .def("ShapeId", &IMesh::ShapeId, arg("subshape"), "Get the ID of a sub-shape used by shape IDs of nodes and elements (0 if not a sub-shape).")
+    .def("ShapePositions", &IMesh::ShapePositions, "Get the sub-shape ID and (u, v) parameters of each node and the sub-shape ID of each element in the order written by ExportUNV.")
+    .def("Freeze", &IMesh::Freeze, "Copy the mesh into a compact read-only mesh that does not reference SMESH structures.")
+    .def("NodeElements", &IMesh::NodeElements, arg("kind"), "Get the elements of a kind around each node as CSR (offsets, indices) arrays.")
+    .def("ElementNeighbors", &IMesh::ElementNeighbors, arg("kind"), "Get the elements of a kind sharing a facet with each element as CSR (offsets, indices) arrays.")
+    .def("NodeNeighbors", &IMesh::NodeNeighbors, "Get the nodes sharing an element with each node as CSR (offsets, indices) arrays.")
+    .def("Report", &IMesh::Report, "Get the report of the last computation (empty for imported meshes).")
+    .def("ReverseCuthillMcKee", &IMesh::ReverseCuthillMcKee, "Get a node order (new index to current index) reducing the bandwidth by reverse Cuthill-McKee.")
+    .def("Bandwidth", &IMesh::Bandwidth, arg("order") = none(), "Get the largest index difference between adjacent nodes, optionally for a node order that is not applied.")
+    .def("Renumber", &IMesh::Renumber, arg("order"), "Renumber the nodes of array queries and exports to a node order (new index to current index).");
+
+  class_<IFrozenMesh>(m, "IFrozenMesh", "A compact read-only mesh backed by contiguous arrays.")
+    .def("NumNodes", &IFrozenMesh::NumNodes, "Get the number of nodes in the mesh.")
+    .def("NumEdges", &IFrozenMesh::NumEdges, "Get the number of edges in the mesh.")
+    .def("NumFaces", &IFrozenMesh::NumFaces, "Get the number of faces in the mesh.")
+    .def("NumTriangles", &IFrozenMesh::NumTriangles, "Get the number of triangles in the mesh.")
+    .def("NumQuadrangles", &IFrozenMesh::NumQuadrangles, "Get the number of quadrangles in the mesh.")
+    .def("NumTetras", &IFrozenMesh::NumTetras, "Get the number of tetrahedra in the mesh.")
+    .def("Nodes", &IFrozenMesh::Nodes, "Get the node coordinates as an (N, 3) array.")
+    .def("Elements", &IFrozenMesh::Elements, arg("kind"), "Get the element connectivity of a kind as an (M, k) array of 0-based node indices.")
+    .def("NodeShapeIds", &IFrozenMesh::NodeShapeIds, "Get the ID of the sub-shape each node lies on (0 if none).")
+    .def("ElementShapeIds", &IFrozenMesh::ElementShapeIds, arg("kind"), "Get the ID of the sub-shape each element of a kind lies on (0 if none).")
+    .def("VTKArrays", &IFrozenMesh::VTKArrays, "Get the points, connectivity, cell offsets, cell types, cell sub-shape IDs, and point sub-shape IDs laid out as in a VTK unstructured grid.")
+    .def("ExportMSH", &IFrozenMesh::ExportMSH, arg("path"), "Export the mesh to a binary Gmsh MSH 4.1 file.")
+    .def("ExportVTU", &IFrozenMesh::ExportVTU, arg("path"), "Export the mesh to a VTK XML unstructured grid file with appended binary data.")
+    .def("ExportNative", &IFrozenMesh::ExportNative, arg("path"), arg("compress") = false, "Export the mesh to a native binary container of aligned arrays, optionally compressed in chunks.");
 
 }
\ No newline at end of file
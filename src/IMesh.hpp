@@ -1,24 +1,235 @@
 #pragma once
 
+#include <cstdint>
+#include <map>
 #include <memory>
+#include <mutex>
+#include <optional>
 #include <string>
+#include <utility>
 #include <vector>
 
+#include <pybind11/numpy.h>
+
 #include "IShape.hpp"
+#include "ITransform.hpp"
 #include "IMeshControl.hpp"
 #include "IMeshErrors.hpp"
+#include "MeshSpatialIndex.hpp"
 
 #include <TopoDS_Shape.hxx>
 #include <SMESH_Gen.hxx>
 #include <SMESH_Mesh.hxx>
 #include <SMESH_Hypothesis.hxx>
+#include <SMDSAbs_ElementType.hxx>
+#include <SMDS_ElemIterator.hxx>
+
+// Node and element sources streamed by the exporters
+class SMDSMeshSource;
+class FrozenMeshSource;
+
+// Enumeration for mesh element kinds
+enum class IMeshElementKind {
+  Triangle = SMDSGeom_TRIANGLE,
+  Quadrangle = SMDSGeom_QUADRANGLE,
+  Tetra = SMDSGeom_TETRA
+};
+
+// Enumeration for element quality metrics
+enum class IMeshQualityMetric {
+  AspectRatio,
+  MinDihedralAngle,
+  ScaledJacobian,
+  Volume
+};
+
+// Token to cancel mesh computations from another thread
+class IMeshCancelToken {
+public:
+
+  // Request cancellation of running and later computations using this token
+  void Cancel();
+
+  // Check if cancellation was requested
+  bool IsCancelled() const;
+
+private:
+  friend class IMesh;
+
+  // Register a running computation while holding the NETGEN lock (returns false if already cancelled)
+  bool Begin(SMESH_Gen* gen, SMESH_Mesh* mesh, const TopoDS_Shape& shape);
+
+  // Unregister a finished computation
+  void End(SMESH_Gen* gen);
+
+  // Running computation
+  struct Computation {
+    SMESH_Gen* gen_;
+    SMESH_Mesh* mesh_;
+    TopoDS_Shape shape_;
+  };
+
+  // Shared state so that copies of the token cancel the same computations
+  struct Data {
+    std::mutex mutex_;
+    bool cancelled_ = false;
+    std::vector<Computation> running_;
+  };
+  std::shared_ptr<Data> data_ = std::make_shared<Data>();
+};
+
+// Generator shared by meshes, owning one SMESH generator and a table of hypotheses keyed by their parameters
+class IMeshGenerator {
+public:
+
+  // Release the hypothesis table (hypotheses in use are kept alive by their meshes)
+  void Close();
+
+  // Check if the generator is closed
+  bool IsClosed() const;
+
+  // Number of hypotheses and algorithms in the table
+  int NumHypotheses() const;
+
+private:
+  friend class IMesh;
+
+  // Shared state outliving the generator as long as meshes made with it exist
+  struct Data {
+    std::unique_ptr<SMESH_Gen> gen_ = std::make_unique<SMESH_Gen>();
+    std::map<std::string, std::shared_ptr<SMESH_Hypothesis>> table_;
+    int nextId_ = 0;
+    bool closed_ = false;
+    std::mutex mutex_;
+  };
+
+  // Get the shared state (throws if closed)
+  std::shared_ptr<Data> Open() const;
+
+  std::shared_ptr<Data> data_ = std::make_shared<Data>();
+};
+
+// Compact read-only mesh backed by contiguous arrays, holding no SMESH structures
+class IFrozenMesh {
+public:
+
+  // Basic mesh queries
+  int NumNodes() const;
+  int NumEdges() const;
+  int NumFaces() const;
+  int NumTriangles() const;
+  int NumQuadrangles() const;
+  int NumTetras() const;
+
+  // Array queries (0-based node indices, corner nodes in VTK order)
+  py::array_t<double> Nodes() const;
+  py::array_t<std::int64_t> Elements(IMeshElementKind kind) const;
+
+  // Sub-shape IDs of nodes and elements (0 if not on a sub-shape)
+  py::array_t<std::int32_t> NodeShapeIds() const;
+  py::array_t<std::int32_t> ElementShapeIds(IMeshElementKind kind) const;
+
+  // Points, connectivity, cell offsets (starting at 0), cell types, cell and point sub-shape IDs as laid out by a VTK unstructured grid
+  py::tuple VTKArrays() const;
+
+  // Export
+  void ExportMSH(const std::string& path) const;
+  void ExportVTU(const std::string& path) const;
+
+  // Export to the native binary container of aligned arrays (compressed by zlib in chunks if requested)
+  void ExportNative(const std::string& path, bool compress = false) const;
+
+private:
+  friend class IMesh;
+  friend class PartitionIMesh;
+  friend class FrozenMeshSource;
+
+  // Elements of one type
+  struct Block {
+    SMDSAbs_GeometryType geom_;
+    std::vector<std::int64_t> connectivity_;
+    std::vector<std::int32_t> shapeIds_;
+  };
+
+  // Find the block of a geometry type (nullptr if there are no such elements)
+  const Block* FindBlock(SMDSAbs_GeometryType geom) const;
+
+  // Number of elements of a geometry type
+  int NumElements(SMDSAbs_GeometryType geom) const;
+
+  std::vector<double> nodes_;
+  std::vector<std::int32_t> nodeShapeIds_;
+  std::vector<Block> blocks_;
+};
+
+// Report of a mesh computation with the wall time, size, and error of each sub-mesh
+class IMeshReport {
+public:
+
+  // Number of sub-meshes (one per sub-shape of the meshed shape)
+  int NumSubMeshes() const;
+
+  // Sub-shape of a sub-mesh and its ID as used by shape IDs
+  IShape SubShape(int i) const;
+  int ShapeId(int i) const;
+
+  // Name of the algorithm assigned to a sub-mesh (empty if none)
+  std::string Algorithm(int i) const;
+
+  // Wall time in seconds from the end of the previous sub-mesh computation to the end of this one
+  double Time(int i) const;
+
+  // Number of nodes and elements of a sub-mesh
+  int NumNodes(int i) const;
+  int NumElements(int i) const;
+
+  // Check if a sub-mesh is computed
+  bool IsComputed(int i) const;
+
+  // Compute error of a sub-mesh (empty if none)
+  std::string Error(int i) const;
+
+  // Wall time in seconds of the whole computation
+  double TotalTime() const { return totalTime_; }
+
+private:
+  friend class IMesh;
+
+  // Check a sub-mesh index
+  void CheckIndex(int i) const;
+
+  struct Entry {
+    TopoDS_Shape shape_;
+    int shapeId_ = 0;
+    std::string algorithm_;
+    double time_ = 0.;
+    int numNodes_ = 0;
+    int numElements_ = 0;
+    bool computed_ = false;
+    std::string error_;
+  };
+  std::vector<Entry> entries_;
+  double totalTime_ = 0.;
+};
 
 // Interface class for a mesh
 class IMesh {
 public:
 
-  // Factory method to create a mesh from a shape and mesh controls
-  static IMesh MakeMesh(const IShape& shape, const IMeshControl& globalControl, const std::vector<IMeshControl>& localControls = {});
+  // Factory method to create a mesh from a shape and mesh controls (NETGEN computations run one at a time in a process, hypotheses are shared through the generator if given, touching bodies are fused first for a conformal assembly mesh if requested)
+  static IMesh MakeMesh(const IShape& shape, const IMeshControl& globalControl, const std::vector<IMeshControl>& localControls = {}, IMeshCancelToken* cancel = nullptr, IMeshGenerator* generator = nullptr, bool assembly = false);
+
+  // Factory method to import a mesh from a UNV file (the mesh is not associated with a shape)
+  static IMesh ImportUNV(const std::string& path);
+
+  // Factory method to import a mesh from a UNV file written by ExportUNV and associate it with the meshed shape from the positions given by ShapePositions
+  static IMesh ImportUNV(const std::string& path, const IShape& shape, const py::array_t<std::int32_t, py::array::c_style | py::array::forcecast>& nodeShapeIds, const py::array_t<double, py::array::c_style | py::array::forcecast>& nodeParams, const py::array_t<std::int32_t, py::array::c_style | py::array::forcecast>& elementShapeIds);
+
+  // Replace or add controls and recompute only the sub-meshes affected by them (mutates this mesh)
+  void Remesh(const std::vector<IMeshControl>& changedControls);
+
+  // Copy the mesh under each transform into a new mesh of the compound of transformed shapes, merging nodes of different copies closer than a tolerance (0 to not merge)
+  IMesh Replicate(const std::vector<ITransform>& transforms, double tolerance = 1.0e-7) const;
 
   // Basic mesh queries
   int NumNodes() const;
@@ -28,18 +239,152 @@ public:
   int NumQuadrangles() const;
   int NumTetras() const;
 
+  // Array queries (0-based node indices, corner nodes in VTK order)
+  py::array_t<double> Nodes() const;
+  py::array_t<std::int64_t> Elements(IMeshElementKind kind) const;
+
+  // Quality metric of each tetrahedron (same order as Elements) computed on the given number of threads
+  py::array_t<double> Quality(IMeshQualityMetric metric, int threads = 1) const;
+
+  // Indices of the nodes on a sub-shape or its boundary (same order as Nodes, throws if not a sub-shape of the meshed shape)
+  py::array_t<std::int64_t> NodesOn(const IShape& subshape) const;
+
+  // Indices of the elements of a kind on a sub-shape or its boundary (same order as Elements)
+  py::array_t<std::int64_t> ElementsOn(const IShape& subshape, IMeshElementKind kind) const;
+
+  // Node/element indices on each sub-shape of a kind of the meshed shape (same order as MapIShape)
+  std::vector<py::array_t<std::int64_t>> NodesOnAll(IShapeKind kind) const;
+  std::vector<py::array_t<std::int64_t>> ElementsOnAll(IShapeKind kind, IMeshElementKind elementKind) const;
+
+  // Index of the nearest node to each of the (N, 3) points
+  py::array_t<std::int64_t> NearestNodes(const py::array_t<double, py::array::c_style | py::array::forcecast>& points) const;
+
+  // Index of the tetrahedron containing each of the (N, 3) points (-1 if none) and the (N, 4) barycentric coordinates
+  std::pair<py::array_t<std::int64_t>, py::array_t<double>> LocateTetras(const py::array_t<double, py::array::c_style | py::array::forcecast>& points, double tol = 1.0e-9) const;
+
   // Export
   void ExportUNV(const std::string& path) const;
+  void ExportMED(const std::string& path) const;
+  void ExportMSH(const std::string& path) const;
+  void ExportVTU(const std::string& path) const;
+
+  // Points, connectivity, cell offsets (starting at 0), cell types, cell and point sub-shape IDs as laid out by a VTK unstructured grid, filled from the SMDS iterators
+  py::tuple VTKArrays() const;
+
+  // Export to the native binary container of aligned arrays streamed from the SMDS iterators (compressed by zlib in chunks if requested)
+  void ExportNative(const std::string& path, bool compress = false) const;
+
+  // Meshed shape (the fused shape for assembly meshes, none for imported meshes)
+  std::optional<IShape> Shape() const;
+
+  // ID of a sub-shape as used by the shape IDs of a frozen mesh (0 if not a sub-shape)
+  int ShapeId(const IShape& subshape) const;
+
+  // Sub-shape ID and (u, v) parameters of each node (same order as Nodes) and sub-shape ID of each element in the order written by ExportUNV
+  py::tuple ShapePositions() const;
+
+  // Copy into a compact read-only mesh that does not reference the SMESH structures
+  IFrozenMesh Freeze() const;
+
+  // Report of the last computation (empty for imported meshes)
+  IMeshReport Report() const { return state_->report_; }
+
+  // Adjacency in CSR form (offsets, indices) of the elements of a kind around each node (same order as Elements)
+  std::pair<py::array_t<std::int64_t>, py::array_t<std::int64_t>> NodeElements(IMeshElementKind kind) const;
+
+  // Adjacency in CSR form of the elements of a kind sharing a facet (face of a tetrahedron, edge of a face) with each element
+  std::pair<py::array_t<std::int64_t>, py::array_t<std::int64_t>> ElementNeighbors(IMeshElementKind kind) const;
+
+  // Adjacency in CSR form of the nodes sharing an element with each node
+  std::pair<py::array_t<std::int64_t>, py::array_t<std::int64_t>> NodeNeighbors() const;
+
+  // Node order (new index to current index) reducing the bandwidth by reverse Cuthill-McKee on the node adjacency
+  py::array_t<std::int64_t> ReverseCuthillMcKee() const;
+
+  // Largest index difference between adjacent nodes, optionally for a node order that is not applied
+  std::int64_t Bandwidth(const std::optional<py::array_t<std::int64_t, py::array::c_style | py::array::forcecast>>& order = std::nullopt) const;
+
+  // Renumber the nodes of array queries and exports to a node order (new index to current index, reset by Remesh)
+  void Renumber(const py::array_t<std::int64_t, py::array::c_style | py::array::forcecast>& order);
 
 private:
   // Internal state owning all SMESH objects for safe lifetime management
   struct State {
-    std::unique_ptr<SMESH_Gen> gen_ = std::make_unique<SMESH_Gen>();
-    std::unique_ptr<SMESH_Mesh> mesh_{ gen_->CreateMesh(true) };
-    std::vector<std::unique_ptr<SMESH_Hypothesis>> owned_;
+    State() = default;
+    explicit State(std::shared_ptr<IMeshGenerator::Data> gen) : gen_(std::move(gen)) {}
+
+    std::shared_ptr<IMeshGenerator::Data> gen_ = std::make_shared<IMeshGenerator::Data>();
+    std::unique_ptr<SMESH_Mesh> mesh_{ gen_->gen_->CreateMesh(true) };
+    std::vector<std::shared_ptr<SMESH_Hypothesis>> owned_;
     TopoDS_Shape shape_;
+
+    // Hypothesis and algorithm assigned to a target shape by a control
+    struct Assignment {
+      TopoDS_Shape target_;
+      int dim_;
+      int hypId_;
+      int algoId_;
+    };
+    std::vector<Assignment> assignments_;
+
+    // Report of the last computation
+    IMeshReport report_;
+
+    // SMDS node IDs in the order of node indices (SMDS iteration order if empty)
+    std::vector<std::int64_t> nodeOrder_;
+
+    // Cached map from SMDS node ID to 0-based node index
+    std::vector<std::int64_t> nodeIndex_;
+
+    // Cached spatial index over nodes and tetrahedra (shared with queries running without the GIL)
+    std::shared_ptr<const MeshSpatialIndex> spatialIndex_;
+
+    // Guard of the caches against a concurrent Remesh or Renumber
+    std::mutex cacheMutex_;
+
+    // Node or element indices grouped by sub-shape ID
+    struct ShapeGroups {
+      std::vector<std::int64_t> offsets_;
+      std::vector<std::int64_t> indices_;
+    };
+
+    // Cached groups of nodes (key -1) and of elements of each geometry type
+    std::map<int, ShapeGroups> shapeGroups_;
   };
 
+  // Get the node index map, building it on first use
+  const std::vector<std::int64_t>& NodeIndex() const;
+
+  // Iterate the nodes in the order of node indices
+  SMDS_NodeIteratorPtr NodesIterator() const;
+
+  // Map from SMDS element ID to 0-based index among the elements of a geometry type (-1 for other elements)
+  std::vector<std::int64_t> ElementIndex(SMDSAbs_GeometryType geom) const;
+
+  // Node adjacency in CSR form (nodes sharing an element, by node index)
+  void NodeGraph(std::vector<std::int64_t>& offsets, std::vector<std::int64_t>& adjacency) const;
+
+  // Copy the mesh with nodes created in the order of node indices for exports that number nodes by SMDS ID
+  std::unique_ptr<SMESH_Mesh> Renumbered() const;
+
+  // Get the spatial index, building it on first use (kept alive by the caller if the caches are reset)
+  std::shared_ptr<const MeshSpatialIndex> SpatialIndex() const;
+
+  // Node and element source streaming from the SMDS iterators in the order of node indices
+  SMDSMeshSource MeshSource() const;
+
+  // Get the groups of nodes (geom -1) or elements of a geometry type by sub-shape ID, building them on first use
+  const State::ShapeGroups& GroupsByShape(int geom) const;
+
+  // Gather the indices of a group on a sub-shape and all its sub-shapes (throws if none is a sub-shape of the meshed shape)
+  std::vector<std::int64_t> GatherOn(const State::ShapeGroups& groups, const TopoDS_Shape& subshape) const;
+
+  // Create and assign the hypothesis and algorithm of a control to a target shape
+  static void ApplyControl(State& state, const TopoDS_Shape& target, const IMeshControl& c);
+
+  // Compute the mesh of a state (cancellable if a token is given)
+  static void Compute(State& state, IMeshCancelToken* cancel = nullptr);
+
   // Constructor from state
   explicit IMesh(std::shared_ptr<State> state) : state_(std::move(state)) {}
 
@@ -1,5 +1,7 @@
 #include "IMeshControl.hpp"
 
+#include <stdexcept>
+
 IMeshControl::IMeshControl(int dim, const IShape& shape, std::optional<double> edge_size, std::optional<double> deflection, bool quads)
   : dim_(dim), shape_(shape), edge_size_(edge_size), deflection_(deflection), quads_(quads) {
 }
@@ -19,17 +21,107 @@ IMeshControl IMeshControl::Make3D(const IShape& shape, std::optional<double> edg
   return IMeshControl(3, shape, edge_size, deflection, false);
 }
 
+std::vector<IMeshControl> IMeshControl::MakeBulk(int dim, const std::vector<IShape>& shapes, py::array_t<double, py::array::c_style | py::array::forcecast> edge_sizes, std::optional<double> deflection, bool quads)
+{
+  if (dim < 1 || dim > 3) {
+    throw IMeshControlError("Unsupported mesh control dimension: " + std::to_string(dim));
+  }
+  if (static_cast<size_t>(edge_sizes.size()) != shapes.size()) {
+    throw std::invalid_argument("Number of edge sizes does not match the number of shapes.");
+  }
+
+  // Edge sizes must be positive (NaN fails the comparison)
+  const double* sizes = edge_sizes.data();
+  for (size_t i = 0; i < shapes.size(); ++i) {
+    if (!(sizes[i] > 0.)) {
+      throw IMeshControlError("Edge size at index " + std::to_string(i) + " must be positive.");
+    }
+  }
+
+  // Controls in the order of the shapes
+  std::vector<IMeshControl> controls;
+  controls.reserve(shapes.size());
+  for (size_t i = 0; i < shapes.size(); ++i) {
+    controls.push_back(IMeshControl(dim, shapes[i], sizes[i], deflection, dim == 2 && quads));
+  }
+  return controls;
+}
+
+std::vector<IMeshControl> IMeshControl::MakeBulk(int dim, const MapIShape& shapes, py::array_t<double, py::array::c_style | py::array::forcecast> edge_sizes, std::optional<double> deflection, bool quads)
+{
+  std::vector<IShape> targets;
+  targets.reserve(shapes.Size());
+  for (int i = 1; i <= shapes.Size(); ++i) {
+    targets.push_back(shapes.FindShape(i));
+  }
+  return MakeBulk(dim, targets, edge_sizes, deflection, quads);
+}
+
+IMeshControl IMeshControl::WithSizeFile(const std::string& path) const
+{
+  if (dim_ < 2) {
+    throw IMeshControlError("Size fields are only supported by 2D and 3D mesh controls.");
+  }
+  IMeshControl c(*this);
+  c.size_file_ = path;
+  return c;
+}
+
+IMeshControl IMeshControl::WithNetgenParameters(std::optional<IMeshFineness> fineness, std::optional<double> growth_rate, std::optional<int> surface_opt_steps, std::optional<int> volume_opt_steps) const
+{
+  if (dim_ < 2) {
+    throw IMeshControlError("NETGEN parameters are only supported by 2D and 3D mesh controls.");
+  }
+  if (growth_rate && (*growth_rate <= 0. || *growth_rate > 1.)) {
+    throw IMeshControlError("Growth rate must be in (0, 1].");
+  }
+  if ((surface_opt_steps && *surface_opt_steps < 0) || (volume_opt_steps && *volume_opt_steps < 0)) {
+    throw IMeshControlError("Number of optimization steps must not be negative.");
+  }
+  IMeshControl c(*this);
+  c.fineness_ = fineness;
+  c.growth_rate_ = growth_rate;
+  c.surface_opt_steps_ = surface_opt_steps;
+  c.volume_opt_steps_ = volume_opt_steps;
+  return c;
+}
+
+IMeshControl IMeshControl::WithShape(const IShape& shape) const
+{
+  IMeshControl c(*this);
+  c.shape_ = shape;
+  return c;
+}
+
 // Python bindings
 void bind_IMeshControl(py::module& m) {
 
+  py::enum_<IMeshFineness>(m, "IMeshFineness", "Enumeration for NETGEN fineness levels.")
+    .value("VeryCoarse", IMeshFineness::VeryCoarse)
+    .value("Coarse", IMeshFineness::Coarse)
+    .value("Moderate", IMeshFineness::Moderate)
+    .value("Fine", IMeshFineness::Fine)
+    .value("VeryFine", IMeshFineness::VeryFine);
+
   py::class_<IMeshControl>(m, "IMeshControl", "A mesh control.")
     .def_static("Make1D", &IMeshControl::Make1D, py::arg("shape"), py::arg("edge_size") = std::nullopt, py::arg("deflection") = std::nullopt, "Create a 1D mesh control.")
     .def_static("Make2D", &IMeshControl::Make2D, py::arg("shape"), py::arg("edge_size") = std::nullopt, py::arg("deflection") = std::nullopt, py::arg("quads") = false, "Create a 2D mesh control.")
     .def_static("Make3D", &IMeshControl::Make3D, py::arg("shape"), py::arg("edge_size") = std::nullopt, py::arg("deflection") = std::nullopt, "Create a 3D mesh control.")
+    .def_static("MakeBulk", py::overload_cast<int, const MapIShape&, py::array_t<double, py::array::c_style | py::array::forcecast>, std::optional<double>, bool>(&IMeshControl::MakeBulk), py::arg("dim"), py::arg("shapes"), py::arg("edge_sizes"), py::arg("deflection") = std::nullopt, py::arg("quads") = false, "Create one mesh control per mapped shape from an array of positive edge sizes.")
+    .def_static("MakeBulk", py::overload_cast<int, const std::vector<IShape>&, py::array_t<double, py::array::c_style | py::array::forcecast>, std::optional<double>, bool>(&IMeshControl::MakeBulk), py::arg("dim"), py::arg("shapes"), py::arg("edge_sizes"), py::arg("deflection") = std::nullopt, py::arg("quads") = false, "Create one mesh control per shape from an array of positive edge sizes.")
 
     .def("Dimension", &IMeshControl::Dimension, "Get the dimension of the mesh control.")
+    .def("Shape", &IMeshControl::Shape, "Get the shape the mesh control is applied to.")
     .def("EdgeSize", &IMeshControl::EdgeSize, "Get the edge size of the mesh control.")
     .def("Deflection", &IMeshControl::Deflection, "Get the deflection of the mesh control.")
-    .def("AllowQuads", &IMeshControl::AllowQuads, "Check if quads are allowed in the mesh control.");
+    .def("AllowQuads", &IMeshControl::AllowQuads, "Check if quads are allowed in the mesh control.")
+    .def("SizeFile", &IMeshControl::SizeFile, "Get the mesh size file of the mesh control.")
+    .def("Fineness", &IMeshControl::Fineness, "Get the NETGEN fineness of the mesh control.")
+    .def("GrowthRate", &IMeshControl::GrowthRate, "Get the NETGEN growth rate of the mesh control.")
+    .def("SurfaceOptSteps", &IMeshControl::SurfaceOptSteps, "Get the number of NETGEN surface optimization steps of the mesh control.")
+    .def("VolumeOptSteps", &IMeshControl::VolumeOptSteps, "Get the number of NETGEN volume optimization steps of the mesh control.")
+    .def("WithSizeFile", &IMeshControl::WithSizeFile, py::arg("path"), "Create a copy of a 2D or 3D mesh control with a NETGEN mesh size file.")
+    .def("WithNetgenParameters", &IMeshControl::WithNetgenParameters, py::arg("fineness"), py::arg("growth_rate") = std::nullopt, py::arg("surface_opt_steps") = std::nullopt, py::arg("volume_opt_steps") = std::nullopt, "Create a copy of a 2D or 3D mesh control with NETGEN fineness, growth rate, and optimization steps.")
+    .def("WithShape", &IMeshControl::WithShape, py::arg("shape"), "Create a copy of a mesh control applied to another shape.");
 
 }
\ No newline at end of file
@@ -1,10 +1,23 @@
 #pragma once
 
 #include <optional>
+#include <string>
+#include <vector>
+
+#include <pybind11/numpy.h>
 
 #include "IShape.hpp"
+#include "MapIShape.hpp"
 #include "IMeshErrors.hpp"
 
+// Enumeration for NETGEN fineness levels (each sets the growth rate and the number of segments per edge and per radius)
+enum class IMeshFineness {
+  VeryCoarse,
+  Coarse,
+  Moderate,
+  Fine,
+  VeryFine
+};
 
 // Interface class for mesh controls
 class IMeshControl {
@@ -17,6 +30,11 @@ public:
 
   static IMeshControl Make3D(const IShape& shape, std::optional<double> max_edge_size = std::nullopt, std::optional<double> deflection = std::nullopt);
 
+  // Factory methods to create one mesh control per shape from an array of positive edge sizes, grouped by equal sizes (sharing hypotheses)
+  static std::vector<IMeshControl> MakeBulk(int dim, const std::vector<IShape>& shapes, py::array_t<double, py::array::c_style | py::array::forcecast> edge_sizes, std::optional<double> deflection = std::nullopt, bool quads = false);
+
+  static std::vector<IMeshControl> MakeBulk(int dim, const MapIShape& shapes, py::array_t<double, py::array::c_style | py::array::forcecast> edge_sizes, std::optional<double> deflection = std::nullopt, bool quads = false);
+
   int Dimension() const { return dim_; }
 
   const IShape& Shape() const { return shape_; }
@@ -24,6 +42,23 @@ public:
   const std::optional<double>& EdgeSize() const { return edge_size_; }
   const std::optional<double>& Deflection() const { return deflection_; }
   const bool AllowQuads() const { return quads_;  }
+  const std::optional<std::string>& SizeFile() const { return size_file_; }
+  const std::optional<IMeshFineness>& Fineness() const { return fineness_; }
+  const std::optional<double>& GrowthRate() const { return growth_rate_; }
+  const std::optional<int>& SurfaceOptSteps() const { return surface_opt_steps_; }
+  const std::optional<int>& VolumeOptSteps() const { return volume_opt_steps_; }
+
+  // Check if any NETGEN fineness, growth rate, or optimization parameter is set
+  bool HasNetgenParameters() const { return fineness_ || growth_rate_ || surface_opt_steps_ || volume_opt_steps_; }
+
+  // Copy of a 2D or 3D mesh control with a NETGEN mesh size file (.msz) read during meshing
+  IMeshControl WithSizeFile(const std::string& path) const;
+
+  // Copy of a 2D or 3D mesh control with NETGEN fineness, growth rate, and numbers of optimization steps (applied by the full NETGEN hypothesis instead of the simple one, unset values keep its defaults)
+  IMeshControl WithNetgenParameters(std::optional<IMeshFineness> fineness, std::optional<double> growth_rate = std::nullopt, std::optional<int> surface_opt_steps = std::nullopt, std::optional<int> volume_opt_steps = std::nullopt) const;
+
+  // Copy of a mesh control applied to another shape
+  IMeshControl WithShape(const IShape& shape) const;
 
 private:
   IMeshControl(int dim, const IShape& target, std::optional<double> max_edge_size, std::optional<double> deflection, bool quads);
@@ -33,6 +68,11 @@ private:
   std::optional<double> edge_size_;
   std::optional<double> deflection_;
   bool quads_;
+  std::optional<std::string> size_file_;
+  std::optional<IMeshFineness> fineness_;
+  std::optional<double> growth_rate_;
+  std::optional<int> surface_opt_steps_;
+  std::optional<int> volume_opt_steps_;
 };
 
 // Python bindings
@@ -17,10 +17,24 @@ public:
     : std::runtime_error(msg) {}
 };
 
+class IMeshCancelledError : public std::runtime_error {
+public:
+  explicit IMeshCancelledError(const std::string& msg)
+    : std::runtime_error(msg) {}
+};
+
+class IMeshExportError : public std::runtime_error {
+public:
+  explicit IMeshExportError(const std::string& msg)
+    : std::runtime_error(msg) {}
+};
+
 // Python bindings
 inline void bind_IMeshErrors(py::module& m) {
 
   py::register_exception<IMeshControlError>(m, "IMeshControlError");
   py::register_exception<IMeshComputeError>(m, "IMeshComputeError");
+  py::register_exception<IMeshCancelledError>(m, "IMeshCancelledError");
+  py::register_exception<IMeshExportError>(m, "IMeshExportError");
 
 }
\ No newline at end of file
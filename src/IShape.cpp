@@ -1,5 +1,8 @@
 #include "IShape.hpp"
 
+#include <sstream>
+#include <stdexcept>
+
 #include <BRep_Builder.hxx>
 #include <BRep_Tool.hxx>
 #include <BRepBuilderAPI_MakeEdge.hxx>
@@ -7,6 +10,7 @@
 #include <BRepBuilderAPI_MakeWire.hxx>
 #include <BRepGProp.hxx>
 #include <BRepLib.hxx>
+#include <BRepTools.hxx>
 #include <GC_MakeArcOfCircle.hxx>
 #include <Geom_TrimmedCurve.hxx>
 #include <GProp_GProps.hxx>
@@ -139,6 +143,27 @@ bool IShape::ExportSTEP(const std::string& fname) const {
   return true;
 }
 
+std::string IShape::ToBRep() const {
+
+  std::ostringstream stream;
+  BRepTools::Write(shape_, stream, false, false, TopTools_FormatVersion_CURRENT);
+
+  return stream.str();
+}
+
+IShape IShape::FromBRep(const std::string& brep) {
+
+  std::istringstream stream(brep);
+  BRep_Builder builder;
+  TopoDS_Shape shape;
+  BRepTools::Read(shape, stream, builder);
+  if (shape.IsNull()) {
+    throw std::invalid_argument("Invalid BRep string.");
+  }
+
+  return IShape(shape);
+}
+
 double IShape::Length() const {
 
   GProp_GProps props;
@@ -201,12 +226,14 @@ void bind_IShape(py::module& m) {
     .def_static("MakeWire", py::overload_cast<const IShape&, const IShape&>(&IShape::MakeWire), py::arg("w1"), py::arg("w2"), "Make a new wire by combining two wires.")
     .def_static("MakeFace", &IShape::MakeFace, py::arg("w"), "Make a face by a planar wire.")
     .def_static("MakeCompound", &IShape::MakeCompound, py::arg("shapes"), "Make a compound from a list of shapes.")
+    .def_static("FromBRep", &IShape::FromBRep, py::arg("brep"), "Read a shape from a BRep string.")
 
     .def("Kind", &IShape::Kind, "The kind of this shape.")
     .def("IsNull", &IShape::IsNull, "Whether or not this shape is null.")
     .def("IsEqual", &IShape::IsEqual, py::arg("other"), "Check if this shape is equal to the other.")
     .def("IsSame", &IShape::IsSame, py::arg("other"), "Check if this shape is the same as the other (orientation may differ).")
     .def("ExportSTEP", &IShape::ExportSTEP, py::arg("fname"), "Export this shape to a STEP file.")
+    .def("ToBRep", &IShape::ToBRep, "Serialize this shape to a BRep string (without triangulations).")
     .def("Length", &IShape::Length, "Calculate the length of all edges of this shape.")
     .def("Area", &IShape::Area, "Calculate the area of all faces of this shape.")
     .def("Volume", &IShape::Volume, "Calculate the volume of all solids of this shape.")
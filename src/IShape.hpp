@@ -57,6 +57,9 @@ public:
 
   static IShape MakeCompound(const std::vector<IShape>& shapes);
 
+  // Factory method to read a shape from a BRep string written by ToBRep
+  static IShape FromBRep(const std::string& brep);
+
   // Constructor from TopoDS_Shape
   explicit IShape(const TopoDS_Shape& s)
     : shape_(s),
@@ -128,6 +131,9 @@ public:
   // Export this shape to a STEP file
   bool ExportSTEP(const std::string& fname) const;
 
+  // Serialize the geometry and topology of this shape to a BRep string (without triangulations)
+  std::string ToBRep() const;
+
   // Validate that the shape is of the expected kind
   void ValidateKind(const IShapeKind expected) const;
 
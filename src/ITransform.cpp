@@ -1,7 +1,9 @@
 #include "ITransform.hpp"
 
 #include <gp_Dir.hxx>
+#include <gp_Ax1.hxx>
 #include <gp_Ax2.hxx>
+#include <gp_Vec.hxx>
 
 ITransform ITransform::MakeMirror(const IPoint& origin, const IVector& normal) {
 
@@ -13,9 +15,34 @@ ITransform ITransform::MakeMirror(const IPoint& origin, const IVector& normal) {
   return ITransform(trsf);
 }
 
+ITransform ITransform::MakeTranslation(const IVector& v) {
+
+  gp_Trsf trsf;
+  trsf.SetTranslation(gp_Vec(v));
+
+  return ITransform(trsf);
+}
+
+ITransform ITransform::MakeRotation(const IPoint& origin, const IVector& axis, double angle) {
+
+  gp_Ax1 ax(origin, gp_Dir(axis));
+  gp_Trsf trsf;
+  trsf.SetRotation(ax, angle);
+
+  return ITransform(trsf);
+}
+
+ITransform ITransform::Multiplied(const ITransform& other) const {
+
+  return ITransform(trsf_.Multiplied(other.trsf_));
+}
+
 // Python bindings
 void bind_ITransform(py::module& m) {
 
   py::class_<ITransform>(m, "ITransform", "A transformation.")
-    .def_static("MakeMirror", &ITransform::MakeMirror, py::arg("origin"), py::arg("normal"), "Make a mirror transformation defined by a point and a normal vector.");
+    .def_static("MakeMirror", &ITransform::MakeMirror, py::arg("origin"), py::arg("normal"), "Make a mirror transformation defined by a point and a normal vector.")
+    .def_static("MakeTranslation", &ITransform::MakeTranslation, py::arg("v"), "Make a translation by a vector.")
+    .def_static("MakeRotation", &ITransform::MakeRotation, py::arg("origin"), py::arg("axis"), py::arg("angle"), "Make a rotation by an angle in radians about an axis defined by a point and a direction.")
+    .def("Multiplied", &ITransform::Multiplied, py::arg("other"), "Get the transformation applying another transformation first and then this one.");
 }
\ No newline at end of file
@@ -13,6 +13,15 @@ public:
 
   // Make a mirror transformation defined by a point and a normal vector.
   static ITransform MakeMirror(const IPoint& origin, const IVector& normal);
+
+  // Make a translation by a vector.
+  static ITransform MakeTranslation(const IVector& v);
+
+  // Make a rotation by an angle in radians about an axis defined by a point and a direction.
+  static ITransform MakeRotation(const IPoint& origin, const IVector& axis, double angle);
+
+  // Get the transformation applying another transformation first and then this one.
+  ITransform Multiplied(const ITransform& other) const;
   
   // Construct a transformation from a gp_Trsf
   explicit ITransform(const gp_Trsf& t) : trsf_(t) {}
@@ -0,0 +1,240 @@
+#include "MeshSpatialIndex.hpp"
+
+#include <algorithm>
+#include <limits>
+#include <numeric>
+
+// Maximum number of tetras in a BVH leaf
+static constexpr size_t kLeafSize = 4;
+
+// Determinant of the 3x3 matrix with columns a, b, c
+static double det3(const double a[3], const double b[3], const double c[3])
+{
+  return a[0] * (b[1] * c[2] - b[2] * c[1]) - a[1] * (b[0] * c[2] - b[2] * c[0]) + a[2] * (b[0] * c[1] - b[1] * c[0]);
+}
+
+MeshSpatialIndex::MeshSpatialIndex(std::vector<double> nodes, std::vector<std::int64_t> tetras)
+  : nodes_(std::move(nodes)), tetras_(std::move(tetras))
+{
+  // KD-tree over the nodes
+  const size_t numNodes = nodes_.size() / 3;
+  kdNodes_.resize(numNodes);
+  kdAxes_.resize(numNodes);
+  std::iota(kdNodes_.begin(), kdNodes_.end(), std::int64_t(0));
+  BuildKDTree(0, numNodes);
+
+  // Bounding box of each tetra for the BVH
+  const size_t numTetras = tetras_.size() / 4;
+  std::vector<double> boxes(numTetras * 6);
+  for (size_t i = 0; i < numTetras; ++i) {
+    double* box = &boxes[i * 6];
+    for (int k = 0; k < 3; ++k) {
+      box[k] = std::numeric_limits<double>::max();
+      box[k + 3] = std::numeric_limits<double>::lowest();
+    }
+    for (int j = 0; j < 4; ++j) {
+      const double* x = &nodes_[tetras_[i * 4 + j] * 3];
+      for (int k = 0; k < 3; ++k) {
+        box[k] = std::min(box[k], x[k]);
+        box[k + 3] = std::max(box[k + 3], x[k]);
+      }
+    }
+  }
+
+  bvhTetras_.resize(numTetras);
+  std::iota(bvhTetras_.begin(), bvhTetras_.end(), std::int64_t(0));
+  if (numTetras > 0) {
+    bvh_.reserve(2 * numTetras / kLeafSize + 1);
+    BuildBVH(0, numTetras, boxes);
+  }
+}
+
+void MeshSpatialIndex::BuildKDTree(size_t begin, size_t end)
+{
+  if (end - begin < 2) {
+    return;
+  }
+
+  // Split at the median along the axis of largest extent
+  double lo[3] = { std::numeric_limits<double>::max(), std::numeric_limits<double>::max(), std::numeric_limits<double>::max() };
+  double hi[3] = { std::numeric_limits<double>::lowest(), std::numeric_limits<double>::lowest(), std::numeric_limits<double>::lowest() };
+  for (size_t i = begin; i < end; ++i) {
+    const double* x = &nodes_[kdNodes_[i] * 3];
+    for (int k = 0; k < 3; ++k) {
+      lo[k] = std::min(lo[k], x[k]);
+      hi[k] = std::max(hi[k], x[k]);
+    }
+  }
+  int axis = 0;
+  for (int k = 1; k < 3; ++k) {
+    if (hi[k] - lo[k] > hi[axis] - lo[axis]) {
+      axis = k;
+    }
+  }
+
+  const size_t mid = begin + (end - begin) / 2;
+  std::nth_element(kdNodes_.begin() + begin, kdNodes_.begin() + mid, kdNodes_.begin() + end, [&](std::int64_t a, std::int64_t b)
+    {
+      return nodes_[a * 3 + axis] < nodes_[b * 3 + axis];
+    });
+  kdAxes_[mid] = static_cast<std::uint8_t>(axis);
+
+  BuildKDTree(begin, mid);
+  BuildKDTree(mid + 1, end);
+}
+
+void MeshSpatialIndex::SearchKDTree(size_t begin, size_t end, const double p[3], std::int64_t& best, double& bestDist) const
+{
+  if (begin >= end) {
+    return;
+  }
+
+  const size_t mid = begin + (end - begin) / 2;
+  const double* x = &nodes_[kdNodes_[mid] * 3];
+  const double dx = p[0] - x[0];
+  const double dy = p[1] - x[1];
+  const double dz = p[2] - x[2];
+  const double d = dx * dx + dy * dy + dz * dz;
+  if (d < bestDist) {
+    bestDist = d;
+    best = kdNodes_[mid];
+  }
+  if (end - begin == 1) {
+    return;
+  }
+
+  // Search the side of the point first and the other side only if it can be closer
+  const int axis = kdAxes_[mid];
+  const double diff = p[axis] - x[axis];
+  if (diff < 0.) {
+    SearchKDTree(begin, mid, p, best, bestDist);
+    if (diff * diff < bestDist) {
+      SearchKDTree(mid + 1, end, p, best, bestDist);
+    }
+  }
+  else {
+    SearchKDTree(mid + 1, end, p, best, bestDist);
+    if (diff * diff < bestDist) {
+      SearchKDTree(begin, mid, p, best, bestDist);
+    }
+  }
+}
+
+size_t MeshSpatialIndex::BuildBVH(size_t begin, size_t end, const std::vector<double>& boxes)
+{
+  const size_t index = bvh_.size();
+  bvh_.push_back({});
+
+  // Bounding box of the tetras and of their centers
+  BVHNode node;
+  double lo[3];
+  double hi[3];
+  for (int k = 0; k < 3; ++k) {
+    node.min_[k] = lo[k] = std::numeric_limits<double>::max();
+    node.max_[k] = hi[k] = std::numeric_limits<double>::lowest();
+  }
+  for (size_t i = begin; i < end; ++i) {
+    const double* box = &boxes[bvhTetras_[i] * 6];
+    for (int k = 0; k < 3; ++k) {
+      node.min_[k] = std::min(node.min_[k], box[k]);
+      node.max_[k] = std::max(node.max_[k], box[k + 3]);
+      const double c = box[k] + box[k + 3];
+      lo[k] = std::min(lo[k], c);
+      hi[k] = std::max(hi[k], c);
+    }
+  }
+  node.begin_ = begin;
+  node.end_ = end;
+  node.right_ = 0;
+
+  // Split at the median center along the axis of largest extent
+  if (end - begin > kLeafSize) {
+    int axis = 0;
+    for (int k = 1; k < 3; ++k) {
+      if (hi[k] - lo[k] > hi[axis] - lo[axis]) {
+        axis = k;
+      }
+    }
+    const size_t mid = begin + (end - begin) / 2;
+    std::nth_element(bvhTetras_.begin() + begin, bvhTetras_.begin() + mid, bvhTetras_.begin() + end, [&](std::int64_t a, std::int64_t b)
+      {
+        return boxes[a * 6 + axis] + boxes[a * 6 + axis + 3] < boxes[b * 6 + axis] + boxes[b * 6 + axis + 3];
+      });
+    BuildBVH(begin, mid, boxes);
+    node.right_ = BuildBVH(mid, end, boxes);
+    node.begin_ = node.end_ = 0;
+  }
+
+  bvh_[index] = node;
+  return index;
+}
+
+bool MeshSpatialIndex::Barycentric(std::int64_t tetra, const double p[3], double bary[4]) const
+{
+  const std::int64_t* t = &tetras_[tetra * 4];
+  const double* x0 = &nodes_[t[0] * 3];
+  double a[3], b[3], c[3], d[3];
+  for (int k = 0; k < 3; ++k) {
+    a[k] = nodes_[t[1] * 3 + k] - x0[k];
+    b[k] = nodes_[t[2] * 3 + k] - x0[k];
+    c[k] = nodes_[t[3] * 3 + k] - x0[k];
+    d[k] = p[k] - x0[k];
+  }
+
+  const double volume = det3(a, b, c);
+  if (volume == 0.) {
+    return false;
+  }
+  bary[1] = det3(d, b, c) / volume;
+  bary[2] = det3(a, d, c) / volume;
+  bary[3] = det3(a, b, d) / volume;
+  bary[0] = 1. - bary[1] - bary[2] - bary[3];
+  return true;
+}
+
+std::int64_t MeshSpatialIndex::NearestNode(const double p[3]) const
+{
+  std::int64_t best = -1;
+  double bestDist = std::numeric_limits<double>::max();
+  SearchKDTree(0, kdNodes_.size(), p, best, bestDist);
+  return best;
+}
+
+std::int64_t MeshSpatialIndex::LocateTetra(const double p[3], double tol, double bary[4]) const
+{
+  if (bvh_.empty()) {
+    return -1;
+  }
+
+  std::vector<size_t> stack = { 0 };
+  while (!stack.empty()) {
+    const BVHNode& node = bvh_[stack.back()];
+    const size_t index = stack.back();
+    stack.pop_back();
+
+    // Skip nodes whose box does not contain the point (with a margin for the tolerance)
+    bool inside = true;
+    for (int k = 0; k < 3 && inside; ++k) {
+      const double margin = tol * (node.max_[k] - node.min_[k]);
+      inside = p[k] >= node.min_[k] - margin && p[k] <= node.max_[k] + margin;
+    }
+    if (!inside) {
+      continue;
+    }
+
+    if (node.right_ == 0) {
+      for (size_t i = node.begin_; i < node.end_; ++i) {
+        const std::int64_t tetra = bvhTetras_[i];
+        if (Barycentric(tetra, p, bary) && std::min({ bary[0], bary[1], bary[2], bary[3] }) >= -tol) {
+          return tetra;
+        }
+      }
+    }
+    else {
+      stack.push_back(node.right_);
+      stack.push_back(index + 1);
+    }
+  }
+
+  return -1;
+}
@@ -0,0 +1,52 @@
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+
+// Spatial index over mesh nodes (KD-tree) and tetrahedra (BVH) for point queries
+class MeshSpatialIndex {
+public:
+
+  // Constructor from node coordinates (x, y, z per node) and tetra connectivity (4 node indices per tetra)
+  MeshSpatialIndex(std::vector<double> nodes, std::vector<std::int64_t> tetras);
+
+  // Index of the node nearest to a point (-1 if there are no nodes)
+  std::int64_t NearestNode(const double p[3]) const;
+
+  // Index of a tetra containing a point within a barycentric tolerance (-1 if none) and the barycentric coordinates
+  std::int64_t LocateTetra(const double p[3], double tol, double bary[4]) const;
+
+private:
+  // Build the KD-tree over the node range [begin, end)
+  void BuildKDTree(size_t begin, size_t end);
+
+  // Search the KD-tree over the node range [begin, end)
+  void SearchKDTree(size_t begin, size_t end, const double p[3], std::int64_t& best, double& bestDist) const;
+
+  // Build the BVH over the tetra range [begin, end) and return the index of its root
+  size_t BuildBVH(size_t begin, size_t end, const std::vector<double>& boxes);
+
+  // Barycentric coordinates of a point in a tetra (false if the tetra is degenerate)
+  bool Barycentric(std::int64_t tetra, const double p[3], double bary[4]) const;
+
+  // BVH node with a bounding box, a leaf range of tetras or the index of its second child (first child follows it)
+  struct BVHNode {
+    double min_[3];
+    double max_[3];
+    size_t begin_;
+    size_t end_;
+    size_t right_;
+  };
+
+  std::vector<double> nodes_;
+  std::vector<std::int64_t> tetras_;
+
+  // Implicit balanced KD-tree as a permutation of node indices with the split axis of each median
+  std::vector<std::int64_t> kdNodes_;
+  std::vector<std::uint8_t> kdAxes_;
+
+  // BVH nodes (root first) and the permutation of tetra indices referenced by leaves
+  std::vector<BVHNode> bvh_;
+  std::vector<std::int64_t> bvhTetras_;
+};
@@ -0,0 +1,514 @@
+#include "PartitionIMesh.hpp"
+
+#include <algorithm>
+#include <numeric>
+#include <random>
+#include <stdexcept>
+
+// Graphs with at most this many vertices are bisected directly
+static constexpr int kCoarsestSize = 64;
+
+// Allowed relative imbalance of the part weights
+static constexpr double kImbalance = 0.03;
+
+// Weighted graph in CSR form
+struct Graph {
+  std::vector<std::int64_t> xadj{ 0 };
+  std::vector<int> adj;
+  std::vector<int> ewgt;
+  std::vector<int> vwgt;
+
+  int Size() const { return static_cast<int>(vwgt.size()); }
+};
+
+// Dimension of an element geometry type
+static int geomDim(SMDSAbs_GeometryType geom)
+{
+  switch (geom) {
+  case SMDSGeom_EDGE: return 1;
+  case SMDSGeom_TRIANGLE:
+  case SMDSGeom_QUADRANGLE: return 2;
+  default: return 3;
+  }
+}
+
+// Coarsen a graph by heavy edge matching, returning the coarse graph and the coarse vertex of each vertex
+static Graph coarsen(const Graph& g, std::vector<int>& cmap, std::mt19937& rng)
+{
+  const int n = g.Size();
+  std::vector<int> order(n);
+  std::iota(order.begin(), order.end(), 0);
+  std::shuffle(order.begin(), order.end(), rng);
+
+  // Match each vertex with its unmatched neighbor of heaviest edge
+  std::vector<int> match(n, -1);
+  for (int v : order) {
+    if (match[v] >= 0) {
+      continue;
+    }
+    int best = v;
+    int bestWeight = -1;
+    for (std::int64_t j = g.xadj[v]; j < g.xadj[v + 1]; ++j) {
+      const int u = g.adj[j];
+      if (match[u] < 0 && u != v && g.ewgt[j] > bestWeight) {
+        best = u;
+        bestWeight = g.ewgt[j];
+      }
+    }
+    match[v] = best;
+    match[best] = v;
+  }
+
+  cmap.assign(n, -1);
+  std::vector<int> members;
+  members.reserve(2 * n);
+  int cn = 0;
+  for (int v = 0; v < n; ++v) {
+    if (cmap[v] < 0) {
+      cmap[v] = cmap[match[v]] = cn++;
+      members.push_back(v);
+      members.push_back(match[v]);
+    }
+  }
+
+  // Merge the edges of matched vertices
+  Graph c;
+  c.vwgt.resize(cn);
+  c.xadj.reserve(cn + 1);
+  std::vector<std::int64_t> pos(cn, -1);
+  for (int cv = 0; cv < cn; ++cv) {
+    const int a = members[2 * cv];
+    const int b = members[2 * cv + 1];
+    c.vwgt[cv] = g.vwgt[a] + (a != b ? g.vwgt[b] : 0);
+    const std::int64_t start = static_cast<std::int64_t>(c.adj.size());
+    const int vs[2] = { a, b };
+    for (int m = 0; m < (a != b ? 2 : 1); ++m) {
+      const int v = vs[m];
+      for (std::int64_t j = g.xadj[v]; j < g.xadj[v + 1]; ++j) {
+        const int cu = cmap[g.adj[j]];
+        if (cu == cv) {
+          continue;
+        }
+        if (pos[cu] >= start) {
+          c.ewgt[pos[cu]] += g.ewgt[j];
+        }
+        else {
+          pos[cu] = static_cast<std::int64_t>(c.adj.size());
+          c.adj.push_back(cu);
+          c.ewgt.push_back(g.ewgt[j]);
+        }
+      }
+    }
+    c.xadj.push_back(static_cast<std::int64_t>(c.adj.size()));
+  }
+
+  return c;
+}
+
+// Sum of the weights of the edges between the two sides
+static std::int64_t cutOf(const Graph& g, const std::vector<char>& side)
+{
+  std::int64_t cut = 0;
+  for (int v = 0; v < g.Size(); ++v) {
+    for (std::int64_t j = g.xadj[v]; j < g.xadj[v + 1]; ++j) {
+      if (side[v] != side[g.adj[j]]) {
+        cut += g.ewgt[j];
+      }
+    }
+  }
+  return cut / 2;
+}
+
+// Improve a bisection by greedily moving boundary vertices that reduce the cut or restore the balance
+static void refine(const Graph& g, std::vector<char>& side, double frac)
+{
+  const int n = g.Size();
+  double total = 0.;
+  double w[2] = { 0., 0. };
+  for (int v = 0; v < n; ++v) {
+    total += g.vwgt[v];
+    w[static_cast<int>(side[v])] += g.vwgt[v];
+  }
+  const double maxw[2] = { frac * total * (1. + kImbalance), (1. - frac) * total * (1. + kImbalance) };
+
+  for (int pass = 0; pass < 8; ++pass) {
+    int moved = 0;
+    for (int v = 0; v < n; ++v) {
+      const int s = side[v];
+      const int o = 1 - s;
+      std::int64_t ext = 0;
+      std::int64_t in = 0;
+      for (std::int64_t j = g.xadj[v]; j < g.xadj[v + 1]; ++j) {
+        (side[g.adj[j]] == s ? in : ext) += g.ewgt[j];
+      }
+      if (ext == 0 || w[o] + g.vwgt[v] > maxw[o]) {
+        continue;
+      }
+      if (ext > in || (ext == in && w[s] > w[o] + g.vwgt[v]) || w[s] > maxw[s]) {
+        side[v] = static_cast<char>(o);
+        w[s] -= g.vwgt[v];
+        w[o] += g.vwgt[v];
+        ++moved;
+      }
+    }
+    if (moved == 0) {
+      break;
+    }
+  }
+}
+
+// Bisect a small graph by growing side 0 from random seeds and keeping the smallest cut
+static std::vector<char> growBisection(const Graph& g, double frac, std::mt19937& rng)
+{
+  const int n = g.Size();
+  double total = 0.;
+  for (int v = 0; v < n; ++v) {
+    total += g.vwgt[v];
+  }
+
+  std::vector<char> best(n, 1);
+  std::int64_t bestCut = -1;
+  for (int attempt = 0; attempt < 8 && n > 0; ++attempt) {
+    std::vector<char> side(n, 1);
+    std::vector<int> queue;
+    double w0 = 0.;
+    size_t head = 0;
+    int next = static_cast<int>(rng() % n);
+    while (w0 < frac * total) {
+      if (head == queue.size()) {
+        // Restart from an unassigned vertex if the grown region is disconnected
+        while (side[next] == 0) {
+          next = (next + 1) % n;
+        }
+        queue.push_back(next);
+      }
+      const int v = queue[head++];
+      if (side[v] == 0) {
+        continue;
+      }
+      side[v] = 0;
+      w0 += g.vwgt[v];
+      for (std::int64_t j = g.xadj[v]; j < g.xadj[v + 1]; ++j) {
+        if (side[g.adj[j]] == 1) {
+          queue.push_back(g.adj[j]);
+        }
+      }
+    }
+    refine(g, side, frac);
+
+    const std::int64_t cut = cutOf(g, side);
+    if (bestCut < 0 || cut < bestCut) {
+      best = side;
+      bestCut = cut;
+    }
+  }
+
+  return best;
+}
+
+// Bisect a graph so that side 0 gets the given fraction of the weight (coarsen, bisect, project and refine)
+static std::vector<char> bisect(const Graph& g, double frac, std::mt19937& rng)
+{
+  if (g.Size() <= kCoarsestSize) {
+    return growBisection(g, frac, rng);
+  }
+
+  std::vector<int> cmap;
+  const Graph c = coarsen(g, cmap, rng);
+  if (c.Size() > 0.95 * g.Size()) {
+    return growBisection(g, frac, rng);
+  }
+
+  const std::vector<char> coarseSide = bisect(c, frac, rng);
+  std::vector<char> side(g.Size());
+  for (int v = 0; v < g.Size(); ++v) {
+    side[v] = coarseSide[cmap[v]];
+  }
+  refine(g, side, frac);
+
+  return side;
+}
+
+// Partition a graph into parts [firstPart, firstPart + numParts) by recursive bisection
+static void partitionGraph(const Graph& g, const std::vector<int>& ids, int firstPart, int numParts, std::vector<std::int32_t>& parts, std::mt19937& rng)
+{
+  if (numParts == 1 || g.Size() == 0) {
+    for (int id : ids) {
+      parts[id] = firstPart;
+    }
+    return;
+  }
+
+  const int numParts0 = numParts / 2;
+  const std::vector<char> side = bisect(g, static_cast<double>(numParts0) / numParts, rng);
+
+  // Extract and partition the subgraph of each side
+  std::vector<int> local(g.Size());
+  for (int s = 0; s < 2; ++s) {
+    Graph sub;
+    std::vector<int> subIds;
+    for (int v = 0; v < g.Size(); ++v) {
+      if (side[v] == s) {
+        local[v] = sub.Size();
+        sub.vwgt.push_back(g.vwgt[v]);
+        subIds.push_back(ids[v]);
+      }
+    }
+    for (int v = 0; v < g.Size(); ++v) {
+      if (side[v] != s) {
+        continue;
+      }
+      for (std::int64_t j = g.xadj[v]; j < g.xadj[v + 1]; ++j) {
+        if (side[g.adj[j]] == s) {
+          sub.adj.push_back(local[g.adj[j]]);
+          sub.ewgt.push_back(g.ewgt[j]);
+        }
+      }
+      sub.xadj.push_back(static_cast<std::int64_t>(sub.adj.size()));
+    }
+    partitionGraph(sub, subIds, s == 0 ? firstPart : firstPart + numParts0, s == 0 ? numParts0 : numParts - numParts0, parts, rng);
+  }
+}
+
+PartitionIMesh::PartitionIMesh(const IFrozenMesh& mesh, int numParts) : mesh_(mesh), numParts_(numParts)
+{
+  if (numParts < 1) {
+    throw std::invalid_argument("Number of parts must be at least one.");
+  }
+
+  // Elements of highest dimension are partitioned
+  int dim = 0;
+  for (const auto& b : mesh_.blocks_) {
+    dim = std::max(dim, geomDim(b.geom_));
+  }
+  std::vector<std::pair<size_t, size_t>> elements;
+  for (size_t b = 0; b < mesh_.blocks_.size(); ++b) {
+    if (geomDim(mesh_.blocks_[b].geom_) == dim) {
+      for (size_t i = 0; i < mesh_.blocks_[b].shapeIds_.size(); ++i) {
+        elements.emplace_back(b, i);
+      }
+    }
+  }
+  const int n = static_cast<int>(elements.size());
+  auto nodesOf = [&](int e, const std::int64_t*& first)
+  {
+    const auto& block = mesh_.blocks_[elements[e].first];
+    const size_t k = block.connectivity_.size() / block.shapeIds_.size();
+    first = &block.connectivity_[elements[e].second * k];
+    return k;
+  };
+
+  // Elements of each node in CSR form
+  const size_t numNodes = mesh_.nodeShapeIds_.size();
+  std::vector<std::int64_t> offsets(numNodes + 1, 0);
+  for (int e = 0; e < n; ++e) {
+    const std::int64_t* nodes;
+    const size_t k = nodesOf(e, nodes);
+    for (size_t j = 0; j < k; ++j) {
+      ++offsets[nodes[j] + 1];
+    }
+  }
+  std::partial_sum(offsets.begin(), offsets.end(), offsets.begin());
+  std::vector<int> nodeElements(offsets.back());
+  std::vector<std::int64_t> next(offsets.begin(), offsets.end() - 1);
+  for (int e = 0; e < n; ++e) {
+    const std::int64_t* nodes;
+    const size_t k = nodesOf(e, nodes);
+    for (size_t j = 0; j < k; ++j) {
+      nodeElements[next[nodes[j]]++] = e;
+    }
+  }
+
+  // Dual graph connecting elements that share a facet (at least dim nodes)
+  Graph g;
+  g.vwgt.assign(n, 1);
+  g.xadj.reserve(n + 1);
+  std::vector<int> shared(n, 0);
+  std::vector<int> touched;
+  for (int e = 0; e < n; ++e) {
+    const std::int64_t* nodes;
+    const size_t k = nodesOf(e, nodes);
+    for (size_t j = 0; j < k; ++j) {
+      for (std::int64_t i = offsets[nodes[j]]; i < offsets[nodes[j] + 1]; ++i) {
+        const int f = nodeElements[i];
+        if (f != e && shared[f]++ == 0) {
+          touched.push_back(f);
+        }
+      }
+    }
+    for (int f : touched) {
+      if (shared[f] >= dim) {
+        g.adj.push_back(f);
+        g.ewgt.push_back(1);
+      }
+      shared[f] = 0;
+    }
+    touched.clear();
+    g.xadj.push_back(static_cast<std::int64_t>(g.adj.size()));
+  }
+
+  // Partition with a fixed seed so that results are reproducible
+  std::vector<std::int32_t> parts(n, 0);
+  std::vector<int> ids(n);
+  std::iota(ids.begin(), ids.end(), 0);
+  std::mt19937 rng(0);
+  partitionGraph(g, ids, 0, numParts_, parts, rng);
+
+  for (int e = 0; e < n; ++e) {
+    for (std::int64_t j = g.xadj[e]; j < g.xadj[e + 1]; ++j) {
+      if (g.adj[j] > e && parts[g.adj[j]] != parts[e]) {
+        ++edgeCut_;
+      }
+    }
+  }
+
+  // Parts of each node from the partitioned elements
+  std::vector<std::pair<std::int64_t, std::int32_t>> nodeParts;
+  nodeParts.reserve(nodeElements.size());
+  for (int e = 0; e < n; ++e) {
+    const std::int64_t* nodes;
+    const size_t k = nodesOf(e, nodes);
+    for (size_t j = 0; j < k; ++j) {
+      nodeParts.emplace_back(nodes[j], parts[e]);
+    }
+  }
+  std::sort(nodeParts.begin(), nodeParts.end());
+  nodeParts.erase(std::unique(nodeParts.begin(), nodeParts.end()), nodeParts.end());
+  nodePartOffsets_.assign(numNodes + 1, 0);
+  nodeParts_.reserve(nodeParts.size());
+  for (const auto& np : nodeParts) {
+    ++nodePartOffsets_[np.first + 1];
+    nodeParts_.push_back(np.second);
+  }
+  std::partial_sum(nodePartOffsets_.begin(), nodePartOffsets_.end(), nodePartOffsets_.begin());
+
+  // Part of each element, lower dimension elements taking the lowest part shared by all their nodes
+  parts_.resize(mesh_.blocks_.size());
+  for (size_t b = 0; b < mesh_.blocks_.size(); ++b) {
+    const auto& block = mesh_.blocks_[b];
+    parts_[b].assign(block.shapeIds_.size(), -1);
+    if (geomDim(block.geom_) == dim) {
+      continue;
+    }
+    const size_t k = block.connectivity_.size() / std::max<size_t>(block.shapeIds_.size(), 1);
+    for (size_t i = 0; i < block.shapeIds_.size(); ++i) {
+      const std::int64_t first = block.connectivity_[i * k];
+      for (std::int64_t j = nodePartOffsets_[first]; j < nodePartOffsets_[first + 1] && parts_[b][i] < 0; ++j) {
+        const std::int32_t p = nodeParts_[j];
+        bool all = true;
+        for (size_t c = 1; c < k && all; ++c) {
+          const std::int64_t node = block.connectivity_[i * k + c];
+          all = std::binary_search(nodeParts_.begin() + nodePartOffsets_[node], nodeParts_.begin() + nodePartOffsets_[node + 1], p);
+        }
+        if (all) {
+          parts_[b][i] = p;
+        }
+      }
+    }
+  }
+  for (int e = 0; e < n; ++e) {
+    parts_[elements[e].first][elements[e].second] = parts[e];
+  }
+}
+
+void PartitionIMesh::CheckPart(int part) const
+{
+  if (part < 0 || part >= numParts_) {
+    throw std::out_of_range("Part index out of range.");
+  }
+}
+
+std::vector<std::int64_t> PartitionIMesh::NodesOf(int part) const
+{
+  std::vector<std::int64_t> nodes;
+  const std::int64_t numNodes = static_cast<std::int64_t>(nodePartOffsets_.size()) - 1;
+  for (std::int64_t i = 0; i < numNodes; ++i) {
+    if (std::binary_search(nodeParts_.begin() + nodePartOffsets_[i], nodeParts_.begin() + nodePartOffsets_[i + 1], part)) {
+      nodes.push_back(i);
+    }
+  }
+  return nodes;
+}
+
+py::array_t<std::int32_t> PartitionIMesh::Parts(IMeshElementKind kind) const
+{
+  const IFrozenMesh::Block* block = mesh_.FindBlock(static_cast<SMDSAbs_GeometryType>(kind));
+  if (!block) {
+    return py::array_t<std::int32_t>(0);
+  }
+  const std::vector<std::int32_t>& parts = parts_[block - mesh_.blocks_.data()];
+  return py::array_t<std::int32_t>(static_cast<py::ssize_t>(parts.size()), parts.data());
+}
+
+py::array_t<std::int64_t> PartitionIMesh::InterfaceNodes(int part) const
+{
+  CheckPart(part);
+
+  std::vector<std::int64_t> nodes;
+  for (std::int64_t i : NodesOf(part)) {
+    if (nodePartOffsets_[i + 1] - nodePartOffsets_[i] > 1) {
+      nodes.push_back(i);
+    }
+  }
+  return py::array_t<std::int64_t>(static_cast<py::ssize_t>(nodes.size()), nodes.data());
+}
+
+py::array_t<std::int64_t> PartitionIMesh::GlobalNodes(int part) const
+{
+  CheckPart(part);
+
+  const std::vector<std::int64_t> nodes = NodesOf(part);
+  return py::array_t<std::int64_t>(static_cast<py::ssize_t>(nodes.size()), nodes.data());
+}
+
+IFrozenMesh PartitionIMesh::Part(int part) const
+{
+  CheckPart(part);
+
+  // Local index of each node of the part
+  const std::vector<std::int64_t> nodes = NodesOf(part);
+  std::vector<std::int64_t> local(mesh_.nodeShapeIds_.size(), -1);
+  IFrozenMesh result;
+  for (size_t i = 0; i < nodes.size(); ++i) {
+    local[nodes[i]] = static_cast<std::int64_t>(i);
+    result.nodes_.insert(result.nodes_.end(), mesh_.nodes_.begin() + nodes[i] * 3, mesh_.nodes_.begin() + nodes[i] * 3 + 3);
+    result.nodeShapeIds_.push_back(mesh_.nodeShapeIds_[nodes[i]]);
+  }
+
+  // Elements of the part with local node indices
+  for (size_t b = 0; b < mesh_.blocks_.size(); ++b) {
+    const auto& block = mesh_.blocks_[b];
+    const size_t k = block.connectivity_.size() / std::max<size_t>(block.shapeIds_.size(), 1);
+    IFrozenMesh::Block sub;
+    sub.geom_ = block.geom_;
+    for (size_t i = 0; i < block.shapeIds_.size(); ++i) {
+      if (parts_[b][i] != part) {
+        continue;
+      }
+      for (size_t j = 0; j < k; ++j) {
+        sub.connectivity_.push_back(local[block.connectivity_[i * k + j]]);
+      }
+      sub.shapeIds_.push_back(block.shapeIds_[i]);
+    }
+    if (!sub.shapeIds_.empty()) {
+      result.blocks_.push_back(std::move(sub));
+    }
+  }
+
+  return result;
+}
+
+// Python bindings
+void bind_PartitionIMesh(py::module& m) {
+
+  py::class_<PartitionIMesh>(m, "PartitionIMesh", "Partition a mesh by a multilevel recursive bisection of its element dual graph.")
+    .def(py::init<const IFrozenMesh&, int>(), py::arg("mesh"), py::arg("num_parts"), py::keep_alive<1, 2>(), py::call_guard<py::gil_scoped_release>(), "Construct and partition the elements of highest dimension, keeping the mesh alive while the tool exists.")
+
+    .def("NumParts", &PartitionIMesh::NumParts, "Get the number of parts.")
+    .def("EdgeCut", &PartitionIMesh::EdgeCut, "Get the number of dual graph edges between elements of different parts.")
+    .def("Parts", &PartitionIMesh::Parts, py::arg("kind"), "Get the part of each element of a kind (-1 if none).")
+    .def("InterfaceNodes", &PartitionIMesh::InterfaceNodes, py::arg("part"), "Get the indices of the nodes of a part shared with other parts.")
+    .def("GlobalNodes", &PartitionIMesh::GlobalNodes, py::arg("part"), "Get the global indices of the nodes of a part.")
+    .def("Part", &PartitionIMesh::Part, py::arg("part"), "Get the mesh of a part with local node indices.");
+
+}
@@ -0,0 +1,61 @@
+#pragma once
+
+#include "occtlite.hpp"
+
+#include <cstdint>
+#include <vector>
+
+#include <pybind11/numpy.h>
+
+#include "IMesh.hpp"
+
+// Tool to partition a mesh by a multilevel recursive bisection of its element dual graph
+class PartitionIMesh {
+public:
+
+  // Construct and partition the elements of highest dimension into the given number of parts (the mesh is referenced, not copied, and must outlive the tool)
+  PartitionIMesh(const IFrozenMesh& mesh, int numParts);
+
+  // Get the number of parts
+  int NumParts() const {
+    return numParts_;
+  }
+
+  // Get the number of dual graph edges between elements of different parts
+  std::int64_t EdgeCut() const {
+    return edgeCut_;
+  }
+
+  // Get the part of each element of a kind (lower dimension elements get the lowest part sharing all their nodes, -1 if none)
+  py::array_t<std::int32_t> Parts(IMeshElementKind kind) const;
+
+  // Get the sorted indices of the nodes of a part shared with other parts
+  py::array_t<std::int64_t> InterfaceNodes(int part) const;
+
+  // Get the sorted indices of all nodes of a part (maps local node indices of the part mesh to global ones)
+  py::array_t<std::int64_t> GlobalNodes(int part) const;
+
+  // Get the mesh of a part with local node indices
+  IFrozenMesh Part(int part) const;
+
+private:
+  // Check a part index
+  void CheckPart(int part) const;
+
+  // Nodes of a part
+  std::vector<std::int64_t> NodesOf(int part) const;
+
+  const IFrozenMesh& mesh_;
+  int numParts_;
+  std::int64_t edgeCut_ = 0;
+
+  // Part of each element of each block
+  std::vector<std::vector<std::int32_t>> parts_;
+
+  // Parts of each node in CSR form
+  std::vector<std::int64_t> nodePartOffsets_;
+  std::vector<std::int32_t> nodeParts_;
+};
+
+// Python bindings
+void bind_PartitionIMesh(py::module& m);
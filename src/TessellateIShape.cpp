@@ -0,0 +1,140 @@
+#include "TessellateIShape.hpp"
+
+#include <BRep_Tool.hxx>
+#include <BRepLib_ToolTriangulatedShape.hxx>
+#include <BRepMesh_IncrementalMesh.hxx>
+#include <BRepTools.hxx>
+#include <Poly_Triangulation.hxx>
+#include <Poly_TriangulationParameters.hxx>
+#include <TopExp.hxx>
+#include <TopExp_Explorer.hxx>
+#include <TopLoc_Location.hxx>
+
+// Check that every face has a triangulation within both the linear and the angular deflection
+static bool isTessellated(const TopoDS_Shape& shape, double linearDeflection, double angularDeflection)
+{
+  for (TopExp_Explorer exp(shape, TopAbs_FACE); exp.More(); exp.Next()) {
+    TopLoc_Location loc;
+    const Handle(Poly_Triangulation)& tri = BRep_Tool::Triangulation(TopoDS::Face(exp.Current()), loc);
+    if (tri.IsNull() || tri->Deflection() > linearDeflection) {
+      return false;
+    }
+    const Handle(Poly_TriangulationParameters)& params = tri->Parameters();
+    if (params.IsNull() || !params->HasAngle() || params->Angle() > angularDeflection) {
+      return false;
+    }
+  }
+  return true;
+}
+
+TessellateIShape::TessellateIShape(const IShape& shape, double linearDeflection, double angularDeflection, bool parallel)
+{
+  // The triangulation is stored on the shape, so only mesh if it is missing or too coarse in either deflection
+  if (!isTessellated(shape, linearDeflection, angularDeflection)) {
+    // BRepMesh only checks the linear deflection of existing triangulations, so remove them first
+    BRepTools::Clean(shape);
+    BRepMesh_IncrementalMesh mesher(shape, linearDeflection, false, angularDeflection, parallel);
+
+    // Record the angular deflection on each triangulation for later reuse
+    for (TopExp_Explorer exp(shape, TopAbs_FACE); exp.More(); exp.Next()) {
+      TopLoc_Location loc;
+      const Handle(Poly_Triangulation)& tri = BRep_Tool::Triangulation(TopoDS::Face(exp.Current()), loc);
+      if (!tri.IsNull()) {
+        tri->Parameters(new Poly_TriangulationParameters(tri->Deflection(), angularDeflection));
+      }
+    }
+  }
+
+  TopExp::MapShapes(shape, TopAbs_FACE, faces_);
+}
+
+py::array_t<double> TessellateIShape::Vertices(const int index) const
+{
+  const TopoDS_Face& face = TopoDS::Face(faces_.FindKey(index));
+  TopLoc_Location loc;
+  Handle(Poly_Triangulation) tri = BRep_Tool::Triangulation(face, loc);
+  if (tri.IsNull()) {
+    return py::array_t<double>({ py::ssize_t(0), py::ssize_t(3) });
+  }
+
+  const gp_Trsf& trsf = loc.Transformation();
+  py::array_t<double> vertices({ static_cast<py::ssize_t>(tri->NbNodes()), py::ssize_t(3) });
+  auto r = vertices.mutable_unchecked<2>();
+  for (int i = 1; i <= tri->NbNodes(); ++i) {
+    const gp_Pnt p = tri->Node(i).Transformed(trsf);
+    r(i - 1, 0) = p.X();
+    r(i - 1, 1) = p.Y();
+    r(i - 1, 2) = p.Z();
+  }
+
+  return vertices;
+}
+
+py::array_t<double> TessellateIShape::Normals(const int index) const
+{
+  const TopoDS_Face& face = TopoDS::Face(faces_.FindKey(index));
+  TopLoc_Location loc;
+  Handle(Poly_Triangulation) tri = BRep_Tool::Triangulation(face, loc);
+  if (tri.IsNull()) {
+    return py::array_t<double>({ py::ssize_t(0), py::ssize_t(3) });
+  }
+
+  // Normals are computed from the surface once and kept on the triangulation
+  if (!tri->HasNormals()) {
+    BRepLib_ToolTriangulatedShape::ComputeNormals(face, tri);
+  }
+
+  const gp_Trsf& trsf = loc.Transformation();
+  const double sign = face.Orientation() == TopAbs_REVERSED ? -1.0 : 1.0;
+  py::array_t<double> normals({ static_cast<py::ssize_t>(tri->NbNodes()), py::ssize_t(3) });
+  auto r = normals.mutable_unchecked<2>();
+  for (int i = 1; i <= tri->NbNodes(); ++i) {
+    const gp_Dir d = tri->Normal(i).Transformed(trsf);
+    r(i - 1, 0) = sign * d.X();
+    r(i - 1, 1) = sign * d.Y();
+    r(i - 1, 2) = sign * d.Z();
+  }
+
+  return normals;
+}
+
+py::array_t<std::int32_t> TessellateIShape::Triangles(const int index) const
+{
+  const TopoDS_Face& face = TopoDS::Face(faces_.FindKey(index));
+  TopLoc_Location loc;
+  Handle(Poly_Triangulation) tri = BRep_Tool::Triangulation(face, loc);
+  if (tri.IsNull()) {
+    return py::array_t<std::int32_t>({ py::ssize_t(0), py::ssize_t(3) });
+  }
+
+  // Flip the winding of reversed faces so triangles follow the face normal
+  const bool reversed = face.Orientation() == TopAbs_REVERSED;
+  py::array_t<std::int32_t> triangles({ static_cast<py::ssize_t>(tri->NbTriangles()), py::ssize_t(3) });
+  auto r = triangles.mutable_unchecked<2>();
+  for (int i = 1; i <= tri->NbTriangles(); ++i) {
+    int n1, n2, n3;
+    tri->Triangle(i).Get(n1, n2, n3);
+    if (reversed) {
+      std::swap(n2, n3);
+    }
+    r(i - 1, 0) = n1 - 1;
+    r(i - 1, 1) = n2 - 1;
+    r(i - 1, 2) = n3 - 1;
+  }
+
+  return triangles;
+}
+
+// Python bindings
+void bind_TessellateIShape(py::module& m) {
+
+  py::class_<TessellateIShape>(m, "TessellateIShape", "Tessellate the faces of a shape for visualization.")
+    .def(py::init<const IShape&, double, double, bool>(), py::arg("shape"), py::arg("linearDeflection"), py::arg("angularDeflection") = 0.5, py::arg("parallel") = true, "Tessellate the shape, reusing an existing triangulation if it is fine enough.")
+
+    .def("NumFaces", &TessellateIShape::NumFaces, "Get the number of faces.")
+    .def("Face", &TessellateIShape::Face, py::arg("index"), "Get the face by 1-based index.")
+    .def("Vertices", &TessellateIShape::Vertices, py::arg("index"), "Get the vertex coordinates of a face as an (N, 3) array.")
+    .def("Normals", &TessellateIShape::Normals, py::arg("index"), "Get the vertex normals of a face as an (N, 3) array.")
+    .def("Triangles", &TessellateIShape::Triangles, py::arg("index"), "Get the triangles of a face as an (M, 3) array of 0-based vertex indices.");
+
+}
@@ -0,0 +1,44 @@
+#pragma once
+
+#include "occtlite.hpp"
+
+#include <cstdint>
+
+#include <pybind11/numpy.h>
+
+#include <TopTools_IndexedMapOfShape.hxx>
+
+#include "IShape.hpp"
+
+// Tool to tessellate the faces of a shape for visualization
+class TessellateIShape {
+public:
+
+  // Construct and tessellate the shape (existing triangulations that are fine enough in both deflections are reused)
+  TessellateIShape(const IShape& shape, double linearDeflection, double angularDeflection = 0.5, bool parallel = true);
+
+  // Get the number of faces
+  int NumFaces() const {
+    return faces_.Extent();
+  }
+
+  // Get the face by 1-based index
+  IShape Face(const int index) const {
+    return IShape(faces_.FindKey(index));
+  }
+
+  // Get the vertex coordinates of a face as an (N, 3) array
+  py::array_t<double> Vertices(const int index) const;
+
+  // Get the vertex normals of a face as an (N, 3) array
+  py::array_t<double> Normals(const int index) const;
+
+  // Get the triangles of a face as an (M, 3) array of 0-based vertex indices
+  py::array_t<std::int32_t> Triangles(const int index) const;
+
+private:
+  TopTools_IndexedMapOfShape faces_;
+};
+
+// Python bindings
+void bind_TessellateIShape(py::module& m);
@@ -26,11 +26,14 @@
 #include "CutIShapes.hpp"
 #include "ThickenIShape.hpp"
 #include "LoftIShape.hpp"
+#include "TessellateIShape.hpp"
 #include "IShapeErrors.hpp"
 
 #include "IMesh.hpp"
 #include "IMeshControl.hpp"
 #include "IMeshErrors.hpp"
+#include "PartitionIMesh.hpp"
+#include "EstimateIMesh.hpp"
 
 PYBIND11_MODULE(_occtlite, m) {
 
@@ -60,10 +63,13 @@ PYBIND11_MODULE(_occtlite, m) {
   bind_CutIShapes(m);
   bind_ThickenIShape(m);
   bind_LoftIShape(m);
+  bind_TessellateIShape(m);
   bind_IShapeErrors(m);
 
   bind_IMeshControl(m);
   bind_IMesh(m);
+  bind_PartitionIMesh(m);
+  bind_EstimateIMesh(m);
   bind_IMeshErrors(m);
 
 }
\ No newline at end of file
@@ -0,0 +1,916 @@
+import asyncio
+import gc
+import importlib.util
+import os
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from pyocctlite._occtlite import IMeshCancelledError, IMeshControlError
+from pyocctlite.geometry import Frame, Point, Transform, Vector
+from pyocctlite.mesh import (CancelToken, ElementKind, Fineness, Mesh, MeshCache, MeshControl,
+                             MeshFile, MeshGenerator, QualityMetric, SizeField)
+from pyocctlite.primitives import Cylinder
+from pyocctlite.topology import Compound, Edge, Face, ShapeKind, Wire
+
+
+def make_box(x=0., size=1.):
+    p1 = Point.by_xyz(x, 0, 0)
+    p2 = Point.by_xyz(x + size, 0, 0)
+    p3 = Point.by_xyz(x + size, size, 0)
+    p4 = Point.by_xyz(x, size, 0)
+    w = Wire.by_edges([Edge.by_points(p1, p2), Edge.by_points(p2, p3),
+                       Edge.by_points(p3, p4), Edge.by_points(p4, p1)])
+    return Face.by_wire(w).extrude(Vector.by_xyz(0, 0, size))
+
+
+class TestMeshControl(unittest.TestCase):
+
+    def test_by_control_3d(self):
+        box = make_box()
+        c = MeshControl.by_control_3d(box, 0.5)
+        self.assertEqual(c.dimension, 3)
+        self.assertEqual(c.shape.kind, ShapeKind.SOLID)
+        self.assertEqual(c.edge_size, 0.5)
+        self.assertIsNone(c.deflection)
+
+    def test_with_preset(self):
+        box = make_box()
+        c = MeshControl.by_control_3d(box, 0.25)
+        self.assertIsNone(c.fineness)
+
+        draft = c.with_preset('draft')
+        self.assertEqual(draft.fineness, Fineness.COARSE)
+        self.assertEqual(draft.volume_opt_steps, 1)
+        self.assertEqual(draft.edge_size, 0.25)
+
+        custom = c.with_optimization(Fineness.FINE, growth_rate=0.2, volume_opt_steps=0)
+        self.assertEqual(custom.growth_rate, 0.2)
+        self.assertIsNone(custom.surface_opt_steps)
+
+        with self.assertRaises(ValueError):
+            c.with_preset('fastest')
+        with self.assertRaises(IMeshControlError):
+            c.with_optimization(growth_rate=2.)
+        with self.assertRaises(IMeshControlError):
+            MeshControl.by_control_1d(box, 0.25).with_preset('draft')
+
+        mesh = Mesh.generate(box, draft)
+        self.assertGreater(mesh.num_tetras, 0)
+        self.assertTrue(np.all(mesh.quality(QualityMetric.VOLUME) > 0.))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = MeshCache(tmp)
+            self.assertNotEqual(cache.key(box, c), cache.key(box, draft))
+
+    def test_preset_curved(self):
+        cylinder = Cylinder.by_size(1., 1., Frame.by_origin(Point.by_xyz(0, 0, 0)))
+        control = MeshControl.by_control_3d(cylinder, 1.)
+        plain = Mesh.generate(cylinder, control)
+        meshes = [Mesh.generate(cylinder, control.with_preset(preset))
+                  for preset in ('draft', 'standard', 'fine')]
+
+        # Finer presets refine by curvature, and 'standard' differs from the plain control
+        counts = [m.num_tetras for m in meshes]
+        self.assertLess(counts[0], counts[1])
+        self.assertLess(counts[1], counts[2])
+        self.assertGreater(counts[1], plain.num_tetras)
+        for m in meshes:
+            self.assertTrue(np.all(m.quality(QualityMetric.VOLUME) > 0.))
+
+    def test_by_sizes(self):
+        box = make_box()
+        faces = box.map(ShapeKind.FACE)
+        sizes = np.full(len(faces), 0.5)
+        sizes[2] = 0.1
+        controls = MeshControl.by_sizes(2, faces, sizes)
+        self.assertEqual(len(controls), len(faces))
+        self.assertEqual([c.edge_size for c in controls], list(sizes))
+        for i, c in enumerate(controls):
+            self.assertTrue(c.shape.ishape.IsSame(faces[i].ishape))
+        self.assertEqual(len(MeshControl.by_sizes(2, list(faces), sizes)), len(faces))
+
+        with self.assertRaises(ValueError):
+            MeshControl.by_sizes(2, faces, sizes[1:])
+        with self.assertRaises(IMeshControlError):
+            MeshControl.by_sizes(4, faces, sizes)
+        for invalid in (0., -0.1, np.nan):
+            bad = sizes.copy()
+            bad[1] = invalid
+            with self.assertRaises(IMeshControlError):
+                MeshControl.by_sizes(2, faces, bad)
+
+        global_control = MeshControl.by_control_3d(box, 0.5)
+        mesh = Mesh.generate(box, global_control, controls)
+        coarse = Mesh.generate(box, global_control)
+        self.assertGreater(len(mesh.elements_on(faces[0], ElementKind.TRIANGLE)),
+                           len(coarse.elements_on(faces[0], ElementKind.TRIANGLE)))
+
+
+class TestMesh(unittest.TestCase):
+
+    def setUp(self):
+        self.box = make_box()
+        self.mesh = Mesh.generate(self.box, MeshControl.by_control_3d(self.box, 0.5))
+
+    def test_nodes(self):
+        nodes = self.mesh.nodes
+        self.assertEqual(nodes.shape, (self.mesh.num_nodes, 3))
+        self.assertAlmostEqual(nodes.min(), 0., 7)
+        self.assertAlmostEqual(nodes.max(), 1., 7)
+
+    def test_elements(self):
+        tets = self.mesh.elements(ElementKind.TETRA)
+        self.assertEqual(tets.shape, (self.mesh.num_tetras, 4))
+        self.assertEqual(tets.min(), 0)
+        self.assertLess(tets.max(), self.mesh.num_nodes)
+
+        tris = self.mesh.elements(ElementKind.TRIANGLE)
+        self.assertEqual(tris.shape[1], 3)
+
+    def test_tetra_orientation(self):
+        nodes = self.mesh.nodes
+        tets = self.mesh.elements(ElementKind.TETRA)
+        p = nodes[tets]
+        volumes = np.einsum('ij,ij->i', np.cross(p[:, 1] - p[:, 0], p[:, 2] - p[:, 0]),
+                            p[:, 3] - p[:, 0]) / 6.
+        self.assertTrue((volumes > 0.).all())
+        self.assertAlmostEqual(volumes.sum(), 1., 7)
+
+    def test_quality(self):
+        volume = self.mesh.quality(QualityMetric.VOLUME, threads=2)
+        self.assertEqual(volume.shape, (self.mesh.num_tetras,))
+        self.assertAlmostEqual(volume.sum(), 1., 7)
+
+        ratio = self.mesh.quality(QualityMetric.ASPECT_RATIO)
+        self.assertTrue((ratio >= 1. - 1.e-9).all())
+
+        jacobian = self.mesh.quality(QualityMetric.SCALED_JACOBIAN)
+        self.assertTrue((jacobian > 0.).all())
+        self.assertTrue((jacobian <= 1. + 1.e-9).all())
+
+    def test_quality_summary(self):
+        summary = self.mesh.quality_summary(QualityMetric.MIN_DIHEDRAL_ANGLE, bins=5)
+        self.assertEqual(summary.counts.sum(), self.mesh.num_tetras)
+        self.assertEqual(len(summary.edges), 6)
+        self.assertGreater(summary.min, 0.)
+        self.assertEqual(summary.count_below(0.), 0)
+
+    def test_quality_degenerate(self):
+        # Tetrahedron with three collinear nodes, so that one face and the volume collapse
+        points = [(0., 0., 0.), (1., 0., 0.), (0., 1., 0.), (0.5, 0., 0.)]
+        lines = ['    -1', '  2411']
+        for i, p in enumerate(points, 1):
+            lines.append(f'{i:10d}{1:10d}{1:10d}{11:10d}')
+            lines.append(''.join(f'{x:25.16E}' for x in p))
+        lines += ['    -1', '    -1', '  2412', f'{1:10d}{111:10d}{2:10d}{1:10d}{7:10d}{4:10d}',
+                  ''.join(f'{i:10d}' for i in range(1, 5)), '    -1']
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'flat.unv')
+            with open(path, 'w') as f:
+                f.write('\n'.join(lines) + '\n')
+            mesh = Mesh.by_unv(path)
+
+        self.assertEqual(mesh.num_tetras, 1)
+        self.assertEqual(mesh.quality(QualityMetric.VOLUME)[0], 0.)
+        self.assertEqual(mesh.quality(QualityMetric.ASPECT_RATIO)[0], np.inf)
+        self.assertEqual(mesh.quality(QualityMetric.MIN_DIHEDRAL_ANGLE)[0], 0.)
+        self.assertEqual(mesh.quality(QualityMetric.SCALED_JACOBIAN)[0], 0.)
+
+        summary = mesh.quality_summary(QualityMetric.ASPECT_RATIO)
+        self.assertEqual(summary.counts.sum(), 0)
+        self.assertEqual(summary.max, np.inf)
+        self.assertEqual(summary.count_above(10.), 1)
+
+    def test_nodes_on(self):
+        nodes = self.mesh.nodes
+        for face in self.box.faces():
+            indices = self.mesh.nodes_on(face)
+            self.assertGreater(len(indices), 0)
+            p = nodes[indices]
+            spans = p.max(axis=0) - p.min(axis=0)
+            self.assertEqual((spans < 1.e-7).sum(), 1)
+
+        all_nodes = self.mesh.nodes_on(self.box)
+        self.assertEqual(len(all_nodes), self.mesh.num_nodes)
+
+    def test_elements_on(self):
+        tris = self.mesh.elements_on(self.box, ElementKind.TRIANGLE)
+        self.assertEqual(len(tris), len(self.mesh.elements(ElementKind.TRIANGLE)))
+        tets = self.mesh.elements_on(self.box, ElementKind.TETRA)
+        self.assertEqual(len(tets), self.mesh.num_tetras)
+
+        per_face = self.mesh.elements_on_all(ShapeKind.FACE, ElementKind.TRIANGLE)
+        self.assertEqual(len(per_face), 6)
+        self.assertEqual(sum(len(a) for a in per_face), len(tris))
+        np.testing.assert_array_equal(per_face[0],
+                                      self.mesh.elements_on(self.box.faces()[0],
+                                                            ElementKind.TRIANGLE))
+        self.assertEqual(len(self.mesh.nodes_on_all(ShapeKind.EDGE)), 12)
+
+    def test_not_subshape(self):
+        other = make_box(2.)
+        with self.assertRaises(IMeshControlError):
+            self.mesh.nodes_on(other.faces()[0])
+        with self.assertRaises(IMeshControlError):
+            self.mesh.elements_on(other, ElementKind.TETRA)
+
+    def test_nearest_nodes(self):
+        nodes = self.mesh.nodes
+        points = nodes[::7] + 1.e-6
+        np.testing.assert_array_equal(self.mesh.nearest_nodes(points), np.arange(len(nodes))[::7])
+
+        with self.assertRaises(ValueError):
+            self.mesh.nearest_nodes(np.zeros((2, 2)))
+
+    def test_locate_tetras(self):
+        points = np.array([[0.3, 0.4, 0.5], [0.9, 0.1, 0.2], [2., 0., 0.]])
+        tets, bary = self.mesh.locate_tetras(points)
+        self.assertEqual(tets[2], -1)
+        self.assertTrue((tets[:2] >= 0).all())
+
+        corners = self.mesh.nodes[self.mesh.elements(ElementKind.TETRA)[tets[:2]]]
+        np.testing.assert_allclose(np.einsum('ij,ijk->ik', bary[:2], corners), points[:2])
+        self.assertTrue((bary[:2] >= -1.e-9).all())
+
+    def test_export_msh(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'box.msh')
+            self.mesh.export_msh(path)
+            with open(path, 'rb') as f:
+                self.assertTrue(f.read().startswith(b'$MeshFormat\n4.1 1 8\n'))
+
+    def test_export_vtu(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'box.vtu')
+            self.mesh.export_vtu(path)
+            with open(path, 'rb') as f:
+                data = f.read()
+            self.assertIn(f'NumberOfPoints="{self.mesh.num_nodes}"'.encode(), data)
+            self.assertTrue(data.endswith(b'</VTKFile>\n'))
+
+    @unittest.skipIf(importlib.util.find_spec('vtk') is None, 'vtk is not installed')
+    def test_to_vtk(self):
+        grid = self.mesh.to_vtk()
+        num_cells = sum(len(self.mesh.elements(kind)) for kind in ElementKind)
+        self.assertEqual(grid.GetNumberOfPoints(), self.mesh.num_nodes)
+        self.assertGreaterEqual(grid.GetNumberOfCells(), num_cells)
+        self.assertEqual(grid.GetCellType(grid.GetNumberOfCells() - 1), 10)
+        self.assertIsNotNone(grid.GetCellData().GetArray('ShapeId'))
+        self.assertEqual(grid.GetPoint(0), tuple(self.mesh.nodes[0]))
+
+        # The grid filled from the mesh matches the grid of the frozen mesh
+        frozen = self.mesh.freeze().to_vtk()
+        self.assertEqual(grid.GetNumberOfCells(), frozen.GetNumberOfCells())
+        for i in (0, grid.GetNumberOfCells() // 2, grid.GetNumberOfCells() - 1):
+            self.assertEqual(grid.GetCellType(i), frozen.GetCellType(i))
+            self.assertEqual(grid.GetCellData().GetArray('ShapeId').GetValue(i),
+                             frozen.GetCellData().GetArray('ShapeId').GetValue(i))
+        self.assertEqual(grid.GetPointData().GetArray('ShapeId').GetValue(0),
+                         frozen.GetPointData().GetArray('ShapeId').GetValue(0))
+
+    def test_freeze(self):
+        frozen = self.mesh.freeze()
+        self.assertEqual(frozen.num_nodes, self.mesh.num_nodes)
+        self.assertEqual(frozen.num_tetras, self.mesh.num_tetras)
+        np.testing.assert_array_equal(frozen.nodes, self.mesh.nodes)
+        np.testing.assert_array_equal(frozen.elements(ElementKind.TETRA),
+                                      self.mesh.elements(ElementKind.TETRA))
+
+        solid_id = self.mesh.shape_id(self.box.solids()[0])
+        self.assertTrue((frozen.element_shape_ids(ElementKind.TETRA) == solid_id).all())
+        face_id = self.mesh.shape_id(self.box.faces()[0])
+        self.assertIn(face_id, frozen.element_shape_ids(ElementKind.TRIANGLE))
+        self.assertEqual(frozen.node_shape_ids.shape, (frozen.num_nodes,))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'box.vtu')
+            frozen.export_vtu(path)
+            self.assertGreater(os.path.getsize(path), 0)
+
+
+class TestMeshDeflection(unittest.TestCase):
+
+    def test_deflection_3d(self):
+        box = make_box()
+        uniform = Mesh.generate(box, MeshControl.by_control_3d(box, 0.1))
+        adaptive = Mesh.generate(box, MeshControl.by_control_3d(box, 0.1, deflection=0.01))
+        self.assertGreater(adaptive.num_tetras, 0)
+        self.assertLessEqual(adaptive.num_tetras, uniform.num_tetras * 2)
+
+    def test_curvature(self):
+        # Box with one edge rounded by a small fillet, the only face of high curvature
+        box = make_box()
+        shape = box.fillet(box.edges()[0], 0.1)
+        faces = sorted(shape.faces(), key=lambda f: f.area)
+        fillet, flat = faces[0], faces[1:]
+
+        mesh = Mesh.generate(shape, MeshControl.by_control_3d(shape, 0.5, deflection=0.005))
+        nodes = mesh.nodes
+        tris = mesh.elements(ElementKind.TRIANGLE)
+
+        def mean_area(face):
+            p = nodes[tris[mesh.elements_on(face, ElementKind.TRIANGLE)]]
+            areas = np.linalg.norm(np.cross(p[:, 1] - p[:, 0], p[:, 2] - p[:, 0]), axis=1) / 2.
+            return areas.mean()
+
+        self.assertLess(mean_area(fillet), 0.25 * min(mean_area(f) for f in flat))
+
+    def test_chordal_error(self):
+        cylinder = Cylinder.by_size(1., 1., Frame.by_origin(Point.by_xyz(0, 0, 0)))
+
+        # Distance from the triangle centroids on the lateral face to the surface
+        def deviation(mesh):
+            tris = mesh.elements(ElementKind.TRIANGLE)
+            p = mesh.nodes[tris[mesh.elements_on(cylinder.lateral_face, ElementKind.TRIANGLE)]]
+            return 1. - np.linalg.norm(p.mean(axis=1)[:, :2], axis=1)
+
+        uniform = Mesh.generate(cylinder, MeshControl.by_control_3d(cylinder, 0.5))
+        adaptive = Mesh.generate(cylinder, MeshControl.by_control_3d(cylinder, 0.5,
+                                                                     deflection=0.005))
+        self.assertLess(deviation(adaptive).max(), 2. * 0.005)
+        self.assertGreater(deviation(uniform).max(), deviation(adaptive).max())
+
+    def test_deflection_1d_2d(self):
+        box = make_box()
+        controls = [MeshControl.by_control_1d(box, 0.2, 0.01),
+                    MeshControl.by_control_2d(box, deflection=0.01)]
+        mesh = Mesh.generate(box, MeshControl.by_control_3d(box, 0.2), controls)
+        self.assertGreater(mesh.num_tetras, 0)
+
+
+class TestSizeField(unittest.TestCase):
+
+    def test_by_grid(self):
+        field = SizeField.by_grid((0., 0., 0.), (0.5, 0.5, 0.5), np.full((3, 3, 3), 0.2))
+        self.assertEqual(field.points.shape, (27, 3))
+        self.assertAlmostEqual(field.points.max(), 1.)
+        with open(field.path) as f:
+            self.assertEqual(f.readline().strip(), '27')
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            SizeField.by_points(np.zeros((2, 3)), [1., 0.])
+        with self.assertRaises(ValueError):
+            SizeField.by_grid((0., 0.), (0.5, 0.5, 0.5), np.full((3, 3, 3), 0.2))
+        with self.assertRaises(ValueError):
+            SizeField.by_grid((0., 0., 0.), 0.5, np.full((3, 3, 3), 0.2))
+        with self.assertRaises(ValueError):
+            SizeField.by_function(lambda p: 0.1, (0., 0., 0.), (1., 1., 1.), 0.5)
+        with self.assertRaises(ValueError):
+            SizeField.by_function(lambda p: p, (0., 0., 0.), (1., 1., 1.), 0.5)
+        with self.assertRaises(ValueError):
+            SizeField.by_function(lambda p: p[:, 0] + 0.1, (0., 0.), (1., 1.), 0.5)
+
+    def test_refine(self):
+        box = make_box()
+        control = MeshControl.by_control_3d(box, 0.5)
+        field = SizeField.by_function(lambda p: 0.05 + 0.5 * np.linalg.norm(p, axis=1),
+                                      (0., 0., 0.), (1., 1., 1.), 0.1)
+        uniform = Mesh.generate(box, control)
+        graded = Mesh.generate(box, control.with_size_field(field))
+        self.assertGreater(graded.num_tetras, uniform.num_tetras)
+
+        # Mean edge length of the tetrahedra with centroids within a distance of the origin
+        def sizes_near(mesh, lo, hi):
+            p = mesh.nodes[mesh.elements(ElementKind.TETRA)]
+            r = np.linalg.norm(p.mean(axis=1), axis=1)
+            edges = [np.linalg.norm(p[:, i] - p[:, j], axis=1)
+                     for i, j in ((0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3))]
+            return np.mean(edges, axis=0)[(r >= lo) & (r < hi)]
+
+        # The field refines toward the origin and leaves the far corner at the control size
+        fine = sizes_near(graded, 0., 0.25)
+        coarse = sizes_near(graded, 1.4, 2.)
+        self.assertGreater(len(fine), 0)
+        self.assertGreater(len(coarse), 0)
+        self.assertLess(fine.mean(), 0.5 * coarse.mean())
+        self.assertLess(fine.mean(), 0.5 * sizes_near(uniform, 0., 2.).mean())
+
+        with self.assertRaises(IMeshControlError):
+            MeshControl.by_control_1d(box, 0.5).with_size_field(field)
+
+
+class TestMeshAssembly(unittest.TestCase):
+
+    def setUp(self):
+        self.shape = Compound.by_shapes([make_box(), make_box(1.)])
+        self.control = MeshControl.by_control_3d(self.shape, 0.25)
+
+    def test_assembly(self):
+        mesh = Mesh.generate(self.shape, self.control, assembly=True)
+        separate = Mesh.generate(self.shape, self.control)
+
+        # The shared face is meshed once, so interface nodes are not duplicated
+        self.assertEqual(len(mesh.shape.map(ShapeKind.FACE)), 11)
+        self.assertLess(mesh.num_nodes, separate.num_nodes)
+        self.assertEqual(len(np.unique(mesh.nodes.round(9), axis=0)), mesh.num_nodes)
+
+        # Tetrahedra on both sides of the shared face are neighbors, so there are fewer
+        # tetrahedron faces without a neighbor than triangles
+        for m, conformal in ((mesh, True), (separate, False)):
+            _, indices = m.element_neighbors(ElementKind.TETRA)
+            num_boundary = 4 * m.num_tetras - indices.size
+            num_triangles = len(m.elements(ElementKind.TRIANGLE))
+            if conformal:
+                self.assertLess(num_boundary, num_triangles)
+            else:
+                self.assertEqual(num_boundary, num_triangles)
+
+    def test_assembly_local_control(self):
+        box = self.shape.map(ShapeKind.SOLID)[0]
+        local = MeshControl.by_control_3d(box, 0.1)
+        mesh = Mesh.generate(self.shape, self.control, [local], assembly=True)
+        coarse = Mesh.generate(self.shape, self.control, assembly=True)
+        self.assertGreater(mesh.num_tetras, coarse.num_tetras)
+
+    def test_shape(self):
+        box = make_box()
+        mesh = Mesh.generate(box, MeshControl.by_control_3d(box, 0.25))
+        self.assertTrue(mesh.shape.ishape.IsSame(box.ishape))
+
+
+class TestMeshEstimate(unittest.TestCase):
+
+    def test_estimate(self):
+        box = make_box()
+        control = MeshControl.by_control_3d(box, 0.1)
+        estimate = Mesh.estimate(box, control)
+        mesh = Mesh.generate(box, control)
+
+        # Within an order of magnitude of the actual mesh
+        self.assertGreater(estimate.num_volumes, mesh.num_tetras / 10)
+        self.assertLess(estimate.num_volumes, mesh.num_tetras * 10)
+        self.assertGreater(estimate.num_nodes, mesh.num_nodes / 10)
+        self.assertLess(estimate.num_nodes, mesh.num_nodes * 10)
+        self.assertGreaterEqual(estimate.num_edges, 12 * 10)
+        self.assertLessEqual(estimate.num_edges, 12 * 11)
+        self.assertAlmostEqual(estimate.min_size, 0.1)
+        self.assertGreater(estimate.time, 0.)
+        self.assertGreater(estimate.memory, 0.)
+
+    def test_local_control(self):
+        box = make_box()
+        control = MeshControl.by_control_3d(box, 0.2)
+        local = MeshControl.by_control_2d(box.faces()[0], 0.05)
+        coarse = Mesh.estimate(box, control)
+        fine = Mesh.estimate(box, control, [local])
+        self.assertGreater(fine.num_faces, coarse.num_faces)
+        self.assertAlmostEqual(fine.min_size, 0.05)
+
+        # Tetrahedra are graded from the finer face into the solid
+        self.assertGreater(fine.num_volumes, 2 * coarse.num_volumes)
+        mesh = Mesh.generate(box, control, [local])
+        self.assertGreater(fine.num_volumes, mesh.num_tetras / 10)
+        self.assertLess(fine.num_volumes, mesh.num_tetras * 10)
+
+    def test_size_field(self):
+        box = make_box()
+        control = MeshControl.by_control_3d(box, 0.5)
+        field = SizeField.by_function(lambda p: 0.05 + 0.5 * np.linalg.norm(p, axis=1),
+                                      (0., 0., 0.), (1., 1., 1.), 0.1)
+        uniform = Mesh.estimate(box, control)
+        graded = Mesh.estimate(box, control.with_size_field(field))
+        self.assertGreater(graded.num_volumes, uniform.num_volumes)
+        self.assertAlmostEqual(graded.min_size, 0.05)
+
+    def test_fineness(self):
+        cylinder = Cylinder.by_size(1., 1., Frame.by_origin(Point.by_xyz(0, 0, 0)))
+        control = MeshControl.by_control_3d(cylinder, 0.5)
+        draft = Mesh.estimate(cylinder, control.with_preset('draft'))
+        fine = Mesh.estimate(cylinder, control.with_preset('fine'))
+        self.assertGreater(fine.num_faces, draft.num_faces)
+        self.assertGreater(fine.num_volumes, draft.num_volumes)
+        self.assertLess(fine.min_size, draft.min_size)
+
+
+class TestMeshReplicate(unittest.TestCase):
+
+    def setUp(self):
+        self.box = make_box()
+        self.mesh = Mesh.generate(self.box, MeshControl.by_control_3d(self.box, 0.25))
+
+    def test_mirror(self):
+        identity = Transform.translation(Vector.by_xyz(0, 0, 0))
+        mirror = Transform.mirror(Point.by_xyz(1, 0, 0), Vector.by_xyz(1, 0, 0))
+        mesh = self.mesh.replicate([identity, mirror])
+
+        # Nodes on the symmetry plane are shared by both copies
+        self.assertEqual(mesh.num_tetras, 2 * self.mesh.num_tetras)
+        self.assertLess(mesh.num_nodes, 2 * self.mesh.num_nodes)
+        self.assertEqual(len(np.unique(mesh.nodes.round(9), axis=0)), mesh.num_nodes)
+        self.assertTrue(np.all(mesh.quality(QualityMetric.VOLUME) > 0.))
+        self.assertEqual(len(mesh.shape.map(ShapeKind.SOLID)), 2)
+
+    def test_no_merge(self):
+        translation = Transform.translation(Vector.by_xyz(2, 0, 0))
+        mesh = self.mesh.replicate([Transform.translation(Vector.by_xyz(0, 0, 0)), translation])
+        self.assertEqual(mesh.num_nodes, 2 * self.mesh.num_nodes)
+
+        mirror = Transform.mirror(Point.by_xyz(1, 0, 0), Vector.by_xyz(1, 0, 0))
+        mesh = self.mesh.replicate([Transform.translation(Vector.by_xyz(0, 0, 0)), mirror], 0.)
+        self.assertEqual(mesh.num_nodes, 2 * self.mesh.num_nodes)
+
+
+class TestMeshFile(unittest.TestCase):
+
+    def setUp(self):
+        box = make_box()
+        self.mesh = Mesh.generate(box, MeshControl.by_control_3d(box, 0.2))
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def check(self, f, compressed):
+        frozen = self.mesh.freeze()
+        self.assertEqual(f.is_compressed('nodes'), compressed)
+        self.assertEqual(f.num_nodes, self.mesh.num_nodes)
+        np.testing.assert_array_equal(f.nodes, self.mesh.nodes)
+        np.testing.assert_array_equal(f.node_shape_ids, frozen.node_shape_ids)
+        for kind in ElementKind:
+            np.testing.assert_array_equal(f.elements(kind), self.mesh.elements(kind))
+            np.testing.assert_array_equal(f.element_shape_ids(kind),
+                                          frozen.element_shape_ids(kind))
+        tets = self.mesh.elements(ElementKind.TETRA)
+        np.testing.assert_array_equal(f.read('elements/tetra', 10, 20), tets[10:20])
+
+    def test_export_native(self):
+        path = os.path.join(self.tmp.name, 'mesh.bin')
+        self.mesh.export_native(path)
+        f = MeshFile(path)
+        self.assertIsInstance(f.nodes, np.memmap)
+        self.check(f, False)
+
+    def test_export_native_compressed(self):
+        path = os.path.join(self.tmp.name, 'mesh.bin')
+        self.mesh.export_native(path, compress=True)
+        self.check(MeshFile(path), True)
+
+    def test_invalid(self):
+        path = os.path.join(self.tmp.name, 'mesh.unv')
+        self.mesh.export_unv(path)
+        with self.assertRaises(ValueError):
+            MeshFile(path)
+
+
+class TestMeshReport(unittest.TestCase):
+
+    def test_report(self):
+        box = make_box()
+        mesh = Mesh.generate(box, MeshControl.by_control_3d(box, 0.2))
+        report = mesh.report
+
+        # One sub-mesh per sub-shape of the box (8 vertices, 12 edges, 6 faces, shell, solid)
+        self.assertEqual(len(report.sub_meshes), 28)
+        self.assertFalse(report.failures)
+        self.assertGreaterEqual(report.total_time, sum(r.time for r in report.sub_meshes) * 0.99)
+        self.assertEqual(sum(r.num_elements for r in report.sub_meshes),
+                         mesh.num_tetras + len(mesh.elements(ElementKind.TRIANGLE)) +
+                         mesh.imesh.NumEdges())
+        for r in report.sub_meshes:
+            self.assertEqual(r.shape_id, mesh.shape_id(r.shape))
+        self.assertTrue(report.slowest(1)[0].computed)
+        self.assertAlmostEqual(sum(report.time_by_algorithm().values()),
+                               sum(r.time for r in report.sub_meshes))
+
+    def test_imported(self):
+        box = make_box()
+        mesh = Mesh.generate(box, MeshControl.by_control_3d(box, 0.2))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'mesh.unv')
+            mesh.export_unv(path)
+            self.assertFalse(Mesh.by_unv(path).report.sub_meshes)
+
+
+class TestMeshAdjacency(unittest.TestCase):
+
+    def setUp(self):
+        box = make_box()
+        self.mesh = Mesh.generate(box, MeshControl.by_control_3d(box, 0.2))
+        self.tets = self.mesh.elements(ElementKind.TETRA)
+
+    def test_node_elements(self):
+        indptr, indices = self.mesh.node_elements(ElementKind.TETRA)
+        self.assertEqual(indptr.size, self.mesh.num_nodes + 1)
+        self.assertEqual(indices.size, self.tets.size)
+        for i in (0, self.mesh.num_nodes // 2):
+            expected = np.nonzero((self.tets == i).any(axis=1))[0]
+            np.testing.assert_array_equal(indices[indptr[i]:indptr[i + 1]], expected)
+
+    def test_element_neighbors(self):
+        indptr, indices = self.mesh.element_neighbors(ElementKind.TETRA)
+        self.assertEqual(indptr.size, self.mesh.num_tetras + 1)
+        self.assertTrue((np.diff(indptr) <= 4).all())
+        for i in range(10):
+            for j in indices[indptr[i]:indptr[i + 1]]:
+                self.assertEqual(np.intersect1d(self.tets[i], self.tets[j]).size, 3)
+                self.assertIn(i, indices[indptr[j]:indptr[j + 1]])
+
+        # Each boundary triangle is a tetrahedron face without a neighbor
+        num_boundary = 4 * self.mesh.num_tetras - indices.size
+        self.assertEqual(num_boundary, len(self.mesh.elements(ElementKind.TRIANGLE)))
+
+    def test_node_neighbors(self):
+        indptr, indices = self.mesh.node_neighbors()
+        self.assertEqual(indptr.size, self.mesh.num_nodes + 1)
+        i = 0
+        expected = np.setdiff1d(self.tets[(self.tets == i).any(axis=1)], [i])
+        np.testing.assert_array_equal(indices[indptr[i]:indptr[i + 1]], expected)
+
+
+class TestMeshRenumber(unittest.TestCase):
+
+    def setUp(self):
+        box = make_box()
+        self.mesh = Mesh.generate(box, MeshControl.by_control_3d(box, 0.2))
+
+    def test_renumber(self):
+        nodes = self.mesh.nodes
+        tets = self.mesh.elements(ElementKind.TETRA)
+        before = self.mesh.bandwidth
+
+        renumbering = self.mesh.renumber()
+        self.assertEqual(renumbering.bandwidth_before, before)
+        self.assertLessEqual(renumbering.bandwidth_after, before)
+        self.assertEqual(self.mesh.bandwidth, renumbering.bandwidth_after)
+        np.testing.assert_array_equal(np.sort(renumbering.order), np.arange(len(nodes)))
+
+        np.testing.assert_array_equal(self.mesh.nodes, nodes[renumbering.order])
+        np.testing.assert_array_equal(self.mesh.elements(ElementKind.TETRA),
+                                      renumbering.inverse[tets])
+
+    def test_renumber_export(self):
+        self.mesh.renumber()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'mesh.unv')
+            self.mesh.export_unv(path)
+            mesh = Mesh.by_unv(path)
+        np.testing.assert_allclose(mesh.nodes, self.mesh.nodes)
+
+    def test_renumber_no_apply(self):
+        nodes = self.mesh.nodes
+        self.mesh.renumber(apply=False)
+        np.testing.assert_array_equal(self.mesh.nodes, nodes)
+
+    def test_unsupported(self):
+        with self.assertRaises(ValueError):
+            self.mesh.renumber('metis')
+
+
+class TestMeshPartition(unittest.TestCase):
+
+    def setUp(self):
+        box = make_box()
+        self.mesh = Mesh.generate(box, MeshControl.by_control_3d(box, 0.2))
+
+    def test_partition(self):
+        partition = self.mesh.partition(4)
+        parts = partition.parts(ElementKind.TETRA)
+        self.assertEqual(parts.shape, (self.mesh.num_tetras,))
+        counts = np.bincount(parts, minlength=4)
+        self.assertEqual(len(counts), 4)
+        self.assertLess(counts.max(), 1.2 * self.mesh.num_tetras / 4)
+        self.assertGreater(partition.edge_cut, 0)
+
+        tets = self.mesh.elements(ElementKind.TETRA)
+        for i in range(4):
+            part = partition.part(i)
+            self.assertEqual(part.num_tetras, counts[i])
+            global_nodes = partition.global_nodes(i)
+            np.testing.assert_array_equal(global_nodes[part.elements(ElementKind.TETRA)],
+                                          tets[parts == i])
+            self.assertTrue(np.isin(partition.interface_nodes(i), global_nodes).all())
+
+    def test_mesh_alive(self):
+        # The partition references the frozen mesh, which stays alive without a Python reference
+        frozen = self.mesh.freeze()
+        partition = frozen.partition(2)
+        del frozen
+        gc.collect()
+        self.assertEqual(sum(partition.part(i).num_tetras for i in range(2)),
+                         self.mesh.num_tetras)
+
+    def test_export(self):
+        partition = self.mesh.partition(2)
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = partition.export(tmp, fmt='msh')
+            self.assertEqual(len(paths), 2)
+            self.assertTrue(all(os.path.isfile(p) for p in paths))
+            for i in range(2):
+                np.testing.assert_array_equal(np.load(os.path.join(tmp, f'part_{i}_nodes.npy')),
+                                              partition.global_nodes(i))
+
+
+class TestMeshRemesh(unittest.TestCase):
+
+    def test_remesh(self):
+        box = make_box()
+        face = box.faces()[0]
+
+        # Face opposite to the changed one, sharing no edge with it, with a control of its own
+        edges = list(face.edges())
+        opposite = next(f for f in box.faces()
+                        if not any(e.ishape.IsSame(g.ishape) for e in f.edges() for g in edges))
+        mesh = Mesh.generate(box, MeshControl.by_control_3d(box, 0.5),
+                             [MeshControl.by_control_2d(face, 0.5),
+                              MeshControl.by_control_2d(opposite, 0.5)])
+        num_nodes = mesh.num_nodes
+
+        def face_time():
+            return next(r.time for r in mesh.report.sub_meshes
+                        if r.shape_id == mesh.shape_id(opposite))
+
+        def face_mesh():
+            nodes = mesh.nodes[mesh.nodes_on(opposite)]
+            tris = mesh.elements(ElementKind.TRIANGLE)[
+                mesh.elements_on(opposite, ElementKind.TRIANGLE)]
+            centers = mesh.nodes[tris].mean(axis=1)
+            return nodes[np.lexsort(nodes.T)], centers[np.lexsort(centers.T)]
+
+        self.assertGreater(face_time(), 0.)
+        nodes, centers = face_mesh()
+        mesh.remesh([MeshControl.by_control_2d(face, 0.1)])
+        self.assertGreater(mesh.num_nodes, num_nodes)
+        self.assertEqual(mesh.nodes.shape, (mesh.num_nodes, 3))
+
+        # Untouched face is not computed again and keeps its nodes and triangles
+        self.assertEqual(face_time(), 0.)
+        new_nodes, new_centers = face_mesh()
+        np.testing.assert_array_equal(nodes, new_nodes)
+        np.testing.assert_allclose(centers, new_centers, rtol=0., atol=1.e-12)
+
+    def test_no_controls(self):
+        box = make_box()
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = MeshCache(tmp)
+            control = MeshControl.by_control_3d(box, 0.5)
+            Mesh.generate(box, control, cache=cache)
+            mesh = Mesh.generate(box, control, cache=cache)
+        with self.assertRaises(IMeshControlError):
+            mesh.remesh([MeshControl.by_control_2d(box.faces()[0], 0.1)])
+
+
+class TestMeshParallel(unittest.TestCase):
+
+    def test_threads(self):
+        boxes = [make_box(0.), make_box(2.), make_box(4.)]
+        serial = [Mesh.generate(box, MeshControl.by_control_3d(box, 0.5)) for box in boxes]
+        with ThreadPoolExecutor(3) as executor:
+            meshes = list(executor.map(
+                lambda box: Mesh.generate(box, MeshControl.by_control_3d(box, 0.5)), boxes))
+        self.assertEqual([m.num_nodes for m in meshes], [m.num_nodes for m in serial])
+        self.assertEqual([m.num_tetras for m in meshes], [m.num_tetras for m in serial])
+
+
+class TestMeshAsync(unittest.TestCase):
+
+    def test_generate_async(self):
+        box = make_box()
+        mesh = asyncio.run(Mesh.generate_async(box, MeshControl.by_control_3d(box, 0.5)))
+        self.assertGreater(mesh.num_tetras, 0)
+
+    def test_cancelled(self):
+        box = make_box()
+        token = CancelToken()
+        token.cancel()
+        self.assertTrue(token.cancelled)
+        with self.assertRaises(IMeshCancelledError):
+            Mesh.generate(box, MeshControl.by_control_3d(box, 0.5), cancel_token=token)
+
+    def test_timeout(self):
+        box = make_box()
+        token = CancelToken()
+        executor = ThreadPoolExecutor(1)
+        start = time.monotonic()
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(Mesh.generate_async(box, MeshControl.by_control_3d(box, 0.02),
+                                            cancel_token=token, timeout=0.01, executor=executor))
+        self.assertTrue(token.cancelled)
+
+        # The computation is aborted rather than left running to completion
+        executor.shutdown(wait=True)
+        self.assertLess(time.monotonic() - start, 30.)
+
+    def test_cancel_other_token(self):
+        box = make_box()
+
+        errors = []
+
+        async def run():
+            asyncio.get_running_loop().set_exception_handler(lambda _, c: errors.append(c))
+
+            # The first computation is cancelled on timeout while the second waits for it
+            slow = Mesh.generate_async(box, MeshControl.by_control_3d(box, 0.02), timeout=0.01)
+            fast = Mesh.generate_async(box, MeshControl.by_control_3d(box, 0.2))
+            results = await asyncio.gather(slow, fast, return_exceptions=True)
+            gc.collect()
+            return results
+
+        slow, fast = asyncio.run(run())
+        self.assertIsInstance(slow, asyncio.TimeoutError)
+        self.assertGreater(fast.num_tetras, 0)
+
+        # The cancellation error of the abandoned computation is retrieved
+        self.assertEqual(errors, [])
+
+
+class TestMeshGenerator(unittest.TestCase):
+
+    def test_shared_hypotheses(self):
+        with MeshGenerator() as generator:
+            meshes = []
+            for i in range(3):
+                box = make_box(2. * i)
+                meshes.append(generator.generate(box, MeshControl.by_control_3d(box, 0.5)))
+            self.assertEqual(generator.num_hypotheses, 2)
+
+            box = make_box()
+            generator.generate(box, MeshControl.by_control_3d(box, 0.25))
+            self.assertEqual(generator.num_hypotheses, 3)
+
+        self.assertTrue(generator.closed)
+        self.assertEqual(generator.num_hypotheses, 0)
+        for mesh in meshes:
+            self.assertEqual(mesh.num_tetras, meshes[0].num_tetras)
+
+    def test_closed(self):
+        generator = MeshGenerator()
+        generator.close()
+        box = make_box()
+        with self.assertRaises(RuntimeError):
+            generator.generate(box, MeshControl.by_control_3d(box, 0.5))
+
+
+class TestMeshCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.box = make_box()
+        self.control = MeshControl.by_control_3d(self.box, 0.5)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hit_and_miss(self):
+        cache = MeshCache(self.tmp.name)
+        m1 = Mesh.generate(self.box, self.control, cache=cache)
+        m2 = Mesh.generate(self.box, self.control, cache=cache)
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(m1.num_nodes, m2.num_nodes)
+        self.assertEqual(m1.num_tetras, m2.num_tetras)
+
+    def test_shape(self):
+        cache = MeshCache(self.tmp.name)
+        m1 = Mesh.generate(self.box, self.control, cache=cache)
+        m2 = Mesh.generate(self.box, self.control, cache=cache)
+        self.assertEqual(cache.hits, 1)
+        self.assertTrue(m2.shape.ishape.IsSame(self.box.ishape))
+        for face in self.box.faces():
+            np.testing.assert_array_equal(m1.nodes_on(face), m2.nodes_on(face))
+            np.testing.assert_array_equal(m1.elements_on(face, ElementKind.TRIANGLE),
+                                          m2.elements_on(face, ElementKind.TRIANGLE))
+
+        # Without the shape, the mesh is associated with a copy of the stored one
+        m3 = cache.load(cache.key(self.box, self.control))
+        self.assertEqual(m3.shape.ishape.ToBRep(), self.box.ishape.ToBRep())
+        for face, copy in zip(self.box.faces(), m3.shape.faces()):
+            np.testing.assert_array_equal(m1.nodes_on(face), m3.nodes_on(copy))
+
+    def test_key(self):
+        cache = MeshCache(self.tmp.name)
+        k1 = cache.key(self.box, self.control)
+        k2 = cache.key(make_box(), MeshControl.by_control_3d(self.box, 0.5))
+        k3 = cache.key(self.box, MeshControl.by_control_3d(self.box, 0.25))
+        self.assertEqual(k1, k2)
+        self.assertNotEqual(k1, k3)
+
+    def test_eviction(self):
+        cache = MeshCache(self.tmp.name, max_bytes=1)
+        Mesh.generate(self.box, self.control, cache=cache)
+        Mesh.generate(self.box, MeshControl.by_control_3d(self.box, 0.4), cache=cache)
+        self.assertEqual(len([n for n in os.listdir(self.tmp.name) if n.endswith('.unv')]), 1)
+        self.assertEqual(len(os.listdir(self.tmp.name)), 2)
+
+        cache.clear()
+        self.assertEqual(cache.size, 0)
+
+    def test_removed_elsewhere(self):
+        cache = MeshCache(self.tmp.name)
+        Mesh.generate(self.box, self.control, cache=cache)
+        key = cache.key(self.box, self.control)
+
+        # Entry partially evicted by another process
+        os.remove(os.path.join(self.tmp.name, key + '.npz'))
+        self.assertGreater(cache.size, 0)
+        self.assertIsNone(cache.load(key, self.box))
+        self.assertEqual(cache.misses, 2)
+
+        cache.clear()
+        self.assertEqual(cache.size, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
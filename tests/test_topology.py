@@ -1,6 +1,7 @@
 import unittest
 
-from pyocctlite.geometry import Line, Point, Vector
+from pyocctlite.geometry import Frame, Line, Point, Vector
+from pyocctlite.primitives import Cylinder
 from pyocctlite.topology import Compound, Edge, Face, ShapeKind, Wire
 
 
@@ -66,5 +67,46 @@ class TestCompound(unittest.TestCase):
         self.assertAlmostEqual(compound.volume, 1., 7)
 
 
+class TestTessellate(unittest.TestCase):
+
+    def test_tessellate(self):
+        p1 = Point.by_xyz(0, 0, 0)
+        p2 = Point.by_xyz(1, 0, 0)
+        p3 = Point.by_xyz(1, 1, 0)
+        p4 = Point.by_xyz(0, 1, 0)
+        w = Wire.by_edges([Edge.by_points(p1, p2), Edge.by_points(p2, p3),
+                           Edge.by_points(p3, p4), Edge.by_points(p4, p1)])
+        solid = Face.by_wire(w).extrude(Vector.by_xyz(0, 0, 1))
+
+        faces = solid.tessellate(0.01)
+        self.assertEqual(len(faces), 6)
+        for vertices, normals, triangles in faces:
+            self.assertEqual(vertices.shape[1], 3)
+            self.assertEqual(normals.shape, vertices.shape)
+            self.assertEqual(triangles.shape[1], 3)
+            self.assertGreater(len(triangles), 0)
+            self.assertLess(triangles.max(), len(vertices))
+
+        # Coarser tolerance reuses the cached triangulation
+        cached = solid.tessellate(0.1)
+        for (v1, _, t1), (v2, _, t2) in zip(faces, cached):
+            self.assertEqual(v1.shape, v2.shape)
+            self.assertEqual(t1.shape, t2.shape)
+
+    def test_angular_deflection(self):
+        cylinder = Cylinder.by_size(1., 1., Frame.by_origin(Point.by_xyz(0, 0, 0)))
+
+        # Linear deflection too coarse to matter so that the angle drives the tessellation
+        coarse = cylinder.tessellate(1., 0.5)
+        fine = cylinder.tessellate(1., 0.1)
+        self.assertGreater(sum(len(t) for _, _, t in fine), sum(len(t) for _, _, t in coarse))
+
+        # Coarser angle reuses the finer cached triangulation
+        cached = cylinder.tessellate(1., 0.5)
+        for (v1, _, t1), (v2, _, t2) in zip(fine, cached):
+            self.assertEqual(v1.shape, v2.shape)
+            self.assertEqual(t1.shape, t2.shape)
+
+
 if __name__ == '__main__':
     unittest.main()